@@ -0,0 +1,153 @@
+from enigma import eServiceCenter, eServiceReference
+from Components.config import config
+from Tools.Alternatives import checkBouquets, onBouquetsChanged
+
+# Channel number index for the tv and radio bouquets.
+#
+# Every bouquet is listed once and remembered with the position of its services
+# (markers and directories are not counted) and the channel numbers enigma
+# assigned to them. The bouquet offsets for the continuous numbering are
+# derived from the bouquet sizes. Editing any bouquet makes enigma renumber all
+# of them, so everything is dropped when a bouquet is edited or reloaded (see
+# Tools.Alternatives.onBouquetsChanged) and when the numbering mode changes.
+
+BOUQUET_ROOT_TV = '1:7:1:0:0:0:0:0:0:0:FROM BOUQUET "bouquets.tv" ORDER BY bouquet'
+BOUQUET_ROOT_RADIO = '1:7:2:0:0:0:0:0:0:0:FROM BOUQUET "bouquets.radio" ORDER BY bouquet'
+
+
+class BouquetNumbers:
+	def __init__(self, bouquet):
+		self.bouquet = bouquet
+		self.count = 0
+		self.positions = {} # service compare string -> position in the bouquet
+		self.numbers = {} # channel number -> service reference
+		serviceHandler = eServiceCenter.getInstance()
+		info = serviceHandler.info(bouquet)
+		self.name = info and info.getName(bouquet) or ''
+		servicelist = serviceHandler.list(bouquet)
+		if servicelist is not None:
+			while True:
+				service = servicelist.getNext()
+				if not service.valid():
+					break
+				number = service.getChannelNum()
+				if number and number not in self.numbers:
+					self.numbers[number] = service
+				if not (service.flags & (eServiceReference.isMarker | eServiceReference.isDirectory)):
+					self.count += 1
+					self.positions.setdefault(service.toCompareString(), self.count)
+
+
+class ChannelNumbers:
+	def __init__(self):
+		self.bouquets = {} # bouquet string -> BouquetNumbers
+		self.roots = {} # root string -> list of bouquet references
+		self.offsets = {} # root string -> {bouquet string: offset}
+
+	def clear(self):
+		self.bouquets.clear()
+		self.roots.clear()
+		self.offsets.clear()
+
+	def getBouquet(self, bouquet):
+		bouquetstr = bouquet.toString()
+		entry = self.bouquets.get(bouquetstr)
+		if entry is None:
+			entry = self.bouquets[bouquetstr] = BouquetNumbers(bouquet)
+		return entry
+
+	def getRootBouquets(self, rootstr):
+		bouquets = self.roots.get(rootstr)
+		if bouquets is None:
+			bouquets = self.roots[rootstr] = []
+			bouquetlist = eServiceCenter.getInstance().list(eServiceReference(rootstr))
+			if bouquetlist is not None:
+				while True:
+					bouquet = bouquetlist.getNext()
+					if not bouquet.valid():
+						break
+					if bouquet.flags & eServiceReference.isDirectory:
+						bouquets.append(bouquet)
+		return bouquets
+
+	def getOffset(self, rootstr, bouquet):
+		# number of services in the bouquets before bouquet
+		offsets = self.offsets.get(rootstr)
+		if offsets is None:
+			offsets = self.offsets[rootstr] = {}
+			offset = 0
+			for x in self.getRootBouquets(rootstr):
+				offsets.setdefault(x.toString(), offset)
+				offset += self.getBouquet(x).count
+		return offsets.get(bouquet.toString())
+
+	def getServiceNumber(self, ref):
+		# Returns the number of ref and the name of its bouquet, counted like the
+		# channel list does for config.tv/radio.lastroot.
+		if not isinstance(ref, eServiceReference):
+			return 0, ''
+		checkBouquets()
+		isRadioService = ref.getData(0) in (2, 10)
+		lastpath = isRadioService and config.radio.lastroot.value or config.tv.lastroot.value
+		if 'FROM BOUQUET' not in lastpath:
+			if 'FROM PROVIDERS' in lastpath:
+				return 'P', 'Provider'
+			if 'FROM SATELLITES' in lastpath:
+				return 'S', 'Satellites'
+			if ') ORDER BY name' in lastpath:
+				return 'A', 'All Services'
+			return 0, 'N/A'
+		try:
+			acount = config.plugins.NumberZapExt.enable.value and config.plugins.NumberZapExt.acount.value or config.usage.alternative_number_mode.value
+		except:
+			acount = config.usage.alternative_number_mode.value
+		rootstr = ''
+		for x in lastpath.split(';'):
+			if x != '':
+				rootstr = x
+		cur = eServiceReference(rootstr)
+		refstr = ref.toCompareString()
+		entry = self.getBouquet(cur)
+		position = entry.positions.get(refstr)
+		if acount is True or not config.usage.multibouquet.value:
+			return position and (position, entry.name) or (0, '')
+		bqrootstr = isRadioService and BOUQUET_ROOT_RADIO or BOUQUET_ROOT_TV
+		if position:
+			offset = self.getOffset(bqrootstr, cur)
+			if offset is not None:
+				return offset + position, entry.name
+		# not in the current bouquet, use the first bouquet containing it
+		for bouquet in self.getRootBouquets(bqrootstr):
+			entry = self.getBouquet(bouquet)
+			position = entry.positions.get(refstr)
+			if position:
+				return self.getOffset(bqrootstr, bouquet) + position, entry.name
+		return 0, ''
+
+	def searchNumber(self, number, root, bouquet_root, firstBouquetOnly=False):
+		# Returns the service with channel number and the bouquet it was found
+		# in, looking in root first and then in the visible bouquets.
+		checkBouquets()
+		service = None
+		bouquet = root
+		if not firstBouquetOnly and root:
+			service = self.getBouquet(root).numbers.get(number)
+		if config.usage.multibouquet.value and not service:
+			bouquet = bouquet_root
+			for x in self.getRootBouquets(bouquet_root.toString()):
+				bouquet = x
+				if x.flags & eServiceReference.isInvisible:
+					continue
+				service = self.getBouquet(x).numbers.get(number)
+				if service:
+					playable = not (service.flags & (eServiceReference.isMarker | eServiceReference.isDirectory)) or (service.flags & eServiceReference.isNumberedMarker)
+					if not playable:
+						service = None
+					break
+				if config.usage.alternative_number_mode.value or firstBouquetOnly:
+					break
+		return service, bouquet
+
+
+channelNumbers = ChannelNumbers()
+onBouquetsChanged.append(channelNumbers.clear)
@@ -1,10 +1,9 @@
 from Components.Converter.Converter import Converter
 from Components.Element import cached
-from Components.Harddisk import harddiskmanager
+from Components.Harddisk import harddiskmanager, diskActivity
 from Components.config import config
 from Components.SystemInfo import BoxInfo
 from skin import parameters
-from enigma import eTimer
 
 
 #***************************************************************
@@ -41,12 +40,10 @@ class HddState(Converter):
 			self.type = self.EXTERNAL
 		else:
 			self.type = self.ALL
-		self.standby_time = 150
 		self.isActive = False
 		self.state_text = ""
 		self.isHDD()
-		self.timer = eTimer()
-		self.timer.callback.append(self.updateHddState)
+		diskActivity.addListener(self.updateHddState, 15)
 		self.idle_time = int(config.usage.hdd_standby.value)
 		config.usage.hdd_standby.addNotifier(self.setStandbyTime, initial_call=False)
 		self.colors = parameters.get("HddStateColors", (0x00FFFF00, 0x0000FF00)) # standby - yellow, active - green
@@ -56,7 +53,6 @@ class HddState(Converter):
 			harddiskmanager.on_partition_list_change.append(self.onPartitionAddRemove)
 
 	def onPartitionAddRemove(self, state, part):
-		self.timer.stop()
 		self.isHDD()
 		self.updateHddState(force=True)
 
@@ -84,16 +80,11 @@ class HddState(Converter):
 						string = "\c%08x" % self.colors[0]
 						string += _("standby ")
 				self.isActive = False
-				idle = self.standby_time
 			else:
 				if self.notDiskLetterName:
 					string = "\c%08x" % self.colors[1]
 					string += _("active ")
 				self.isActive = True
-				idle = self.idle_time
-			if self.idle_time:
-				timeout = len(self.hdd_list) > 1 and self.standby_time or idle
-				self.timer.start(timeout * 100, True)
 		else:
 			self.isActive = False
 		if string:
@@ -105,7 +96,6 @@ class HddState(Converter):
 			self.changed((self.CHANGED_ALL,))
 
 	def setStandbyTime(self, cfgElem):
-		self.timer.stop()
 		self.idle_time = int(cfgElem.value)
 		self.updateHddState(force=True)
 
@@ -132,6 +122,13 @@ class HddState(Converter):
 	def doSuspend(self, suspended):
 		pass
 
+	def destroy(self):
+		diskActivity.removeListener(self.updateHddState)
+		config.usage.hdd_standby.removeNotifier(self.setStandbyTime)
+		if self.onPartitionAddRemove in harddiskmanager.on_partition_list_change:
+			harddiskmanager.on_partition_list_change.remove(self.onPartitionAddRemove)
+		Converter.destroy(self)
+
 	@cached
 	def getText(self):
 		return self.state_text
@@ -20,6 +20,7 @@
 
 from enigma import iServiceInformation, iPlayableService, iPlayableServicePtr, eServiceReference, eServiceCenter, eTimer, getBestPlayableServiceReference
 
+from Components.ChannelNumbers import channelNumbers
 from Components.config import config
 from Components.Converter.Converter import Converter
 from Components.Element import cached
@@ -122,65 +123,7 @@ class ServiceName2(Converter):
 		return isService
 
 	def getServiceNumber(self, ref):
-		def searchHelper(serviceHandler, num, bouquet):
-			servicelist = serviceHandler.list(bouquet)
-			if servicelist is not None:
-				while True:
-					s = servicelist.getNext()
-					if not s.valid():
-						break
-					if not (s.flags & (eServiceReference.isMarker | eServiceReference.isDirectory)):
-						num += 1
-						if s == ref:
-							return s, num
-			return None, num
-
-		if isinstance(ref, eServiceReference):
-			isRadioService = ref.getData(0) in (2, 10)
-			lastpath = isRadioService and config.radio.lastroot.value or config.tv.lastroot.value
-			if 'FROM BOUQUET' not in lastpath:
-				if 'FROM PROVIDERS' in lastpath:
-					return 'P', 'Provider'
-				if 'FROM SATELLITES' in lastpath:
-					return 'S', 'Satellites'
-				if ') ORDER BY name' in lastpath:
-					return 'A', 'All Services'
-				return 0, 'N/A'
-			try:
-				acount = config.plugins.NumberZapExt.enable.value and config.plugins.NumberZapExt.acount.value or config.usage.alternative_number_mode.value
-			except:
-				acount = False
-			rootstr = ''
-			for x in lastpath.split(';'):
-				if x != '':
-					rootstr = x
-			serviceHandler = eServiceCenter.getInstance()
-			if acount is True or not config.usage.multibouquet.value:
-				bouquet = eServiceReference(rootstr)
-				service, number = searchHelper(serviceHandler, 0, bouquet)
-			else:
-				if isRadioService:
-					bqrootstr = '1:7:2:0:0:0:0:0:0:0:FROM BOUQUET "bouquets.radio" ORDER BY bouquet'
-				else:
-					bqrootstr = '1:7:1:0:0:0:0:0:0:0:FROM BOUQUET "bouquets.tv" ORDER BY bouquet'
-				number = 0
-				cur = eServiceReference(rootstr)
-				bouquet = eServiceReference(bqrootstr)
-				bouquetlist = serviceHandler.list(bouquet)
-				if bouquetlist is not None:
-					while True:
-						bouquet = bouquetlist.getNext()
-						if not bouquet.valid():
-							break
-						if bouquet.flags & eServiceReference.isDirectory:
-							service, number = searchHelper(serviceHandler, number, bouquet)
-							if service is not None and cur == bouquet:
-								break
-			if service is not None:
-				info = serviceHandler.info(bouquet)
-				name = info and info.getName(bouquet) or ''
-				return number, name
-		return 0, ''
+		return channelNumbers.getServiceNumber(ref)
 
 	def getProviderName(self, ref):
 		if isinstance(ref, eServiceReference):
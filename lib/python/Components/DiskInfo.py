@@ -1,6 +1,7 @@
 from Components.GUIComponent import GUIComponent
 from Components.VariableText import VariableText
-from os import statvfs
+from Components.StorageStats import storageStats
+from os.path import normpath
 
 from enigma import eLabel
 
@@ -18,13 +19,23 @@ class DiskInfo(VariableText, GUIComponent):
 		VariableText.__init__(self)
 		self.type = type
 		self.path = path
+		storageStats.onUpdate.append(self.statsChanged)
 		if update:
 			self.update()
 
+	def statsChanged(self, path):
+		if path == normpath(self.path):
+			self.update()
+
+	def destroy(self):
+		if self.statsChanged in storageStats.onUpdate:
+			storageStats.onUpdate.remove(self.statsChanged)
+		GUIComponent.destroy(self)
+
 	def update(self):
-		try:
-			stat = statvfs(self.path)
-		except OSError:
+		# the free space comes from storageStats, it's sampled in the background
+		stat = storageStats.getStat(self.path)[0]
+		if stat is None:
 			return -1
 
 		if self.type == self.FREE:
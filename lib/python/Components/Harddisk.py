@@ -1,9 +1,16 @@
+import ctypes
 import os
+import threading
 import time
+from collections import deque
+from fcntl import ioctl
 from Tools.CList import CList
 from Components.SystemInfo import BoxInfo
 from Components.Console import Console
 from Components import Task
+from Components.MountTable import mountTable
+from Components.StorageStats import storageStats
+from Tools.Profile import profile, profile_timing
 
 
 def readFile(filename):
@@ -14,16 +21,8 @@ def readFile(filename):
 
 
 def getProcMounts():
-	try:
-		mounts = open("/proc/mounts", 'r')
-	except IOError as ex:
-		print("[Harddisk] Failed to open /proc/mounts", ex)
-		return []
-	result = [line.strip().split(' ') for line in mounts]
-	for item in result:
-		# Spaces are encoded as \040 in mounts
-		item[1] = item[1].replace('\\040', ' ')
-	return result
+	# The entries are shared, don't modify them.
+	return mountTable.getMounts()
 
 
 def isFileSystemSupported(filesystem):
@@ -38,10 +37,179 @@ def isFileSystemSupported(filesystem):
 
 def findMountPoint(path):
 	'Example: findMountPoint("/media/hdd/some/file") returns "/media/hdd"'
-	path = os.path.abspath(path)
-	while not os.path.ismount(path):
-		path = os.path.dirname(path)
-	return path
+	return mountTable.getMountpoint(path)
+
+
+# Disk commands of the idle handling, sent with ioctls instead of running
+# hdparm or sdparm. ATA commands go through HDIO_DRIVE_CMD, like hdparm does,
+# SCSI commands (for USB bridges) through SG_IO, like sdparm does.
+HDIO_DRIVE_CMD = 0x031f
+ATA_OP_STANDBYNOW1 = 0xe0
+ATA_OP_SETIDLE1 = 0xe3
+SG_IO = 0x2285
+SG_DXFER_NONE = -1
+SCSI_STOP_UNIT = (0x1b, 0, 0, 0, 0, 0) # START STOP UNIT with START cleared
+
+
+class SgIoHdr(ctypes.Structure):
+	_fields_ = [
+		("interface_id", ctypes.c_int),
+		("dxfer_direction", ctypes.c_int),
+		("cmd_len", ctypes.c_ubyte),
+		("mx_sb_len", ctypes.c_ubyte),
+		("iovec_count", ctypes.c_ushort),
+		("dxfer_len", ctypes.c_uint),
+		("dxferp", ctypes.c_void_p),
+		("cmdp", ctypes.c_void_p),
+		("sbp", ctypes.c_void_p),
+		("timeout", ctypes.c_uint),
+		("flags", ctypes.c_uint),
+		("pack_id", ctypes.c_int),
+		("usr_ptr", ctypes.c_void_p),
+		("status", ctypes.c_ubyte),
+		("masked_status", ctypes.c_ubyte),
+		("msg_status", ctypes.c_ubyte),
+		("sb_len_wr", ctypes.c_ubyte),
+		("host_status", ctypes.c_ushort),
+		("driver_status", ctypes.c_ushort),
+		("resid", ctypes.c_int),
+		("duration", ctypes.c_uint),
+		("info", ctypes.c_uint)
+	]
+
+
+def driveCommand(device, command):
+	# Sends an ATA command without data, raises on failure.
+	fd = os.open(device, os.O_RDONLY | os.O_NONBLOCK)
+	try:
+		ioctl(fd, HDIO_DRIVE_CMD, bytes((command, 0, 0, 0)))
+	finally:
+		os.close(fd)
+
+
+def scsiCommand(device, cdb):
+	# Sends a SCSI command without data, raises on failure.
+	command = ctypes.create_string_buffer(bytes(cdb), len(cdb))
+	sense = ctypes.create_string_buffer(32)
+	header = SgIoHdr(interface_id=ord("S"), dxfer_direction=SG_DXFER_NONE, cmd_len=len(cdb), mx_sb_len=len(sense), cmdp=ctypes.addressof(command), sbp=ctypes.addressof(sense), timeout=20000)
+	fd = os.open(device, os.O_RDONLY | os.O_NONBLOCK)
+	try:
+		ioctl(fd, SG_IO, header)
+	finally:
+		os.close(fd)
+	if header.status or header.host_status or header.driver_status:
+		raise IOError("SCSI command failed, status %d/%d/%d" % (header.status, header.host_status, header.driver_status))
+
+
+# The HDD idle poll daemon.
+# As some harddrives have a buggy standby timer, we are doing this by hand here.
+# The hardware timer is disabled, and the I/O counters of all disks are read
+# from /proc/diskstats (the /sys/block/*/stat files of all devices in one go)
+# by a single timer. A disk without any access over its idle time is put into
+# standby. The interval is a tenth of the shortest idle time, shortened to hit
+# the moment a disk reaches its idle time, so a disk woken up is noticed soon.
+# Screens showing the disk activity can ask for a shorter interval.
+class DiskActivity:
+	MinInterval = 2 # seconds
+	ListenerInterval = 15 # seconds, for listeners of disks without idle time
+	HistorySize = 60 # samples kept per disk
+
+	def __init__(self):
+		self.disks = [] # Harddisk objects with idle handling
+		self.history = {} # device -> deque of (time, sectors read, sectors written)
+		self.stats = {} # device -> I/O counters of the last sample
+		self.listeners = {} # callback -> requested interval in seconds, or 0
+		self.onUpdate = CList() # called after every sample
+		self.interval = 0
+		self.timer = None
+
+	def addDisk(self, hdd):
+		if hdd not in self.disks:
+			self.disks.append(hdd)
+			self.history[hdd.device] = deque(maxlen=self.HistorySize)
+		self.schedule()
+
+	def removeDisk(self, hdd):
+		if hdd in self.disks:
+			self.disks.remove(hdd)
+			self.history.pop(hdd.device, None)
+		self.schedule()
+
+	def addListener(self, callback, interval=0):
+		# callback is called after every sample, interval asks for samples at
+		# least every interval seconds while the listener is there.
+		self.listeners[callback] = interval
+		if callback not in self.onUpdate:
+			self.onUpdate.append(callback)
+		self.schedule()
+
+	def removeListener(self, callback):
+		self.listeners.pop(callback, None)
+		if callback in self.onUpdate:
+			self.onUpdate.remove(callback)
+		self.schedule()
+
+	def readStats(self):
+		stats = {}
+		try:
+			with open("/proc/diskstats", "r") as f:
+				for line in f:
+					data = line.split()
+					if len(data) >= 10: # reads, sectors read, writes, sectors written
+						stats[data[2]] = (int(data[3]), int(data[5]), int(data[7]), int(data[9]))
+		except (IOError, OSError, ValueError) as e:
+			print("[Harddisk] Failed to read /proc/diskstats:", e)
+		return stats
+
+	def sample(self):
+		now = time.time()
+		self.stats = self.readStats()
+		for hdd in self.disks[:]:
+			stat = self.stats.get(hdd.device)
+			if stat is not None:
+				self.history[hdd.device].append((now, stat[1], stat[3]))
+				hdd.updateIdle(now, stat)
+		self.onUpdate()
+		self.schedule(now)
+
+	def schedule(self, now=None):
+		if now is None:
+			now = time.time()
+		idleTimes = [hdd.max_idle_time for hdd in self.disks if hdd.max_idle_time]
+		requested = [interval for interval in self.listeners.values() if interval]
+		if idleTimes:
+			awake = [hdd.last_access + hdd.max_idle_time - now for hdd in self.disks if hdd.max_idle_time and not hdd.is_sleeping]
+			requested.append(min([min(idleTimes) / 10.0] + awake))
+		elif self.disks and self.listeners:
+			requested.append(self.ListenerInterval)
+		if not requested:
+			self.interval = 0
+			if self.timer:
+				self.timer.stop()
+			return
+		self.interval = max(min(requested), self.MinInterval)
+		if self.timer is None:
+			from enigma import eTimer
+			self.timer = eTimer()
+			self.timer.callback.append(self.sample)
+		self.timer.start(int(self.interval * 1000), True)
+
+	def getIORate(self, device):
+		# Returns the bytes read and written per second between the last two
+		# samples of device.
+		history = self.history.get(device)
+		if not history or len(history) < 2:
+			return 0, 0
+		(t0, read0, written0), (t1, read1, written1) = history[-2], history[-1]
+		if t1 <= t0:
+			return 0, 0
+		return int((read1 - read0) * 512 / (t1 - t0)), int((written1 - written0) * 512 / (t1 - t0))
+
+	def getHistory(self, device):
+		return list(self.history.get(device, ()))
+
+
+diskActivity = DiskActivity()
 
 
 class Harddisk:
@@ -51,9 +219,9 @@ class Harddisk:
 		self.max_idle_time = 0
 		self.idle_running = False
 		self.last_access = time.time()
-		self.last_stat = 0
-		self.timer = None
+		self.last_stat = None
 		self.is_sleeping = False
+		self.scsi = False
 
 		self.dev_path = ''
 		self.disk_path = ''
@@ -90,9 +258,8 @@ class Harddisk:
 		return os.path.join('/sys/block/', self.device, filename)
 
 	def stop(self):
-		if self.timer:
-			self.timer.stop()
-			self.timer.callback.remove(self.runIdle)
+		if self.idle_running:
+			diskActivity.removeDisk(self)
 
 	def bus(self):
 		ret = _("External")
@@ -398,65 +565,59 @@ class Harddisk:
 	def getDeviceName(self):
 		return self.disk_path
 
-	# the HDD idle poll daemon.
-	# as some harddrives have a buggy standby timer, we are doing this by hand here.
-	# first, we disable the hardware timer. then, we check every now and then if
-	# any access has been made to the disc. If there has been no access over a specifed time,
-	# we set the hdd into standby.
+	# the HDD idle handling, see DiskActivity
 	def readStats(self):
-		try:
-			l = open("/sys/block/%s/stat" % self.device).read()
-		except IOError:
+		stat = diskActivity.stats.get(self.device)
+		if stat is None:
 			return -1, -1
-		data = l.split(None, 5)
-		return (int(data[0]), int(data[4]))
+		return (stat[0], stat[2])
 
 	def startIdle(self):
-		from enigma import eTimer
-
 		# disable HDD standby timer
 		# some external USB bridges require the SCSI protocol
-		if self.bus() == _("External"):
+		self.scsi = self.bus() == _("External")
+		if self.scsi:
 			Console().ePopen(("sdparm", "sdparm", "--set=SCT=0", self.disk_path))
-		Console().ePopen(("hdparm", "hdparm", "-S0", self.disk_path))
-		self.timer = eTimer()
-		self.timer.callback.append(self.runIdle)
+		self.runDiskCommand(driveCommand, ATA_OP_SETIDLE1, [("hdparm", "hdparm", "-S0", self.disk_path)])
 		self.idle_running = True
-		self.setIdleTime(self.max_idle_time) # kick the idle polling loop
-
-	def runIdle(self):
-		if not self.max_idle_time:
-			return
-		t = time.time()
-
-		idle_time = t - self.last_access
-
-		stats = self.readStats()
-		l = sum(stats)
-
-		if l != self.last_stat and l >= 0: # access
-			self.last_stat = l
-			self.last_access = t
-			idle_time = 0
+		diskActivity.addDisk(self)
+
+	def runDiskCommand(self, command, arg, fallback):
+		# The command may take a while, so it runs in a thread. hdparm or sdparm
+		# are only used when the ioctl fails.
+		from twisted.internet import threads
+
+		def failed(failure):
+			print("[Harddisk] Failed to send command to %s, using %s: %s" % (self.disk_path, fallback[0][0], failure.getErrorMessage()))
+			for cmd in fallback:
+				Console().ePopen(cmd)
+		threads.deferToThread(command, self.disk_path, arg).addErrback(failed)
+
+	def updateIdle(self, now, stat):
+		# called by DiskActivity with the I/O counters of the disk
+		if stat != self.last_stat: # access
+			self.last_stat = stat
+			self.last_access = now
 			self.is_sleeping = False
-
-		if idle_time >= self.max_idle_time and not self.is_sleeping:
+		if self.max_idle_time and not self.is_sleeping and now - self.last_access >= self.max_idle_time:
 			self.setSleep()
 			self.is_sleeping = True
 
 	def setSleep(self):
 		# some external USB bridges require the SCSI protocol
-		if self.bus() == _("External"):
-			Console().ePopen(("sdparm", "sdparm", "--flexible", "--readonly", "--command=stop", self.disk_path))
-		Console().ePopen(("hdparm", "hdparm", "-y", self.disk_path))
+		if self.scsi:
+			self.runDiskCommand(scsiCommand, SCSI_STOP_UNIT, [("sdparm", "sdparm", "--flexible", "--readonly", "--command=stop", self.disk_path), ("hdparm", "hdparm", "-y", self.disk_path)])
+		else:
+			self.runDiskCommand(driveCommand, ATA_OP_STANDBYNOW1, [("hdparm", "hdparm", "-y", self.disk_path)])
 
 	def setIdleTime(self, idle):
 		self.max_idle_time = idle
 		if self.idle_running:
-			if not idle:
-				self.timer.stop()
-			else:
-				self.timer.start(idle * 100, False)  # poll 10 times per period.
+			diskActivity.schedule()
+
+	def getIORate(self):
+		# bytes read and written per second, for disks with idle handling
+		return diskActivity.getIORate(self.device)
 
 	def isSleeping(self):
 		return self.is_sleeping
@@ -475,8 +636,12 @@ class Partition:
 		return "Partition(mountpoint=%s,description=%s,device=%s)" % (self.mountpoint, self.description, self.device)
 
 	def stat(self):
+		# The last sample of storageStats, network mounts can hang.
 		if self.mountpoint:
-			return os.statvfs(self.mountpoint)
+			stat = storageStats.getStat(self.mountpoint)[0]
+			if stat is None:
+				raise OSError("No file system information for %s yet" % self.mountpoint)
+			return stat
 		else:
 			raise OSError("Device %s is not mounted" % self.device)
 
@@ -501,29 +666,17 @@ class Partition:
 		return self.description + '\t' + self.mountpoint
 
 	def mounted(self, mounts=None):
-		# THANK YOU PYTHON FOR STRIPPING AWAY f_fsid.
-		# TODO: can os.path.ismount be used?
+		# mounts is not needed anymore, the mount table is cached
 		if self.force_mounted:
 			return True
 		if self.mountpoint:
-			if mounts is None:
-				mounts = getProcMounts()
-			for parts in mounts:
-				if self.mountpoint.startswith(parts[1]): # use startswith so a mount not ending with '/' is also detected.
-					return True
+			# any mount the mountpoint is in, so a mount not ending with '/' is also detected.
+			return mountTable.getMountpoint(self.mountpoint) in mountTable.mountpoints
 		return False
 
 	def filesystem(self, mounts=None):
 		if self.mountpoint:
-			if mounts is None:
-				mounts = getProcMounts()
-			for fields in mounts:
-				if self.mountpoint.endswith('/') and not self.mountpoint == '/':
-					if fields[1] + '/' == self.mountpoint:
-						return fields[2]
-				else:
-					if fields[1] == self.mountpoint:
-						return fields[2]
+			return mountTable.getFileSystem(self.mountpoint)
 		return ''
 
 
@@ -537,8 +690,70 @@ def addInstallTask(job, package):
 	task.args.append(package)
 
 
+def probeBlockDevice(blockdev):
+	# Returns what getBlockDevInfo returns and whether the device is the CD
+	# drive (getCD), doesn't change anything and may run in a thread.
+	devpath = "/sys/block/" + blockdev
+	error = False
+	removable = False
+	blacklisted = False
+	is_cdrom = False
+	is_mmc = False
+	cd = False
+	partitions = []
+	try:
+		if os.path.exists(devpath + "/removable"):
+			removable = bool(int(readFile(devpath + "/removable")))
+		if os.path.exists(devpath + "/uevent"):
+			uevent = {k.lower(): v.strip() for k, v in (l.split('=') for l in open(devpath + "/uevent"))}
+			dev = int(uevent['major'])
+			subdev = False if uevent['devtype'] == "disk" else True
+		else:
+			dev = None
+			subdev = False
+		# blacklist ram, loop, mtdblock, romblock, ramzswap
+		blacklisted = dev in [1, 7, 31, 253, 254]
+		# blacklist non-root eMMC devices
+		if not blacklisted and dev == 179:
+			is_mmc = True
+			if (BoxInfo.getItem('BootDevice') and blockdev.startswith(BoxInfo.getItem('BootDevice'))) or subdev:
+				blacklisted = True
+		if blockdev[0:2] == 'sr':
+			is_cdrom = True
+		if blockdev[0:2] == 'hd':
+			try:
+				media = readFile("/proc/ide/%s/media" % blockdev)
+				if "cdrom" in media:
+					is_cdrom = True
+			except IOError:
+				error = True
+		# check for partitions
+		if not is_cdrom and not is_mmc and os.path.exists(devpath):
+			for partition in os.listdir(devpath):
+				if partition[0:len(blockdev)] != blockdev:
+					continue
+				partitions.append(partition)
+		else:
+			cd = True
+	except IOError:
+		error = True
+	# check for medium, this may take a while on card readers and optical drives
+	medium_found = True
+	if not blacklisted:
+		try:
+			open("/dev/" + blockdev).close()
+		except IOError as err:
+			if err.errno == 159: # no medium present
+				medium_found = False
+
+	return error, blacklisted, removable, is_cdrom, partitions, medium_found, cd
+
+
 class HarddiskManager:
+	EnumerationTimeout = 2 # seconds
+
 	def __init__(self):
+		mountTable.start()
 		self.hdd = []
 		self.cd = ""
 		self.partitions = []
@@ -561,71 +776,87 @@ class HarddiskManager:
 		)
 		known = set([os.path.normpath(a.mountpoint) for a in self.partitions if a.mountpoint])
 		for m, d in p:
-			if (m not in known) and os.path.ismount(m):
+			if (m not in known) and mountTable.isMountpoint(m):
 				self.partitions.append(Partition(mountpoint=m, description=d))
 
 	def getBlockDevInfo(self, blockdev):
-		devpath = "/sys/block/" + blockdev
-		error = False
-		removable = False
-		blacklisted = False
-		is_cdrom = False
-		is_mmc = False
-		partitions = []
-		try:
-			if os.path.exists(devpath + "/removable"):
-				removable = bool(int(readFile(devpath + "/removable")))
-			if os.path.exists(devpath + "/uevent"):
-				uevent = {k.lower(): v.strip() for k, v in (l.split('=') for l in open(devpath + "/uevent"))}
-				dev = int(uevent['major'])
-				subdev = False if uevent['devtype'] == "disk" else True
-			else:
-				dev = None
-				subdev = False
-			# blacklist ram, loop, mtdblock, romblock, ramzswap
-			blacklisted = dev in [1, 7, 31, 253, 254]
-			# blacklist non-root eMMC devices
-			if not blacklisted and dev == 179:
-				is_mmc = True
-				if (BoxInfo.getItem('BootDevice') and blockdev.startswith(BoxInfo.getItem('BootDevice'))) or subdev:
-					blacklisted = True
-			if blockdev[0:2] == 'sr':
-				is_cdrom = True
-			if blockdev[0:2] == 'hd':
-				try:
-					media = readFile("/proc/ide/%s/media" % blockdev)
-					if "cdrom" in media:
-						is_cdrom = True
-				except IOError:
-					error = True
-			# check for partitions
-			if not is_cdrom and not is_mmc and os.path.exists(devpath):
-				for partition in os.listdir(devpath):
-					if partition[0:len(blockdev)] != blockdev:
-						continue
-					partitions.append(partition)
-			else:
-				self.cd = blockdev
-		except IOError:
-			error = True
-		# check for medium
-		medium_found = True
-		try:
-			open("/dev/" + blockdev).close()
-		except IOError as err:
-			if err.errno == 159: # no medium present
-				medium_found = False
-
-		return error, blacklisted, removable, is_cdrom, partitions, medium_found
+		info = probeBlockDevice(blockdev)
+		if info[6]:
+			self.cd = blockdev
+		return info[:6]
 
 	def enumerateBlockDevices(self):
+		# The block devices are probed in parallel threads. Boot waits at most
+		# EnumerationTimeout for them, devices found later are added from the
+		# main loop and announced through on_partition_list_change.
 		print("[Harddisk] enumerating block devices...")
-		for blockdev in os.listdir("/sys/block"):
-			error, blacklisted, removable, is_cdrom, partitions, medium_found = self.addHotplugPartition(blockdev)
-			if not error and not blacklisted and medium_found:
-				for part in partitions:
-					self.addHotplugPartition(part)
-				self.devices_scanned_on_init.append((blockdev, removable, is_cdrom, medium_found))
+		profile("Harddisk:enumerate")
+		self.probeLock = threading.Lock()
+		self.probeResults = []
+		self.probing = True
+		threads = [threading.Thread(target=self.probeDevice, args=(blockdev,), daemon=True) for blockdev in sorted(os.listdir("/sys/block"))]
+		for thread in threads:
+			thread.start()
+		deadline = time.time() + self.EnumerationTimeout
+		for thread in threads:
+			thread.join(max(0, deadline - time.time()))
+		with self.probeLock:
+			self.probing = False
+			results = self.probeResults
+			self.probeResults = None
+		for result in sorted(results):
+			self.addProbedDevice(*result)
+		pending = sum(1 for thread in threads if thread.is_alive())
+		if pending:
+			print("[Harddisk] %d block device(s) still being probed, adding them later" % pending)
+		profile("Harddisk:enumerated")
+
+	def probeDevice(self, blockdev):
+		# runs in a thread
+		start = time.time()
+		info = probeBlockDevice(blockdev)
+		error, blacklisted, removable, is_cdrom, partitions, medium_found, cd = info
+		partitionInfo = []
+		if not error and not blacklisted and medium_found:
+			partitionInfo = [(part, probeBlockDevice(part)) for part in partitions]
+		seconds = time.time() - start
+		profile_timing("Harddisk:probe %s" % blockdev, seconds)
+		result = (blockdev, info, partitionInfo)
+		with self.probeLock:
+			if self.probing:
+				self.probeResults.append(result)
+				return
+		print("[Harddisk] %s was probed after %.1fs" % (blockdev, seconds))
+		from twisted.internet import reactor
+		reactor.callFromThread(self.addProbedDevice, blockdev, info, partitionInfo, True)
+
+	def addProbedDevice(self, blockdev, info, partitionInfo, late=False):
+		if info[6]:
+			self.cd = blockdev
+		if late:
+			self.removeStaticPartitions([blockdev] + [part for part, partInfo in partitionInfo])
+		error, blacklisted, removable, is_cdrom, partitions, medium_found = self.addHotplugPartition(blockdev, info=info[:6])
+		if not error and not blacklisted and medium_found:
+			for part, partInfo in partitionInfo:
+				if partInfo[6]:
+					self.cd = part
+				self.addHotplugPartition(part, info=partInfo[:6])
+			self.devices_scanned_on_init.append((blockdev, removable, is_cdrom, medium_found))
+			if late:
+				from Components.config import config
+				if hasattr(config.usage, "hdd_standby"):
+					for hdd in self.hdd:
+						if hdd.device == blockdev:
+							hdd.setIdleTime(int(config.usage.hdd_standby.value))
+
+	def removeStaticPartitions(self, devices):
+		# A device probed after boot may be mounted on one of the mount points
+		# which were added without a device, it replaces them.
+		mountpoints = set(self.getMountpoint(device) for device in devices)
+		for x in self.partitions[:]:
+			if not x.device and x.mountpoint in mountpoints:
+				self.partitions.remove(x)
+				self.on_partition_list_change("remove", x)
 
 	def getAutofsMountpoint(self, device):
 		r = self.getMountpoint(device)
@@ -634,15 +865,13 @@ class HarddiskManager:
 		return r
 
 	def getMountpoint(self, device):
-		dev = "/dev/%s" % device
-		for item in getProcMounts():
-			if item[0] == dev:
-				return item[1]
-		return None
+		return mountTable.getMountpointOfDevice("/dev/%s" % device)
 
-	def addHotplugPartition(self, device, physdev=None):
+	def addHotplugPartition(self, device, physdev=None, info=None):
 		# device is the device name, without /dev
 		# physdev is the physical device path, which we (might) use to determine the userfriendly name
+		# info is the result of getBlockDevInfo when the device was probed already
+		mountTable.invalidate()
 		if not physdev:
 			dev, part = self.splitDeviceName(device)
 			try:
@@ -650,7 +879,7 @@ class HarddiskManager:
 			except OSError:
 				physdev = dev
 				print("couldn't determine blockdev physdev for device", device)
-		error, blacklisted, removable, is_cdrom, partitions, medium_found = self.getBlockDevInfo(device)
+		error, blacklisted, removable, is_cdrom, partitions, medium_found = info or self.getBlockDevInfo(device)
 		if not blacklisted and medium_found:
 			description = self.getUserfriendlyDeviceName(device, physdev)
 			p = Partition(mountpoint=self.getMountpoint(device), description=description, force_mounted=True, device=device)
@@ -685,6 +914,7 @@ class HarddiskManager:
 		return error, blacklisted, removable, is_cdrom, partitions, medium_found
 
 	def removeHotplugPartition(self, device):
+		mountTable.invalidate()
 		for x in self.partitions[:]:
 			if x.device == device:
 				self.partitions.remove(x)
@@ -716,8 +946,6 @@ class HarddiskManager:
 		return self.cd
 
 	def getMountedPartitions(self, onlyhotplug=False, mounts=None):
-		if mounts is None:
-			mounts = getProcMounts()
 		parts = [x for x in self.partitions if (x.is_hotplug or not onlyhotplug) and x.mounted(mounts)]
 		devs = set([x.device for x in parts])
 		for devname in devs.copy():
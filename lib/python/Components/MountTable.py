@@ -0,0 +1,130 @@
+import os
+import re
+
+# Snapshot of the mount table.
+#
+# /proc/self/mounts is read once and kept in memory. The kernel signals changes
+# of the mount table with POLLPRI on the open file, which is watched from the
+# main loop, and the hotplug handling of the HarddiskManager refreshes it too.
+# Until the watch is running every query reads the mount table again, just
+# like before. Mount points are indexed by path, so looking up the mount point
+# of a path only needs a dictionary lookup per path component.
+
+MOUNTS_FILE = "/proc/self/mounts"
+
+unescape = re.compile(r"\\([0-7]{3})")
+
+
+class MountTable:
+	def __init__(self):
+		self.mounts = [] # [device, mountpoint, filesystem, options, ...] like /proc/mounts
+		self.mountpoints = {} # mountpoint -> mount entry, the last mount wins
+		self.fd = None
+		self.notifier = None
+		self.valid = False
+		self.onChange = []
+
+	def start(self):
+		# Watches the mount table, needs the main loop.
+		if self.notifier is not None:
+			return
+		try:
+			from enigma import eSocketNotifier
+			from select import POLLPRI
+			self.fd = os.open(MOUNTS_FILE, os.O_RDONLY)
+			self.notifier = eSocketNotifier(self.fd, POLLPRI)
+			self.notifier.callback.append(self.mountsChanged)
+		except Exception as e:
+			print("[MountTable] Failed to watch %s: %s" % (MOUNTS_FILE, e))
+			self.notifier = None
+			if self.fd is not None:
+				os.close(self.fd)
+				self.fd = None
+		self.valid = False
+
+	def read(self):
+		# The watched file has to be read again to acknowledge the change.
+		if self.fd is None:
+			with open(MOUNTS_FILE, "rb") as f:
+				return f.read()
+		os.lseek(self.fd, 0, os.SEEK_SET)
+		data = []
+		while True:
+			chunk = os.read(self.fd, 65536)
+			if not chunk:
+				return b"".join(data)
+			data.append(chunk)
+
+	def reload(self):
+		try:
+			data = self.read().decode("utf-8", "replace")
+		except (IOError, OSError) as e:
+			print("[MountTable] Failed to read %s: %s" % (MOUNTS_FILE, e))
+			data = ""
+		mounts = [line.strip().split(" ") for line in data.splitlines() if line.strip()]
+		mountpoints = {}
+		for item in mounts:
+			if len(item) < 3:
+				continue
+			# Spaces and such are encoded as octal escapes, \040 for a space
+			item[1] = unescape.sub(lambda m: chr(int(m.group(1), 8)), item[1])
+			mountpoints[item[1]] = item
+		self.mounts = mounts
+		self.mountpoints = mountpoints
+		self.valid = self.notifier is not None
+
+	def mountsChanged(self, what=None):
+		self.reload()
+		for callback in self.onChange:
+			callback()
+
+	def invalidate(self):
+		# for hotplug events, the mount may be done after the event
+		self.valid = False
+
+	def update(self):
+		if not self.valid:
+			self.reload()
+
+	def getMounts(self):
+		self.update()
+		return self.mounts
+
+	def isMountpoint(self, path):
+		self.update()
+		return os.path.normpath(path) in self.mountpoints
+
+	def getMountpoint(self, path):
+		# Returns the mount point containing path, like findMountPoint.
+		self.update()
+		path = os.path.abspath(path)
+		if not self.mountpoints:
+			while not os.path.ismount(path):
+				path = os.path.dirname(path)
+			return path
+		while path not in self.mountpoints:
+			parent = os.path.dirname(path)
+			if parent == path:
+				break
+			path = parent
+		return path
+
+	def getMountpointOfDevice(self, device):
+		# Returns where device (like /dev/sda1) is mounted, or None.
+		for item in self.getMounts():
+			if item[0] == device:
+				return item[1]
+		return None
+
+	def getDevice(self, mountpoint):
+		self.update()
+		item = self.mountpoints.get(os.path.normpath(mountpoint))
+		return item and item[0]
+
+	def getFileSystem(self, mountpoint):
+		self.update()
+		item = self.mountpoints.get(os.path.normpath(mountpoint))
+		return item and item[2] or ""
+
+
+mountTable = MountTable()
@@ -4,13 +4,16 @@ from ServiceReference import ServiceReference
 from Components.MultiContent import MultiContentEntryText, MultiContentEntryPixmapAlphaBlend, MultiContentEntryProgress
 from Components.config import config
 import os
-import struct
 import random
 from Tools.LoadPixmap import LoadPixmap
+from Tools.MovieIndex import MovieInfo, addDirectoryIndex, buildTagMenu, getDirectoryIndex, getLastPlayPosition, getMovieInfo, getTags, readDirectory, saveMovieIndex
+from Tools.ResumePoints import CUT_TYPE_LAST, readCuts, resumePointsInstance, writeCuts
 from Tools.Directories import SCOPE_CURRENT_SKIN, resolveFilename
 from Screens.LocationBox import defaultInhibitDirs
 import NavigationInstance
 from skin import parseScale
+from twisted.internet import threads
+from Tools.BoundFunction import boundFunction
 
 from enigma import eListboxPythonMultiContent, eListbox, gFont, iServiceInformation, RT_HALIGN_LEFT, RT_HALIGN_RIGHT, eServiceReference, eServiceCenter, eTimer, RT_VALIGN_CENTER, BT_SCALE, BT_KEEP_ASPECT_RATIO, BT_ALIGN_CENTER
 
@@ -20,8 +23,6 @@ IMAGE_EXTENSIONS = frozenset((".jpg", ".png", ".gif", ".bmp", ".jpeg", ".jpe", "
 MOVIE_EXTENSIONS = frozenset((".mpg", ".vob", ".m4v", ".mkv", ".avi", ".divx", ".dat", ".flv", ".mp4", ".mov", ".wmv", ".asf", ".3gp", ".3g2", ".mpeg", ".mpe", ".rm", ".rmvb", ".ogm", ".ogv", ".m2ts", ".mts", ".webm", ".pva", ".wtv", ".stream", ".ts"))
 KNOWN_EXTENSIONS = MOVIE_EXTENSIONS.union(IMAGE_EXTENSIONS, DVD_EXTENSIONS, AUDIO_EXTENSIONS)
 
-cutsParser = struct.Struct('>QI') # big-endian, 64-bit PTS and 32-bit type
-
 
 class MovieListData:
 	pass
@@ -60,24 +61,14 @@ justStubInfo = StubInfo()
 
 
 def lastPlayPosFromCache(ref):
-	from Screens.InfoBarGenerics import resumePointsInstance
-	return resumePointsInstance.resumePointCache.get(ref.toString(), None)
+	return resumePointsInstance.getResumePointOf(ref)
 
 
 def moviePlayState(cutsFileName, ref, length):
 	'''Returns None, 0..100 for percentage'''
 	try:
 		# read the cuts file first
-		f = open(cutsFileName, 'rb')
-		lastPosition = None
-		while True:
-			data = f.read(cutsParser.size)
-			if len(data) < cutsParser.size:
-				break
-			cut, cutType = cutsParser.unpack(data)
-			if cutType == 3: # undocumented, but 3 appears to be the stop
-				lastPosition = cut
-		f.close()
+		lastPosition = getLastPlayPosition(cutsFileName)
 		# See what we have in RAM (it might help)
 		last = lastPlayPosFromCache(ref)
 		if last:
@@ -116,21 +107,8 @@ def moviePlayState(cutsFileName, ref, length):
 def resetMoviePlayState(cutsFileName, ref=None):
 	try:
 		if ref is not None:
-			from Screens.InfoBarGenerics import resumePointsInstance
 			resumePointsInstance.delResumePoint(ref)
-		f = open(cutsFileName, 'rb')
-		cutlist = []
-		while True:
-			data = f.read(cutsParser.size)
-			if len(data) < cutsParser.size:
-				break
-			cut, cutType = cutsParser.unpack(data)
-			if cutType != 3:
-				cutlist.append(data)
-		f.close()
-		f = open(cutsFileName, 'wb')
-		f.write(b''.join(cutlist))
-		f.close()
+		writeCuts(cutsFileName, [cut for cut in readCuts(cutsFileName) if cut[1] != CUT_TYPE_LAST])
 	except:
 		pass
 		#import sys
@@ -155,6 +133,9 @@ class MovieList(GUIComponent):
 	HIDE_DESCRIPTION = 1
 	SHOW_DESCRIPTION = 2
 
+	MinBatchSize = 20
+	StepSize = 50 # entries read per step of a background load
+
 	def __init__(self, root, list_type=None, sort_type=None, descr_state=None):
 		GUIComponent.__init__(self)
 		self.list = []
@@ -185,6 +166,18 @@ class MovieList(GUIComponent):
 		self.compactColumn = 200
 		self.treeDescription = 165
 		self.reloadDelayTimer = None
+		self.loadGeneration = 0
+		self.loadTimer = eTimer()
+		self.loadTimer.callback.append(self.loadStep)
+		self.loadScan = None
+		self.loadRoot = None
+		self.loadPending = None
+		self.loadShown = 0
+		self.loadBatchSize = self.MinBatchSize
+		self.loadCallback = None
+		self.loadBatchCallback = None
+		self.loadSelection = None
+		self.loadSelected = None
 		self.l = eListboxPythonMultiContent()
 		self.tags = set()
 		self.root = None
@@ -458,10 +451,10 @@ class MovieList(GUIComponent):
 						data.partcol = 0x808080
 					else:
 						data.partcol = 0xf0f0f0
-			service = ServiceReference(info.getInfoString(serviceref, iServiceInformation.sServiceref))
-			if service is None:
-				data.serviceName = None
+			if hasattr(info, "getServiceName"):
+				data.serviceName = info.getServiceName()
 			else:
+				service = ServiceReference(info.getInfoString(serviceref, iServiceInformation.sServiceref))
 				data.serviceName = service.getServiceName()
 			data.description = info.getInfoString(serviceref, iServiceInformation.sDescription)
 
@@ -603,11 +596,14 @@ class MovieList(GUIComponent):
 	def preWidgetRemove(self, instance):
 		instance.setContent(None)
 		instance.selectionChanged.get().remove(self.selectionChanged)
+		self.cancelLoad()
+		saveMovieIndex()
 
 	def reload(self, root=None, filter_tags=None):
 		if self.reloadDelayTimer is not None:
 			self.reloadDelayTimer.stop()
 			self.reloadDelayTimer = None
+		self.cancelLoad()
 		if root is not None:
 			self.load(root, filter_tags)
 		else:
@@ -615,11 +611,114 @@ class MovieList(GUIComponent):
 		self.l.setBuildFunc(self.buildMovieListEntry)  # don't move that to __init__ as this will create memory leak when calling MovieList from WebIf
 		self.l.setList(self.list)
 
+	def reloadInBackground(self, root=None, filter_tags=None, sel=None, callback=None, batchCallback=None):
+		# Like reload, but the files of the directory are looked at in a thread
+		# and the entries are then listed and their metadata read in steps of
+		# StepSize entries, so the GUI stays responsive. eServiceCenter and the
+		# movie index are only used on the main thread. The entries found so far
+		# are shown in batches, keeping sel (or whatever the user selects
+		# meanwhile) selected. callback is called when the list is complete;
+		# another reload cancels the running one.
+		if self.reloadDelayTimer is not None:
+			self.reloadDelayTimer.stop()
+			self.reloadDelayTimer = None
+		self.cancelLoad()
+		generation = self.loadGeneration
+		if root is None:
+			root = self.root
+		self.loadPending = []
+		self.loadSelected = self.instance and self.getCurrent()
+		self.loadSelection = sel or self.loadSelected
+		self.loadCallback = callback
+		self.loadBatchCallback = batchCallback
+		self.l.setBuildFunc(self.buildMovieListEntry)
+		rootPath = root and root.getPath() and os.path.normpath(root.getPath())
+		threads.deferToThread(readDirectory, rootPath).addCallbacks(boundFunction(self.startScan, generation, root, filter_tags), boundFunction(self.loadFailed, generation))
+
+	def startScan(self, generation, root, filter_tags, directory):
+		if generation != self.loadGeneration:
+			return
+		stats, index = directory
+		if index is not None:
+			addDirectoryIndex(index)
+		self.loadScan = self.scan(root, filter_tags, stats)
+		self.loadRoot = root
+		self.loadShown = 0
+		self.loadBatchSize = self.MinBatchSize
+		self.loadStep()
+
+	def loadStep(self):
+		generation = self.loadGeneration
+		try:
+			entries = next(self.loadScan)
+		except StopIteration as result:
+			self.loadReady(generation, self.loadRoot, result.value)
+			return
+		except Exception as e:
+			self.loadFailed(generation, e)
+			return
+		self.loadPending.extend(entries)
+		if len(self.loadPending) - self.loadShown >= self.loadBatchSize:
+			self.loadShown = len(self.loadPending)
+			self.loadBatchSize *= 2
+			self.showPending()
+		self.loadTimer.start(0, True)
+
+	def cancelLoad(self):
+		self.loadGeneration += 1
+		self.loadTimer.stop()
+		self.loadScan = None
+		self.loadRoot = None
+		self.loadPending = None
+		self.loadCallback = None
+		self.loadBatchCallback = None
+
+	def isLoading(self):
+		return self.loadPending is not None
+
+	def showPending(self):
+		self.list = self.sortList(list(self.loadPending), len([x for x in self.loadPending if x[0].flags & eServiceReference.mustDescent]), final=False)
+		self.setLoadedList()
+		if self.loadBatchCallback:
+			self.loadBatchCallback()
+
+	def loadReady(self, generation, root, result):
+		if generation != self.loadGeneration:
+			return
+		callback = self.loadCallback
+		self.cancelLoad()
+		if result is None:
+			print("listing of movies failed")
+			del self.list[:]
+		else:
+			self.finishLoad(root, *result)
+		self.setLoadedList()
+		if callback:
+			callback()
+
+	def loadFailed(self, generation, failure):
+		print("[MovieList] background load failed:", failure)
+		self.loadReady(generation, None, None)
+
+	def setLoadedList(self):
+		if self.instance is None:
+			self.l.setList(self.list)
+			return
+		current = self.getCurrent()
+		if current and current != self.loadSelected:
+			self.loadSelection = current # the user moved the selection
+		self.l.setList(self.list)
+		if self.loadSelection:
+			self.moveTo(self.loadSelection)
+		self.loadSelected = self.getCurrent()
+
 	def removeService(self, service):
 		index = self.findService(service)
 		if index is not None:
 			del self.list[index]
 			self.l.setList(self.list)
+		if self.loadPending:
+			self.loadPending = [x for x in self.loadPending if x[0] != service]
 
 	def findService(self, service):
 		if service is None:
@@ -642,16 +741,36 @@ class MovieList(GUIComponent):
 		# this lists our root service, then building a
 		# nice list
 		del self.list[:]
+		scan = self.scan(root, filter_tags)
+		try:
+			while True:
+				next(scan)
+		except StopIteration as e:
+			result = e.value
+		if result is None:
+			print("listing of movies failed")
+			return
+		self.finishLoad(root, *result)
+
+	def scan(self, root, filter_tags, stats=None):
+		# Lists root and reads the metadata of the entries. A generator, that
+		# yields the entries added by every StepSize services and returns the
+		# entries, the number of directories among them, the parent directory and
+		# what getTagMenu needs, or None when root can't be listed. stats are
+		# passed to getMovieInfo.
+		entries = []
 		serviceHandler = eServiceCenter.getInstance()
 		numberOfDirs = 0
 
 		reflist = root and serviceHandler.list(root)
 		if reflist is None:
-			print("listing of movies failed")
-			return
-		realtags = set()
+			return None
+		realtags = set() # tags of the movies which are not in the movie index
 		autotags = {}
 		rootPath = os.path.normpath(root.getPath())
+		index = getDirectoryIndex(rootPath)
+		listed = set() # file names, to drop deleted movies from the index
+		hidden = set() # file names of the movies hidden by the parental control
 		parent = None
 		# Don't navigate above the "root"
 		if len(rootPath) > 1 and (os.path.realpath(rootPath) != os.path.realpath(config.movielist.root.value)):
@@ -662,23 +781,38 @@ class MovieList(GUIComponent):
 					parent += '/'
 				ref = eServiceReference("2:0:1:0:0:0:0:0:0:0:" + parent.replace(':', '%3a'))
 				ref.flags = eServiceReference.flagDirectory
-				self.list.append((ref, None, 0, -1))
+				entries.append((ref, None, 0, -1))
 				numberOfDirs += 1
+		batchStart = 0
+		count = 0
 		while True:
+			count += 1
+			if count % self.StepSize == 0:
+				yield entries[batchStart:]
+				batchStart = len(entries)
 			serviceref = reflist.getNext()
 			if not serviceref.valid():
 				break
+			listed.add(os.path.basename(serviceref.getPath()))
 			if config.ParentalControl.servicepinactive.value and config.ParentalControl.storeservicepin.value != "never":
 				from Components.ParentalControl import parentalControl
 				if not parentalControl.sessionPinCached and parentalControl.isProtected(serviceref) and config.ParentalControl.storeservicepin.value != 'never' and config.ParentalControl.hideBlacklist.value:
+					hidden.add(os.path.basename(serviceref.getPath()))
 					continue
-			info = serviceHandler.info(serviceref)
+			if serviceref.flags & eServiceReference.mustDescent:
+				info = serviceHandler.info(serviceref) or justStubInfo
+				entries.append((serviceref, info, info.getInfo(serviceref, iServiceInformation.sTimeCreate), -1))
+				numberOfDirs += 1
+				continue
+			info = getMovieInfo(serviceref, stats)
 			if info is None:
 				info = justStubInfo
 			begin = info.getInfo(serviceref, iServiceInformation.sTimeCreate)
-			if serviceref.flags & eServiceReference.mustDescent:
-				self.list.append((serviceref, info, begin, -1))
-				numberOfDirs += 1
+			if isinstance(info, MovieInfo) and info.index is index:
+				# the tags are in the movie index
+				fileName = os.path.basename(serviceref.getPath())
+				if filter_tags is None or index.hasTags(fileName, filter_tags):
+					entries.append((serviceref, info, begin, -1))
 				continue
 			# convert separe-separated list of tags into a set
 			this_tags = info.getInfoString(serviceref, iServiceInformation.sTags).split(' ')
@@ -704,30 +838,56 @@ class MovieList(GUIComponent):
 					print("Skipping", name, "tags=", this_tags, " filter=", filter_tags)
 					continue
 
-			self.list.append((serviceref, info, begin, -1))
+			entries.append((serviceref, info, begin, -1))
+		return entries, numberOfDirs, parent, (index, listed, hidden, realtags, autotags)
+
+	def getTagMenu(self, index, listed, hidden, realtags, autotags):
+		# Drops the movies which were not listed from the index and returns the
+		# tag menu. Called once the listing is complete.
+		index.retain(listed)
+		if realtags or autotags or hidden:
+			# the tag menu of the index doesn't fit
+			for name, entry in sorted(index.movies.items()):
+				if name not in hidden:
+					tags, auto = getTags(entry)
+					if auto:
+						for tag in tags:
+							autotags.setdefault(tag, []).append(entry["name"])
+					else:
+						realtags.update(tags)
+			return buildTagMenu(realtags, autotags)
+		return dict(index.getTagMenu())
 
-		self.firstFileEntry = numberOfDirs
-		self.parentDirectory = 0
+	def sortList(self, entries, numberOfDirs, final=True):
+		# Returns entries sorted for the sort type. Batches of a running
+		# background load are not shuffled yet.
 		if self.sort_type == MovieList.SORT_ALPHANUMERIC:
-			self.list.sort(key=self.buildAlphaNumericSortKey)
+			entries.sort(key=self.buildAlphaNumericSortKey)
 		elif self.sort_type == MovieList.SORT_ALPHANUMERIC_FLAT:
-			self.list.sort(key=self.buildAlphaNumericFlatSortKey)
+			entries.sort(key=self.buildAlphaNumericFlatSortKey)
 		elif self.sort_type == MovieList.SORT_ALPHANUMERIC_FLAT_REVERSE:
-			self.list.sort(key=self.buildAlphaNumericFlatSortKey, reverse=True)
+			entries.sort(key=self.buildAlphaNumericFlatSortKey, reverse=True)
 		elif self.sort_type == MovieList.SORT_RECORDED:
-			self.list.sort(key=self.buildBeginTimeSortKey)
+			entries.sort(key=self.buildBeginTimeSortKey)
 		else:
 			#always sort first this way to avoid shuffle and reverse-sort directories
-			self.list.sort(key=self.buildGroupwiseSortkey)
+			entries.sort(key=self.buildGroupwiseSortkey)
 			if self.sort_type == MovieList.SHUFFLE:
-				dirlist = self.list[:numberOfDirs]
-				shufflelist = self.list[numberOfDirs:]
-				random.shuffle(shufflelist)
-				self.list = dirlist + shufflelist
+				if final:
+					dirlist = entries[:numberOfDirs]
+					shufflelist = entries[numberOfDirs:]
+					random.shuffle(shufflelist)
+					entries = dirlist + shufflelist
 			elif self.sort_type == MovieList.SORT_ALPHANUMERIC_REVERSE:
-				self.list = self.list[:numberOfDirs] + sorted(self.list[numberOfDirs:], key=self.buildAlphaNumericSortKey, reverse=True)
+				entries = entries[:numberOfDirs] + sorted(entries[numberOfDirs:], key=self.buildAlphaNumericSortKey, reverse=True)
 			elif self.sort_type == MovieList.SORT_RECORDED_REVERSE:
-				self.list = self.list[:numberOfDirs] + sorted(self.list[numberOfDirs:], key=self.buildBeginTimeSortKey, reverse=True)
+				entries = entries[:numberOfDirs] + sorted(entries[numberOfDirs:], key=self.buildBeginTimeSortKey, reverse=True)
+		return entries
+
+	def finishLoad(self, root, entries, numberOfDirs, parent, tagInfo):
+		self.firstFileEntry = numberOfDirs
+		self.parentDirectory = 0
+		self.list = self.sortList(entries, numberOfDirs)
 
 		if self.root and numberOfDirs > 0:
 			rootPath = os.path.normpath(self.root.getPath())
@@ -745,51 +905,8 @@ class MovieList(GUIComponent):
 							self.parentDirectory = index
 							break
 		self.root = root
-		# finally, store a list of all tags which were found. these can be presented
-		# to the user to filter the list
-		# ML: Only use the tags that occur more than once in the list OR that were
-		# really in the tag set of some file.
-
-		# reverse the dictionary to see which unique movie each tag now references
-		rautotags = {}
-		for tag, movies in autotags.items():
-			if (len(movies) > 1):
-				movies = tuple(movies) # a tuple can be hashed, but a list not
-				item = rautotags.get(movies, [])
-				if not item:
-					rautotags[movies] = item
-				item.append(tag)
-		self.tags = {}
-		for movies, tags in rautotags.items():
-			movie = movies[0]
-			# format the tag lists so that they are in 'original' order
-			tags.sort(key=movie.find)
-			first = movie.find(tags[0])
-			last = movie.find(tags[-1]) + len(tags[-1])
-			match = movie
-			start = 0
-			end = len(movie)
-			# Check if the set has a complete sentence in common, and how far
-			for m in movies[1:]:
-				if m[start:end] != match:
-					if not m.startswith(movie[:last]):
-						start = first
-					if not m.endswith(movie[first:]):
-						end = last
-					match = movie[start:end]
-					if m[start:end] != match:
-						match = ''
-						break
-			# Adding the longest common sentence to the tag list
-			if match:
-				self.tags[match] = set(tags)
-			else:
-				match = ' '.join(tags)
-				if (len(match) > 2) or (match in realtags): #Omit small words, only for auto tags
-					self.tags[match] = set(tags)
-		# Adding the realtags to the tag list
-		for tag in realtags:
-			self.tags[tag] = set([tag])
+		# the tags which were found, these can be presented to the user to filter the list
+		self.tags = self.getTagMenu(*tagInfo)
 
 	def buildAlphaNumericSortKey(self, x):
 		# x = ref,info,begin,...
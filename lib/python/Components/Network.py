@@ -33,8 +33,8 @@ class Network:
 
 	def onRemoteRootFS(self):
 		if self.remoteRootFS is None:
-			from Components import Harddisk
-			for parts in Harddisk.getProcMounts():
+			from Components.MountTable import mountTable
+			for parts in mountTable.getMounts():
 				if parts[1] == '/' and parts[2] == 'nfs':
 					self.remoteRootFS = True
 					break
@@ -4,6 +4,7 @@ from Components.Console import Console
 from Components.NimManager import nimmanager
 from Components.Opkg import OpkgComponent
 from Components.config import config, configfile
+from Tools.Alternatives import reloadBouquets
 from Tools.HardwareInfo import HardwareInfo
 from enigma import eConsoleAppContainer, eDVBDB
 import os
@@ -305,7 +306,7 @@ class PackageInfoHandler:
 	def installNext(self, *args, **kwargs):
 		if self.reloadFavourites:
 			self.reloadFavourites = False
-			db = eDVBDB.getInstance().reloadBouquets()
+			reloadBouquets()
 
 		self.currentIndex += 1
 		attributes = self.installingAttributes
@@ -1,11 +1,153 @@
 import os
+import sys
 from bisect import insort
+from inspect import CO_VARARGS, CO_VARKEYWORDS, Parameter, Signature
+from json import dump as json_dump, load as json_load
+from time import monotonic
+from types import FunctionType, MethodType, SimpleNamespace
+from Components.config import config
 from Tools.Directories import fileExists, resolveFilename, SCOPE_PLUGINS
 from Tools.Import import my_import
 from Tools.Profile import profile
 from Plugins.Plugin import PluginDescriptor
 import keymapparser
 
+# Plugin manifest.
+#
+# Importing every plugin at boot, with all the screens and modules they
+# import, takes long. So what the descriptors of each plugin look like is kept
+# in ManifestFile, with the time the plugin directory or a file in it was last
+# changed. A plugin whose descriptors are all in LazyWhere, called only when
+# the user asks for the plugin, is then not imported at boot. Its descriptors
+# are made from the manifest and it is imported when one of them is called
+# first. Plugins with other descriptors, like WHERE_AUTOSTART or
+# WHERE_SESSIONSTART, and plugins that set LoadAtBoot = True in plugin.py,
+# because importing them does something, are imported at boot as before.
+# The manifest is refreshed whenever a plugin is imported, so a plugin whose
+# descriptors depend on its settings shows the new ones after the next reload.
+
+ManifestFile = "/etc/enigma2/pluginmanifest.json"
+ManifestVersion = 2
+LazyWhere = frozenset((
+	PluginDescriptor.WHERE_EXTENSIONSMENU,
+	PluginDescriptor.WHERE_MAINMENU,
+	PluginDescriptor.WHERE_PLUGINMENU,
+	PluginDescriptor.WHERE_MOVIELIST,
+	PluginDescriptor.WHERE_MENU,
+	PluginDescriptor.WHERE_TELETEXT,
+	PluginDescriptor.WHERE_FILESCAN,
+	PluginDescriptor.WHERE_EVENTINFO,
+	PluginDescriptor.WHERE_AUDIOMENU,
+	PluginDescriptor.WHERE_CHANNEL_CONTEXT_MENU
+))
+
+
+def getModificationTime(path):
+	# The newest of the plugin directory and the files in it, so files replaced
+	# in place are seen as well.
+	mtime = os.stat(path).st_mtime
+	with os.scandir(path) as entries:
+		for entry in entries:
+			if entry.is_file():
+				mtime = max(mtime, entry.stat().st_mtime)
+	return mtime
+
+
+def describeDescriptor(p):
+	# Returns what is needed to make p again without importing the plugin, or
+	# None if the plugin has to be imported at boot for p.
+	fnc = p.fnc
+	if type(p) is not PluginDescriptor or p.wakeupfnc or p._icon is not None or not set(p.where) <= LazyWhere or not isinstance(fnc, (FunctionType, MethodType)):
+		return None
+	if not isinstance(p.name, str) or not isinstance(p.description, str):
+		return None
+	code = fnc.__code__
+	if code.co_flags & CO_VARARGS:
+		return None
+	argcount = code.co_argcount + code.co_kwonlyargcount
+	first = 1 if isinstance(fnc, MethodType) else 0 # self is not passed to a bound method
+	return {
+		"name": p.name,
+		"where": p.where,
+		"description": p.description,
+		"icon": p.iconstr,
+		"needsRestart": p.needsRestart,
+		"internal": p.internal,
+		"weight": p.weight,
+		"args": list(code.co_varnames[first:code.co_argcount]),
+		"kwonly": list(code.co_varnames[code.co_argcount:argcount]),
+		"varkw": code.co_varnames[argcount] if code.co_flags & CO_VARKEYWORDS else None
+	}
+
+
+def describePlugin(path, module, plugins):
+	descriptors = [describeDescriptor(p) for p in plugins]
+	return {
+		"mtime": getModificationTime(path),
+		"keymap": fileExists(os.path.join(path, "keymap.xml")),
+		"lazy": bool(descriptors) and None not in descriptors and not getattr(module, "LoadAtBoot", False),
+		"descriptors": [x for x in descriptors if x]
+	}
+
+
+class PluginFunction:
+	# Stands in for the fnc of a descriptor of a plugin that is not imported
+	# yet. It has the arguments of the real fnc, as some callers look at them.
+	def __init__(self, plugin, descriptor, meta):
+		self.plugin = plugin
+		self.descriptor = descriptor
+		self.__code__ = SimpleNamespace(co_varnames=tuple(meta["args"] + meta["kwonly"]), co_argcount=len(meta["args"]), co_kwonlyargcount=len(meta["kwonly"]))
+		parameters = [Parameter(x, Parameter.POSITIONAL_OR_KEYWORD) for x in meta["args"]] + [Parameter(x, Parameter.KEYWORD_ONLY) for x in meta["kwonly"]]
+		if meta["varkw"]:
+			parameters.append(Parameter(meta["varkw"], Parameter.VAR_KEYWORD))
+		self.__signature__ = Signature(parameters)
+
+	def __call__(self, *args, **kwargs):
+		self.plugin.load()
+		if self.descriptor.fnc is not self:
+			return self.descriptor.fnc(*args, **kwargs)
+		if PluginDescriptor.WHERE_MENU in self.descriptor.where:
+			return [] # the plugin failed to load
+
+
+class LazyPlugin:
+	# A plugin known from the manifest, imported when it is used first.
+	def __init__(self, component, category, pluginname, path, entry):
+		self.component = component
+		self.category = category
+		self.pluginname = pluginname
+		self.path = path
+		self.entry = entry
+		self.loaded = False
+		self.descriptors = []
+		for meta in entry["descriptors"]:
+			p = PluginDescriptor(name=meta["name"], where=meta["where"], description=meta["description"], icon=meta["icon"], needsRestart=meta["needsRestart"], internal=meta["internal"], weight=meta["weight"])
+			p.fnc = PluginFunction(self, p, meta)
+			self.descriptors.append(p)
+
+	def load(self):
+		if self.loaded:
+			return
+		self.loaded = True
+		key = self.category + "/" + self.pluginname
+		imported = self.component.importPlugin(self.category, self.pluginname, self.path)
+		if imported is None:
+			return
+		module, plugins = imported
+		print("[PluginComponent] Imported %s on first use in %.0f ms" % (key, self.component.importTimes[key] * 1000))
+		unused = list(plugins)
+		for p in self.descriptors:
+			real = next((x for x in unused if x.name == p.name and x.where == p.where), None)
+			if real is None:
+				print("[PluginComponent] %s no longer has '%s', reload the plugins" % (key, p.name))
+				continue
+			unused.remove(real)
+			p.fnc = real.fnc
+			p.wakeupfnc = real.wakeupfnc
+		entry = describePlugin(self.path, module, plugins)
+		if entry != self.entry:
+			self.component.updateManifest(key, entry)
+
 
 class PluginComponent:
 	firstRun = True
@@ -15,6 +157,9 @@ class PluginComponent:
 		self.plugins = {}
 		self.pluginList = []
 		self.installedPluginList = []
+		self.lazyPlugins = {} # "category/name" -> LazyPlugin
+		self.importTimes = {} # "category/name" -> seconds
+		self.manifest = None
 		self.setPluginPrefix("Plugins.")
 		self.resetWarnings()
 
@@ -40,8 +185,76 @@ class PluginComponent:
 			if x == PluginDescriptor.WHERE_AUTOSTART:
 				plugin(reason=1)
 
+	def importPlugin(self, category, pluginname, path):
+		# Imports a plugin, returns its module and descriptors or None.
+		started = monotonic()
+		try:
+			module = my_import('.'.join(["Plugins", category, pluginname, "plugin"]))
+			plugins = module.Plugins(path=path)
+		except Exception as exc:
+			print("Plugin ", category + "/" + pluginname, "failed to load:", exc)
+			# supress errors due to missing plugin.py* files (badly removed plugin)
+			for fn in ('plugin.py', 'plugin.pyc'):
+				if os.path.exists(os.path.join(path, fn)):
+					self.warnings.append((category + "/" + pluginname, str(exc)))
+					from traceback import print_exc
+					print_exc()
+					break
+			else:
+				print("Plugin probably removed, but not cleanly in", path)
+				try:
+					os.rmdir(path)
+				except:
+					pass
+			return None
+		self.importTimes[category + "/" + pluginname] = monotonic() - started
+
+		# allow single entry not to be a list
+		if not isinstance(plugins, list):
+			plugins = [plugins]
+		return module, [p for p in plugins if p]
+
+	def loadManifest(self):
+		try:
+			with open(ManifestFile, "r") as f:
+				manifest = json_load(f)
+			if isinstance(manifest, dict) and manifest.get("version") == ManifestVersion and isinstance(manifest.get("plugins"), dict):
+				return manifest
+		except FileNotFoundError:
+			pass
+		except Exception as e:
+			print("[PluginComponent] Failed to read %s: %s" % (ManifestFile, e))
+		return {}
+
+	def useManifest(self):
+		# The names and descriptions in the manifest are translated.
+		from Components.Language import language
+		return config.usage.plugin_manifest.value and self.manifest.get("language") == language.getLanguage()
+
+	def saveManifest(self, plugins):
+		from Components.Language import language
+		manifest = {"version": ManifestVersion, "language": language.getLanguage(), "plugins": plugins}
+		if manifest == self.manifest:
+			return
+		self.manifest = manifest
+		try:
+			with open(ManifestFile + ".writing", "w") as f:
+				json_dump(manifest, f)
+			os.rename(ManifestFile + ".writing", ManifestFile)
+		except Exception as e:
+			print("[PluginComponent] Failed to write %s: %s" % (ManifestFile, e))
+
+	def updateManifest(self, key, entry):
+		plugins = dict(self.manifest.get("plugins", {}))
+		plugins[key] = entry
+		self.saveManifest(plugins)
+
 	def readPluginList(self, directory):
 		"""enumerates plugins"""
+		if self.manifest is None:
+			self.manifest = self.loadManifest()
+		manifest = self.manifest.get("plugins", {}) if self.useManifest() else {}
+		newManifest = {}
 		new_plugins = []
 		for c in os.listdir(directory):
 			directory_category = os.path.join(directory, c)
@@ -52,44 +265,35 @@ class PluginComponent:
 					continue
 				path = os.path.join(directory_category, pluginname)
 				if os.path.isdir(path):
-						profile('plugin ' + pluginname)
-						try:
-							plugin = my_import('.'.join(["Plugins", c, pluginname, "plugin"]))
-							plugins = plugin.Plugins(path=path)
-						except Exception as exc:
-							print("Plugin ", c + "/" + pluginname, "failed to load:", exc)
-							# supress errors due to missing plugin.py* files (badly removed plugin)
-							for fn in ('plugin.py', 'plugin.pyc'):
-								if os.path.exists(os.path.join(path, fn)):
-									self.warnings.append((c + "/" + pluginname, str(exc)))
-									from traceback import print_exc
-									print_exc()
-									break
-							else:
-								print("Plugin probably removed, but not cleanly in", path)
-								try:
-									os.rmdir(path)
-								except:
-									pass
-							continue
-
-						# allow single entry not to be a list
-						if not isinstance(plugins, list):
-							plugins = [plugins]
+						key = c + "/" + pluginname
+						entry = manifest.get(key)
+						if entry and entry["lazy"] and '.'.join(["Plugins", c, pluginname, "plugin"]) not in sys.modules and entry["mtime"] == getModificationTime(path):
+							lazyPlugin = self.lazyPlugins.get(key)
+							if lazyPlugin is None or lazyPlugin.entry != entry:
+								lazyPlugin = self.lazyPlugins[key] = LazyPlugin(self, c, pluginname, path, entry)
+							plugins = lazyPlugin.descriptors
+						else:
+							profile('plugin ' + pluginname)
+							imported = self.importPlugin(c, pluginname, path)
+							if imported is None:
+								continue
+							module, plugins = imported
+							entry = describePlugin(path, module, plugins)
+							self.lazyPlugins.pop(key, None)
+						newManifest[key] = entry
 
 						for p in plugins:
-							if p:
-								p.path = path
-								p.updateIcon(path)
-								new_plugins.append(p)
+							p.path = path
+							p.updateIcon(path)
+							new_plugins.append(p)
 
-						keymap = os.path.join(path, "keymap.xml")
-						if fileExists(keymap):
+						if entry["keymap"]:
 							try:
-								keymapparser.readKeymap(keymap)
+								keymapparser.readKeymap(os.path.join(path, "keymap.xml"))
 							except Exception as exc:
 								print("keymap for plugin %s/%s failed to load: " % (c, pluginname), exc)
 								self.warnings.append((c + "/" + pluginname, str(exc)))
+		self.saveManifest(newManifest)
 
 		# build a diff between the old list of plugins and the new one
 		# internally, the "fnc" argument will be compared with __eq__
@@ -10,6 +10,8 @@ def InitRecordingConfig():
 	config.recording.debug = ConfigYesNo(default=False)
 	config.recording.ascii_filenames = ConfigYesNo(default=False)
 	config.recording.keep_timers = ConfigNumber(default=7)
+	config.recording.timers_journal = ConfigYesNo(default=False)
+	config.recording.timer_log_entries = ConfigNumber(default=0)
 	config.recording.filename_composition = ConfigSelection(default="standard", choices=[
 		("standard", _("standard")),
 		("event", _("Event name first")),
@@ -1,6 +1,7 @@
 from Components.VariableText import VariableText
 from enigma import eLabel, iPlayableService
 from Components.Renderer.Renderer import Renderer
+from Components.ChannelNumbers import channelNumbers
 
 
 class ChannelNumber(Renderer, VariableText):
@@ -14,6 +15,11 @@ class ChannelNumber(Renderer, VariableText):
 		if what == True or what[0] == self.CHANGED_SPECIFIC and what[1] == iPlayableService.evStart:
 			service = self.source.serviceref
 			num = service and service.getChannelNum() or None
+			if service and not num:
+				# references not coming from the channel list carry no number
+				num = channelNumbers.getServiceNumber(service)[0]
+				if not isinstance(num, int):
+					num = None
 			if num:
 				self.text = str(num)
 			else:
@@ -1,21 +1,35 @@
-from os import listdir, path as ospath
+from collections import OrderedDict
+from os import listdir, stat, path as ospath
 from re import sub
+from time import monotonic
 
-from enigma import ePixmap, ePicLoad, eServiceCenter, eServiceReference, iServiceInformation
+from enigma import ePixmap, ePicLoad, getDesktop, eServiceCenter, eServiceReference, iServiceInformation
 
 from Components.config import config
 from Components.Harddisk import harddiskmanager
 from Components.Renderer.Renderer import Renderer
 from Tools.Alternatives import GetWithAlternative
 from Tools.Directories import pathExists, SCOPE_CURRENT_SKIN, resolveFilename, sanitizeFilename
+from Tools.LoadPixmap import LoadPixmap, pixmapCache
 
 
 class PiconLocator:
+	# number of resolved service references to remember
+	MaxCachedNames = 2000
+	# seconds between checks of the search paths for new picons
+	RefreshInterval = 5
+	# seconds to remember that a service has no picon
+	MissingTimeout = 60
+
 	def __init__(self, piconDirectories=["picon"]):
 		harddiskmanager.on_partition_list_change.append(self.__onPartitionChange)
 		self.piconDirectories = piconDirectories
 		self.activePiconPath = None
 		self.searchPaths = []
+		self.piconFiles = {} # search path -> (mtime, set of picon file names)
+		self.piconNames = OrderedDict() # service reference -> picon path, least recently used first
+		self.missingNames = OrderedDict() # service reference -> time it was found without picon
+		self.lastRefresh = monotonic()
 		for mp in ("/usr/share/enigma2/", "/"):
 			self.__onMountpointAdded(mp)
 		for part in harddiskmanager.getMountedPartitions():
@@ -25,44 +39,73 @@ class PiconLocator:
 		for piconDirectory in self.piconDirectories:
 			try:
 				path = ospath.join(mountpoint, piconDirectory) + "/"
-				if ospath.isdir(path) and path not in self.searchPaths:
-					for fn in listdir(path):
-						if fn.endswith(".png") or fn.endswith(".svg"):
-							print("[PiconLocator] adding path:", path)
-							self.searchPaths.append(path)
-							break
+				if ospath.isdir(path) and path not in self.searchPaths and self.getPiconFiles(path):
+					print("[PiconLocator] adding path:", path)
+					self.searchPaths.append(path)
+					self.clearNames()
 			except:
 				pass
 
 	def __onMountpointRemoved(self, mountpoint):
 		for piconDirectory in self.piconDirectories:
 			path = ospath.join(mountpoint, piconDirectory) + "/"
+			self.piconFiles.pop(path, None)
 			try:
 				self.searchPaths.remove(path)
 				print("[PiconLocator] removed path:", path)
 			except:
 				pass
+			if self.activePiconPath == path:
+				self.activePiconPath = None
+		self.clearNames()
 
 	def __onPartitionChange(self, why, part):
 		if why == "add":
 			self.__onMountpointAdded(part.mountpoint)
 		elif why == "remove":
 			self.__onMountpointRemoved(part.mountpoint)
+		self.refresh()
+
+	def clearNames(self):
+		self.piconNames.clear()
+		self.missingNames.clear()
+
+	def refresh(self):
+		# list the search paths again which were modified since they were read
+		self.lastRefresh = monotonic()
+		for path, (mtime, files) in list(self.piconFiles.items()):
+			try:
+				modified = stat(path).st_mtime_ns != mtime
+			except OSError:
+				modified = True
+			if modified:
+				del self.piconFiles[path]
+				self.clearNames()
+
+	def getPiconFiles(self, path):
+		entry = self.piconFiles.get(path)
+		if entry is None:
+			try:
+				entry = (stat(path).st_mtime_ns, set(fn for fn in listdir(path) if fn.endswith(".png") or fn.endswith(".svg")))
+			except OSError:
+				entry = (None, set())
+			self.piconFiles[path] = entry
+		return entry[1]
 
 	def findPicon(self, service):
 		exts = [".png", ".svg"]
 		if self.activePiconPath is not None:
+			files = self.getPiconFiles(self.activePiconPath)
 			for ext in exts:
-				pngname = self.activePiconPath + service + ext
-				if pathExists(pngname):
-					return pngname
+				if service + ext in files:
+					return self.activePiconPath + service + ext
 		else:
 			for path in self.searchPaths:
+				files = self.getPiconFiles(path)
 				for ext in exts:
-					pngname = path + service + ext
-					if pathExists(pngname):
+					if service + ext in files:
 						self.activePiconPath = path
-						return pngname
+						return path + service + ext
 		return ""
 
 	def addSearchPath(self, value):
@@ -71,10 +114,35 @@ class PiconLocator:
 				value += "/"
 			if not value.startswith(("/media/net", "/media/autofs")) and value not in self.searchPaths:
 				self.searchPaths.append(value)
+				self.clearNames()
 
 	def getPiconName(self, serviceRef):
 		if serviceRef is None:
 			return ""
+		now = monotonic()
+		if now - self.lastRefresh >= self.RefreshInterval:
+			self.refresh() # picons may have been added or removed meanwhile
+		pngname = self.piconNames.get(serviceRef)
+		if pngname is not None:
+			self.piconNames.move_to_end(serviceRef)
+			return pngname
+		missing = self.missingNames.get(serviceRef)
+		if missing is not None and now - missing < self.MissingTimeout:
+			return ""
+		pngname = self.resolvePiconName(serviceRef)
+		if pngname:
+			self.missingNames.pop(serviceRef, None)
+			self.piconNames[serviceRef] = pngname
+			if len(self.piconNames) > self.MaxCachedNames:
+				self.piconNames.popitem(last=False)
+		else:
+			self.missingNames.pop(serviceRef, None)
+			self.missingNames[serviceRef] = now
+			if len(self.missingNames) > self.MaxCachedNames:
+				self.missingNames.popitem(last=False)
+		return pngname
+
+	def resolvePiconName(self, serviceRef):
 		service = eServiceReference(serviceRef)
 		if service.getPath().startswith("/") and serviceRef.startswith("1:"):  # for when serviceRef is a recording path
 			info = eServiceCenter.getInstance().info(eServiceReference(serviceRef))
@@ -119,6 +187,9 @@ class Picon(Renderer):
 		self.PicLoad = ePicLoad()
 		self.PicLoad.PictureData.get().append(self.updatePicon)
 		self.piconsize = (0, 0)
+		self.picLoadKey = None # cache key of the picon to show
+		self.decodeKey = None # cache key of the picon ePicLoad is decoding
+		self.nextDecode = None # picon to decode when ePicLoad is done
 		self.service_text = ""
 		self.lastPath = None
 		self.showPicon = True
@@ -129,6 +200,7 @@ class Picon(Renderer):
 				value += '/'
 			if value not in piconLocator.searchPaths:
 				piconLocator.searchPaths.append(value)
+				piconLocator.clearNames()
 
 	def applySkin(self, desktop, parent):
 		attribs = self.skinAttributes[:]
@@ -149,11 +221,34 @@ class Picon(Renderer):
 
 	GUI_WIDGET = ePixmap
 
+	def startDecode(self, pngname):
+		# ePicLoad decodes one picture at a time and drops the result of a
+		# running decode when another one is started, so a picon asked for
+		# meanwhile is decoded afterwards.
+		if self.decodeKey is not None:
+			self.nextDecode = pngname
+			return
+		self.nextDecode = None
+		self.decodeKey = ("ePicLoad", pngname, self.piconsize)
+		self.PicLoad.setPara((self.piconsize[0], self.piconsize[1], 0, 0, 1, 1, "#FF000000"))
+		if self.PicLoad.startDecode(pngname):
+			self.decodeKey = None
+
 	def updatePicon(self, picInfo=None):
+		# The picture is that of decodeKey, the service may have changed since.
+		key = self.decodeKey
+		self.decodeKey = None
 		ptr = self.PicLoad.getData()
-		if ptr is not None and self.instance:
-			self.instance.setPixmap(ptr.__deref__())
-			self.instance.show()
+		if ptr is not None and key is not None:
+			pixmapCache.put(key, ptr.__deref__())
+			if self.instance and key == self.picLoadKey:
+				self.instance.setPixmap(ptr.__deref__())
+				self.instance.show()
+		pngname = self.nextDecode
+		if pngname:
+			self.nextDecode = None
+			if ("ePicLoad", pngname, self.piconsize) == self.picLoadKey and pixmapCache.get(self.picLoadKey) is None:
+				self.startDecode(pngname)
 
 	def changed(self, what):
 		if self.instance:
@@ -175,11 +270,21 @@ class Picon(Renderer):
 				if self.pngname != pngname:
 					if pngname:
 						if self.usePicLoad:
-							self.PicLoad.setPara((self.piconsize[0], self.piconsize[1], 0, 0, 1, 1, "#FF000000"))
-							self.PicLoad.startDecode(pngname)
+							# decoded picons are shared through the pixmap cache
+							self.picLoadKey = ("ePicLoad", pngname, self.piconsize)
+							ptr = pixmapCache.get(self.picLoadKey)
+							if ptr is not None:
+								self.nextDecode = None
+								self.instance.setPixmap(ptr)
+								self.instance.show()
+							else:
+								self.startDecode(pngname)
 						else:
-							self.instance.setScale(1)
-							self.instance.setPixmapFromFile(pngname)
+							size = self.instance.size()
+							ptr = LoadPixmap(pngname, getDesktop(0), True, size.width(), size.height())
+							if ptr:
+								self.instance.setScale(1)
+								self.instance.setPixmap(ptr)
 							self.instance.show()
 					else:
 						self.instance.hide()
@@ -37,6 +37,7 @@ class ServiceList(GUIComponent):
 		self.serviceList = serviceList
 		GUIComponent.__init__(self)
 		self.l = eListboxServiceContent()  # noqa: E741
+		self.generation = 0 # counts refills and edits of the list
 
 		pic = LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, "icons/folder.png"))
 		pic and self.l.setPixmap(self.l.picFolder, pic)
@@ -460,23 +461,28 @@ class ServiceList(GUIComponent):
 		self.l.setRoot(root, justSet)
 		if not justSet:
 			self.l.sort()
+			self.generation += 1
 		self.selectionChanged()
 
 	def resetRoot(self):
 		index = self.instance.getCurrentIndex()
 		self.l.setRoot(self.root, False)
 		self.l.sort()
+		self.generation += 1
 		self.instance.moveSelectionTo(index)
 
 	def removeCurrent(self):
 		self.l.removeCurrent()
+		self.generation += 1
 
 	def addService(self, service, beforeCurrent=False):
 		self.l.addService(service, beforeCurrent)
+		self.generation += 1
 
 	def finishFill(self):
 		self.l.FillFinished()
 		self.l.sort()
+		self.generation += 1
 
 # stuff for multiple marks (edit mode / later multiepg)
 	def clearMarks(self):
@@ -504,6 +510,7 @@ class ServiceList(GUIComponent):
 	# just for movemode.. only one marked entry..
 	def setCurrentMarked(self, state):
 		self.l.setCurrentMarked(state)
+		self.generation += 1
 
 	def setMode(self, mode):
 		self.mode = mode
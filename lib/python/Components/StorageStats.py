@@ -0,0 +1,166 @@
+import os
+from time import time
+
+from Tools.CList import CList
+from Components.MountTable import mountTable
+
+# Free space of the recording locations and directory sizes.
+#
+# statvfs on a network mount can block for a long time, so the file systems
+# of the recording locations, and of every path asked for, are sampled from
+# the thread pool every SampleInterval seconds and after changes (see
+# invalidate), which the recording end, delete, move and trash can code
+# report. Everything is answered from memory together with the time it was
+# sampled; onUpdate is called with the path whenever new data for it arrives.
+#
+# The size of the files of every directory scanned for getTreeSize is kept
+# with the mtime of the directory. Later calls only list the directories
+# whose mtime changed, or which were reported by invalidate because files in
+# them grew.
+
+SampleInterval = 60 # seconds
+RequestLifetime = 600 # seconds a path asked for keeps being sampled
+
+
+def scanDirectory(directory):
+	# Returns the bytes of the files in directory and its subdirectories, like
+	# Tools.Directories.getSize counts them.
+	size = 0
+	subdirs = []
+	with os.scandir(directory) as entries:
+		for entry in entries:
+			try:
+				if entry.is_dir():
+					if not entry.is_symlink():
+						subdirs.append(entry.path)
+				else:
+					size += entry.stat().st_size
+			except OSError: # deleted meanwhile
+				pass
+	return size, subdirs
+
+
+class StorageStats:
+	def __init__(self):
+		self.space = {} # path -> [statvfs result, time]
+		self.requested = {} # path -> time it was last asked for
+		self.sampling = set()
+		self.sizes = {} # directory -> [bytes of its files, subdirectories, mtime]
+		self.onUpdate = CList()
+		self.timer = None
+
+	def start(self):
+		# Samples the recording locations periodically, needs the main loop.
+		if self.timer is None:
+			from enigma import eTimer
+			self.timer = eTimer()
+			self.timer.callback.append(self.sampleAll)
+			mountTable.onChange.append(self.sampleAll)
+		self.sampleAll()
+
+	def getLocations(self):
+		from Components.config import config
+		from Components.UsageConfig import defaultMoviePath, preferredTimerPath, preferredInstantRecordPath
+		locations = [defaultMoviePath(), preferredTimerPath(), preferredInstantRecordPath(), config.usage.timeshift_path.value, config.movielist.last_videodir.value]
+		if hasattr(config.movielist, "videodirs"):
+			locations += config.movielist.videodirs.value
+		return set(os.path.normpath(path) for path in locations if path and os.path.isabs(path))
+
+	def sampleAll(self):
+		now = time()
+		for path, requested in list(self.requested.items()):
+			if now - requested > RequestLifetime:
+				del self.requested[path]
+		try:
+			locations = self.getLocations()
+		except Exception as e:
+			print("[StorageStats] Failed to get the recording locations:", e)
+			locations = set()
+		paths = locations | set(self.requested)
+		for path in list(self.space):
+			if path not in paths:
+				del self.space[path]
+		for path in paths:
+			self.sample(path)
+		if self.timer:
+			self.timer.startLongTimer(SampleInterval)
+
+	def sample(self, path):
+		if path in self.sampling:
+			return # the last statvfs of path still hangs
+		from twisted.internet import threads
+		self.sampling.add(path)
+		threads.deferToThread(os.statvfs, path).addCallbacks(self.sampled, self.sampleFailed, callbackArgs=(path,), errbackArgs=(path,))
+
+	def sampled(self, stat, path):
+		self.sampling.discard(path)
+		self.space[path] = [stat, time()]
+		self.onUpdate(path)
+
+	def sampleFailed(self, failure, path):
+		self.sampling.discard(path)
+		if self.space.pop(path, None) is not None:
+			self.onUpdate(path)
+
+	def getStat(self, path):
+		# Returns the last statvfs result of the file system of path and the time
+		# it was taken, or (None, 0) while there is none yet. Local file systems
+		# are sampled right away the first time.
+		path = os.path.normpath(path)
+		self.requested[path] = time()
+		entry = self.space.get(path)
+		if entry is not None:
+			return entry[0], entry[1]
+		device = mountTable.getDevice(mountTable.getMountpoint(path)) or ""
+		if device.startswith("/dev/") or self.timer is None:
+			try:
+				entry = self.space[path] = [os.statvfs(path), time()]
+				return entry[0], entry[1]
+			except OSError:
+				return None, 0
+		self.sample(path)
+		return None, 0
+
+	def getTreeSize(self, path):
+		# Returns the size of all files in and below the directory path.
+		size = 0
+		pending = [os.path.normpath(path)]
+		while pending:
+			directory = pending.pop()
+			try:
+				mtime = os.stat(directory).st_mtime_ns
+				entry = self.sizes.get(directory)
+				if entry is None or entry[2] != mtime:
+					old = entry
+					entry = self.sizes[directory] = list(scanDirectory(directory)) + [mtime]
+					for subdir in set(old[1] if old else ()) - set(entry[1]): # removed or renamed
+						self.dropSizes(subdir)
+			except OSError: # like os.walk
+				continue
+			size += entry[0]
+			pending += entry[1]
+		return size
+
+	def dropSizes(self, directory):
+		# forgets directory and the directories below it
+		pending = [directory]
+		while pending:
+			entry = self.sizes.pop(pending.pop(), None)
+			if entry is not None:
+				pending += entry[1]
+
+	def invalidate(self, path):
+		# Files or directories were added, removed or changed at path, the free
+		# space of its file system is sampled again and the sizes of path and its
+		# directory are counted again.
+		path = os.path.normpath(path)
+		self.dropSizes(path)
+		self.sizes.pop(os.path.dirname(path), None)
+		if self.timer is not None and self.space:
+			mountpoint = mountTable.getMountpoint(os.path.dirname(os.path.normpath(path)))
+			for location in list(self.space):
+				if mountTable.getMountpoint(location) == mountpoint:
+					self.sample(location)
+
+
+storageStats = StorageStats()
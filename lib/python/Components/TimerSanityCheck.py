@@ -1,17 +1,97 @@
 import NavigationInstance
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+from sys import maxsize
 from time import localtime, mktime, gmtime, time
 from enigma import iServiceInformation, eServiceCenter, eServiceReference, getBestPlayableServiceReference
 from timer import TimerEntry
 import RecordTimer
+from Tools.Alternatives import checkBouquets, onBouquetsChanged
 from Tools.CIHelper import cihelper
 from Components.config import config
 
+# tuner type needed for a transponder, the services of a transponder all need the same
+tunerTypeCache = {}
+onBouquetsChanged.append(tunerTypeCache.clear)
+
+
+def getServiceTunerType(serviceHandler, ref):
+	checkBouquets()
+	key = (ref.type, ref.getUnsignedData(2), ref.getUnsignedData(3), ref.getUnsignedData(4))
+	tunerType = tunerTypeCache.get(key)
+	if tunerType is None:
+		serviceInfo = serviceHandler.info(ref)
+		serviceInfo = serviceInfo and serviceInfo.getInfoObject(ref, iServiceInformation.sTransponderData)
+		tunerType = tunerTypeCache[key] = serviceInfo and serviceInfo.get("tuner_type", "UNKNOWN") or "UNKNOWN"
+	return tunerType
+
+
+class TimerConflictIndex:
+	# Sweep-line of the timers in RecordTimer.timer_list, updated incrementally
+	# when timers are added to or removed from the list. Single timers are kept
+	# sorted by begin time, so the timers chained to a new timer by overlapping
+	# intervals can be found without walking the whole list. The begin and end
+	# time stored on insertion are used for removal, as they may have been
+	# changed in the timer already. Only loading timers.xml checks against it,
+	# adding and editing timers checks the whole list to report conflicts
+	# between other timers too.
+	def __init__(self):
+		self.begins = [] # sorted (begin, sequence, end, timer) of the single timers
+		self.items = {}
+		self.repeating = {} # ordered set of the repeating timers
+		self.maxduration = 0
+		self.counter = count()
+
+	def add(self, timer):
+		self.remove(timer)
+		if timer.repeated:
+			self.items[timer] = None
+			self.repeating[timer] = None
+		else:
+			item = (timer.begin, next(self.counter), timer.end, timer)
+			insort(self.begins, item)
+			self.items[timer] = item
+			self.maxduration = max(self.maxduration, timer.end - timer.begin)
+
+	def remove(self, timer):
+		if timer in self.items:
+			item = self.items.pop(timer)
+			if item is None:
+				del self.repeating[timer]
+			else:
+				del self.begins[bisect_left(self.begins, item)]
+
+	def getOverlapping(self, begin, end):
+		lo = bisect_left(self.begins, (begin - self.maxduration,))
+		hi = bisect_right(self.begins, (end, maxsize))
+		return [item[3] for item in self.begins[lo:hi] if item[2] >= begin]
+
+	def getCluster(self, begin, end):
+		# all single timers linked to begin..end by a chain of overlapping
+		# timers, timers outside of it can not influence the tuner allocation
+		cluster = {}
+		pending = [(begin, end)]
+		while pending:
+			begin, end = pending.pop()
+			for timer in self.getOverlapping(begin, end):
+				if timer not in cluster:
+					cluster[timer] = None
+					pending.append((timer.begin, timer.end))
+		return cluster
+
+	def getRepeating(self):
+		return list(self.repeating)
+
 
 class TimerSanityCheck:
-	def __init__(self, timerlist, newtimer=None):
+	def __init__(self, timerlist, newtimer=None, index=None):
+		# index is the TimerConflictIndex of timerlist, when given only the
+		# overlap window of a single newtimer is simulated, so conflicts between
+		# other timers outside of it are not found
 		self.localtimediff = 25 * 3600 - mktime(gmtime(25 * 3600))
 		self.timerlist = timerlist
 		self.newtimer = newtimer
+		self.index = index
 		self.simultimer = []
 		self.rep_eventlist = []
 		self.nrep_eventlist = []
@@ -54,6 +134,15 @@ class TimerSanityCheck:
 						return True
 		return False
 
+	def getCheckTimerList(self):
+		if self.index is None or self.newtimer.repeated:
+			return self.timerlist
+		# the single timers overlapping the new one (directly or through other
+		# timers) and all repeating timers, by next activation like timer_list
+		timers = self.index.getCluster(self.newtimer.begin, self.newtimer.end)
+		timers.update(dict.fromkeys(self.index.getRepeating()))
+		return sorted(timers)
+
 	def checkTimerlist(self, ext_timer=None):
 		#with special service for external plugins
 		# Entries in eventlist
@@ -102,7 +191,7 @@ class TimerSanityCheck:
 # now process existing timers
 		self.check_timerlist = []
 		idx = 0
-		for timer in self.timerlist:
+		for timer in self.getCheckTimerList():
 			if timer != self.newtimer:
 				if timer.disabled or not timer.conflict_detection or not timer.service_ref or '%3a//' in timer.service_ref.ref.toString() or timer.state == TimerEntry.StateEnded:
 					continue
@@ -226,21 +315,15 @@ class TimerSanityCheck:
 							tunerType.append(feinfo.getFrontendData().get("tuner_type", "UNKNOWN"))
 						feinfo = None
 				else: # tune failed.. so we must go another way to get service type (DVB-S, DVB-T, DVB-C)
-
-					def getServiceType(ref): # helper function to get a service type of a service reference
-						serviceInfo = serviceHandler.info(ref)
-						serviceInfo = serviceInfo and serviceInfo.getInfoObject(ref, iServiceInformation.sTransponderData)
-						return serviceInfo and serviceInfo.get("tuner_type", "UNKNOWN") or "UNKNOWN"
-
 					if ref and ref.flags & eServiceReference.isGroup: # service group ?
 						serviceList = serviceHandler.list(ref) # get all alternative services
 						if serviceList:
 							for ref in serviceList.getContent("R"): # iterate over all group service references
-								type = getServiceType(ref)
+								type = getServiceTunerType(serviceHandler, ref)
 								if not type in tunerType: # just add single time
 									tunerType.append(type)
 					elif ref:
-						tunerType.append(getServiceType(ref))
+						tunerType.append(getServiceTunerType(serviceHandler, ref))
 
 				if event[2] == -1: # new timer
 					newTimerTunerType = tunerType
@@ -31,6 +31,8 @@ def InitUsageConfig():
 
 	def alternativeNumberModeChange(configElement):
 		eDVBDB.getInstance().setNumberingMode(configElement.value)
+		from Components.ChannelNumbers import channelNumbers
+		channelNumbers.clear()
 		refreshServiceList()
 	config.usage.alternative_number_mode.addNotifier(alternativeNumberModeChange)
 
@@ -136,6 +138,11 @@ def InitUsageConfig():
 	config.usage.movielist_trashcan = ConfigYesNo(default=True)
 	config.usage.movielist_trashcan_days = ConfigNumber(default=8)
 	config.usage.movielist_trashcan_reserve = ConfigNumber(default=40)
+	config.usage.movielist_trashcan_scan_budget = ConfigSelection(default="2000", choices=[
+		("500", "500"),
+		("2000", "2000"),
+		("10000", "10000"),
+		("0", _("Unlimited"))])
 	config.usage.on_movie_start = ConfigSelection(default="resume", choices=[
 		("ask yes", _("Ask user") + " " + _("default") + " " + _("yes")),
 		("ask no", _("Ask user") + " " + _("default") + " " + _("no")),
@@ -166,6 +173,8 @@ def InitUsageConfig():
 		("no", _("no")),
 		("yes", _("yes")),
 		("except", _("No, except Wakeup timer"))])
+	config.usage.profile_imports = ConfigYesNo(default=False) # read by Tools.ImportProfiler before config is loaded
+	config.usage.plugin_manifest = ConfigYesNo(default=True)
 
 	config.usage.wakeup_enabled = ConfigSelection(default="no", choices=[
 		("no", _("no")),
@@ -319,6 +328,7 @@ def InitUsageConfig():
 		('i', _("Icons")),
 	])
 	config.usage.movielist_unseen = ConfigYesNo(default=False)
+	config.usage.movielist_background_load = ConfigYesNo(default=True)
 
 	config.usage.swap_snr_on_osd = ConfigYesNo(default=False)
 
@@ -339,6 +349,12 @@ def InitUsageConfig():
 	config.usage.frontend_priority.addNotifier(PreferredTunerChanged)
 
 	config.usage.show_picon_in_display = ConfigYesNo(default=True)
+	config.usage.pixmap_cache_size = ConfigSelection(default="16", choices=[("0", _("Disabled"))] + [(str(x), _("%d MB") % x) for x in (4, 8, 16, 32, 64)])
+
+	def pixmapCacheSizeChanged(configElement):
+		from Tools.LoadPixmap import pixmapCache
+		pixmapCache.setBudget(int(configElement.value) * 1024 * 1024)
+	config.usage.pixmap_cache_size.addNotifier(pixmapCacheSizeChanged)
 	config.usage.hide_zap_errors = ConfigYesNo(default=False)
 	config.usage.show_cryptoinfo = ConfigYesNo(default=True)
 	config.usage.show_eit_nownext = ConfigYesNo(default=True)
@@ -593,6 +609,12 @@ def InitUsageConfig():
 		("1", _("Internal hdd only")),
 		("3", _("Everywhere"))])
 	config.misc.erase_flags.addNotifier(updateEraseFlags, immediate_feedback=False)
+	config.misc.transfer_speed = ConfigSelection(default="0", choices=[
+		("0", _("No limit")),
+		("10", _("10 MB/s")),
+		("20", _("20 MB/s")),
+		("50", _("50 MB/s")),
+		("100", _("100 MB/s"))])
 
 	if BoxInfo.getItem("ZapMode"):
 		def setZapmode(el):
@@ -0,0 +1,107 @@
+import os
+from json import dump as json_dump, load as json_load
+from time import localtime
+
+# Which service is zapped to next.
+#
+# For every service the zaps to other services are counted, separately for
+# each Buckets part of the day, so the services watched in the evening do
+# not push away those watched in the morning. Counts of neighbouring parts of
+# the day count half. When the zaps from a service add up to more than
+# MaxTransitions all its counts are halved, so habits can change. The counts
+# are kept in zappredictor.json, written a while after the last zap, when
+# going to standby and on shutdown.
+
+Buckets = 8 # parts of the day, 3 hours each
+MaxTransitions = 200 # per service, before its counts are halved
+MaxServices = 1000
+MaxTargets = 30 # per service
+MinScore = 1.5 # below this a service is not predicted
+SaveDelay = 60000 # ms
+
+
+def getBucket(now=None):
+	return localtime(now).tm_hour * Buckets // 24
+
+
+class ZapPredictor:
+	def __init__(self):
+		self.filename = "/etc/enigma2/zappredictor.json"
+		self.transitions = {} # service -> {next service -> [count per part of the day]}
+		self.dirty = False
+		self.saveTimer = None
+		self.load()
+
+	def load(self):
+		try:
+			with open(self.filename, "r") as f:
+				transitions = json_load(f)
+		except FileNotFoundError:
+			return
+		except Exception as e:
+			print("[ZapPredictor] Failed to read %s: %s" % (self.filename, e))
+			return
+		if isinstance(transitions, dict):
+			self.transitions = dict((service, dict((target, counts) for target, counts in targets.items() if isinstance(counts, list) and len(counts) == Buckets)) for service, targets in transitions.items() if isinstance(targets, dict))
+
+	def save(self):
+		self.dirty = True
+		if self.saveTimer is None:
+			try:
+				from enigma import eTimer
+			except ImportError:
+				return
+			self.saveTimer = eTimer()
+			self.saveTimer.callback.append(self.flush)
+		self.saveTimer.start(SaveDelay, True)
+
+	def flush(self):
+		if self.saveTimer:
+			self.saveTimer.stop()
+		if not self.dirty:
+			return
+		self.dirty = False
+		try:
+			with open(self.filename + ".writing", "w") as f:
+				json_dump(self.transitions, f)
+			os.rename(self.filename + ".writing", self.filename)
+		except (IOError, OSError) as e:
+			print("[ZapPredictor] Failed to write %s: %s" % (self.filename, e))
+
+	def addTransition(self, service, target, now=None):
+		# Counts a zap from service to target, both service reference strings.
+		if not service or not target or service == target:
+			return
+		targets = self.transitions.get(service)
+		if targets is None:
+			if len(self.transitions) >= MaxServices:
+				del self.transitions[min(self.transitions, key=lambda x: sum(sum(counts) for counts in self.transitions[x].values()))]
+			targets = self.transitions[service] = {}
+		counts = targets.get(target)
+		if counts is None:
+			if len(targets) >= MaxTargets:
+				del targets[min(targets, key=lambda x: sum(targets[x]))]
+			counts = targets[target] = [0] * Buckets
+		counts[getBucket(now)] += 1
+		if sum(sum(counts) for counts in targets.values()) > MaxTransitions:
+			for target, counts in list(targets.items()):
+				counts[:] = [count // 2 for count in counts]
+				if not any(counts):
+					del targets[target]
+		self.save()
+
+	def getScore(self, counts, bucket):
+		return counts[bucket] + 0.5 * (counts[(bucket - 1) % Buckets] + counts[(bucket + 1) % Buckets])
+
+	def predict(self, service, now=None):
+		# Returns the services zapped to from service at this time of the day,
+		# most likely first.
+		targets = self.transitions.get(service)
+		if not targets:
+			return []
+		bucket = getBucket(now)
+		scores = [(self.getScore(counts, bucket), target) for target, counts in targets.items()]
+		return [target for score, target in sorted(scores, reverse=True) if score >= MinScore]
+
+
+zapPredictor = ZapPredictor()
@@ -0,0 +1,228 @@
+import os
+from collections import deque
+from json import dump as json_dump
+from math import ceil
+from time import monotonic, time
+
+# Zap latency tracing.
+#
+# A zap is traced from the key press in the channel selection (or from
+# Navigation.playService, when the zap comes from elsewhere) up to the first
+# video frame. Every stage on the way is marked with a monotonic timestamp:
+#
+#   timeshift     the timeshift question was answered
+#   playService   Navigation.playService was entered
+#   parental      the parental control check passed
+#   alternatives  the alternatives were resolved (groups only)
+#   streamrelay   streamrelay.streamrelayChecker returned
+#   extensions    the playServiceExtensions ran
+#   tuner         the preferred tuner was set
+#   evStart       the service was started (emitted from within pnav.playService)
+#   pnav          pnav.playService returned
+#   evTunedIn     the tuner locked
+#   firstFrame    evVideoSizeChanged, the decoder shows the first frame
+#
+# Each trace is tagged with the kind of service (DVB-S/C/T, IPTV, stream relay,
+# file) and, with fast channel change enabled, whether the service was
+# prepared by FCC. The last MaxTraces zaps are kept in memory, and the
+# percentiles of the whole zap time and of every stage are written to
+# ExportFile after each zap, so they can be collected from many boxes.
+
+STAGES = ("timeshift", "playService", "parental", "alternatives", "streamrelay", "extensions", "tuner", "evStart", "pnav", "evTunedIn", "firstFrame")
+
+MaxTraces = 200
+FinishTimeout = 5000 # ms without video after the last stage, e.g. radio
+ExportFile = "/tmp/zaptrace.json" # RAM, no flash wear
+
+FCC_STATE_PREPARING = 0
+
+
+def percentile(values, p):
+	# Nearest rank percentile of the sorted values.
+	if not values:
+		return None
+	return values[max(0, ceil(p / 100.0 * len(values)) - 1)]
+
+
+def getServiceTags(ref, isStreamRelay=False):
+	# Returns the tags describing the kind of service of ref.
+	refstr = ref.toString()
+	if isStreamRelay:
+		return ["stream relay"]
+	if "%3a//" in refstr:
+		return ["IPTV"]
+	if refstr.rsplit(":", 1)[-1].startswith("/"):
+		return ["file"]
+	namespace = ref.getUnsignedData(4) >> 16
+	if namespace == 0xEEEE:
+		return ["DVB-T"]
+	if namespace == 0xFFFF:
+		return ["DVB-C"]
+	return ["DVB-S"]
+
+
+class ZapTrace:
+	def __init__(self):
+		self.traces = deque(maxlen=MaxTraces) # finished traces, oldest first
+		self.current = None # the pending trace
+		self.timer = None
+		self.onUpdate = []
+
+	def begin(self, source):
+		# A zap was asked for. A pending trace that did not reach playService yet
+		# belongs to the same zap (channelSelected -> zap).
+		if self.current is not None and "playService" not in self.current["stages"]:
+			return
+		self.current = {"source": source, "begin": monotonic(), "time": int(time()), "stages": {}, "tags": [], "service": ""}
+		self.restartTimer()
+
+	def mark(self, stage):
+		if self.current is None:
+			if stage != "playService":
+				return
+			self.begin("navigation")
+		# A retry runs the stages again, the last pass counts.
+		self.current["stages"][stage] = monotonic() - self.current["begin"]
+		self.restartTimer()
+
+	def setService(self, ref, isStreamRelay=False):
+		if self.current is None:
+			return
+		self.current["service"] = ref.toString()
+		self.current["tags"] = getServiceTags(ref, isStreamRelay)
+		from Components.SystemInfo import BoxInfo
+		if BoxInfo.getItem("FCCactive") and not isStreamRelay:
+			self.current["tags"].append(self.isFCCPrepared(ref) and "FCC hit" or "FCC miss")
+
+	def addTag(self, tag):
+		# Lets others describe the pending zap, like the FCC list it was prepared by.
+		if self.current is not None and tag not in self.current["tags"]:
+			self.current["tags"].append(tag)
+
+	def isFCCPrepared(self, ref):
+		# Must be asked before pnav.playService takes the service over.
+		try:
+			from enigma import eFCCServiceManager
+			state = eFCCServiceManager.getInstance().getFCCServiceList().get(ref.toString())
+		except Exception:
+			return False
+		return bool(state) and state[0] == FCC_STATE_PREPARING
+
+	def cancel(self):
+		# The zap did not happen or waits for the user (PIN, question).
+		self.current = None
+		if self.timer:
+			self.timer.stop()
+
+	def serviceEvent(self, event):
+		# Called by Navigation for each event of the playing service.
+		if self.current is None or "tuner" not in self.current["stages"]:
+			return # an event of the previous service
+		from enigma import iPlayableService
+		if event == iPlayableService.evStart:
+			self.mark("evStart")
+		elif event == iPlayableService.evTunedIn:
+			self.mark("evTunedIn")
+		elif event == iPlayableService.evVideoSizeChanged:
+			self.mark("firstFrame")
+			self.finish()
+		elif event == iPlayableService.evTuneFailed:
+			self.current["tags"].append("tune failed")
+			self.finish()
+
+	def restartTimer(self):
+		if self.timer is None:
+			try:
+				from enigma import eTimer
+			except ImportError:
+				return
+			self.timer = eTimer()
+			self.timer.callback.append(self.timeout)
+		self.timer.start(FinishTimeout, True)
+
+	def timeout(self):
+		# No video: a radio service or no signal. Zaps that never started a
+		# service are dropped.
+		if self.current is not None and "evStart" in self.current["stages"]:
+			self.current["tags"].append("no video")
+			self.finish()
+		else:
+			self.cancel()
+
+	def finish(self):
+		trace = self.current
+		self.cancel()
+		stages = trace["stages"]
+		trace["total"] = stages.get("firstFrame", max(stages.values()))
+		self.traces.append(trace)
+		print("[ZapTrace] %s %.0f ms %s" % (trace["service"], trace["total"] * 1000, ", ".join(trace["tags"])))
+		self.export()
+		for callback in self.onUpdate:
+			callback()
+
+	def clear(self):
+		self.traces.clear()
+		self.export()
+		for callback in self.onUpdate:
+			callback()
+
+	def getBreakdown(self, trace):
+		# Returns [(stage, seconds since the previous stage)] in the order the
+		# stages were reached.
+		breakdown = []
+		previous = 0
+		for stage, reached in sorted(trace["stages"].items(), key=lambda item: item[1]):
+			breakdown.append((stage, reached - previous))
+			previous = reached
+		return breakdown
+
+	def getStatistics(self):
+		# Returns percentiles in ms of the whole zap, of each stage and of the
+		# whole zap per tag, and the part of the zaps with fast channel change
+		# that found the service prepared. Only zaps that showed video count for
+		# the zap time.
+		totals = []
+		stages = {}
+		tags = {}
+		fcc = [0, 0] # hits, misses
+		for trace in self.traces:
+			if "FCC hit" in trace["tags"]:
+				fcc[0] += 1
+			elif "FCC miss" in trace["tags"]:
+				fcc[1] += 1
+			if "firstFrame" in trace["stages"]:
+				totals.append(trace["total"])
+				for tag in trace["tags"]:
+					tags.setdefault(tag, []).append(trace["total"])
+			for stage, duration in self.getBreakdown(trace):
+				stages.setdefault(stage, []).append(duration)
+
+		def summary(values):
+			values = sorted(values)
+			return {"count": len(values), "p50": round(percentile(values, 50) * 1000, 1), "p95": round(percentile(values, 95) * 1000, 1), "max": round(values[-1] * 1000, 1)}
+
+		return {
+			"zaps": len(self.traces),
+			"total": summary(totals) if totals else None,
+			"stages": dict((stage, summary(stages[stage])) for stage in STAGES if stage in stages),
+			"tags": dict((tag, summary(values)) for tag, values in sorted(tags.items())),
+			"fccHitRate": round(100.0 * fcc[0] / sum(fcc), 1) if sum(fcc) else None
+		}
+
+	def export(self):
+		try:
+			from Components.SystemInfo import BoxInfo
+			data = {
+				"image": "%s %s" % (BoxInfo.getItem("displaydistro", ""), BoxInfo.getItem("imageversion", "")),
+				"model": BoxInfo.getItem("model", ""),
+				"statistics": self.getStatistics(),
+				"traces": list(self.traces)
+			}
+			with open(ExportFile + ".writing", "w") as f:
+				json_dump(data, f)
+			os.rename(ExportFile + ".writing", ExportFile)
+		except Exception as e:
+			print("[ZapTrace] Failed to write %s: %s" % (ExportFile, e))
+
+
+zapTrace = ZapTrace()
@@ -1,5 +1,7 @@
 from copy import copy as copy_copy
-from os import fsync, path as os_path, rename, sep
+from hashlib import sha1
+from os import fsync, path as os_path, rename, sep, stat
+import pickle
 from time import localtime, strftime, mktime
 
 from enigma import getPrevAsciiCode
@@ -50,6 +52,10 @@ KEY_NUMBERS = ACTIONKEY_NUMBERS
 KEY_0 = ACTIONKEY_0
 KEY_9 = ACTIONKEY_9
 
+# Set whenever a saved value in the config tree changes, so saving the settings
+# can be skipped when nothing was changed since the last save.
+savedValuesChanged = True
+
 
 # ConfigElement, the base class of all ConfigElements.
 #
@@ -97,6 +103,17 @@ class ConfigElement:
 
 	notifiers_final = property(getNotifiersFinal, setNotifiersFinal)
 
+	def getSavedValue(self):
+		return self._saved_value
+
+	def setSavedValue(self, value):
+		global savedValuesChanged
+		if value != self.__dict__.get("_saved_value"):
+			savedValuesChanged = True
+		self._saved_value = value
+
+	saved_value = property(getSavedValue, setSavedValue)
+
 	# you need to override this to do input validation
 	def setValue(self, value):
 		prev = self._value if hasattr(self, "_value") else None
@@ -2071,6 +2088,8 @@ class ConfigSubsection:
 		return values
 
 	def setSavedValue(self, values):
+		global savedValuesChanged
+		savedValuesChanged = True
 		values = dict(values)
 		self.content.stored_values = values
 		for (key, val) in self.content.items.items():
@@ -2095,6 +2114,18 @@ class ConfigSubsection:
 	def dict(self):
 		return self.content.items
 
+
+SNAPSHOT_VERSION = 1
+
+
+def getFileStat(filename):
+	try:
+		st = stat(filename)
+		return (st.st_size, st.st_mtime_ns)
+	except OSError:
+		return None
+
+
 # The root config object, which also can "pickle" (=serialize) down the whole config tree.
 #
 # We try to keep non-existing config entries, to apply them whenever a new config entry is added to a subsection
@@ -2121,8 +2152,12 @@ class Config(ConfigSubsection):
 		return ''.join(result)
 
 	def unpickle(self, lines, base_file=True):
-		tree = {}
-		configbase = tree.setdefault("config", {})
+		# we inherit from ConfigSubsection, so ...
+		# object.__setattr__(self, "saved_value", tree["config"])
+		self.setSavedValue(self.parseLines(lines, base_file))
+
+	def parseLines(self, lines, base_file=True):
+		configbase = {}
 		for element in lines:
 			if not element or element[0] == '#':
 				continue
@@ -2149,14 +2184,20 @@ class Config(ConfigSubsection):
 						configEntry.value = val
 				except (SyntaxError, KeyError):
 					pass
-
-		# we inherit from ConfigSubsection, so ...
-		# object.__setattr__(self, "saved_value", tree["config"])
-		if "config" in tree:
-			self.setSavedValue(tree["config"])
+		return configbase
 
 	def saveToFile(self, filename):
+		global savedValuesChanged
+		content = self.content
+		fileStat = getFileStat(filename)
+		unmodified = fileStat is not None and fileStat == getattr(content, "file_stat", None)  # nobody else wrote the file
+		if unmodified and not savedValuesChanged:
+			return
 		text = self.pickle()
+		savedValuesChanged = False
+		digest = sha1(text.encode("UTF-8")).digest()
+		if unmodified and digest == content.file_digest:
+			return
 		try:
 			with open(filename + ".writing", "w", encoding="UTF-8") as f:
 				f.write(text)
@@ -2165,10 +2206,48 @@ class Config(ConfigSubsection):
 			rename(filename + ".writing", filename)
 		except OSError:
 			print("[Config] Couldn't write %s" % filename)
+			savedValuesChanged = True
+			return
+		self.saveSnapshot(filename, self.parseLines(text.split("\n")), digest)
 
 	def loadFromFile(self, filename, base_file=True):
+		if base_file:
+			snapshot = self.loadSnapshot(filename)
+			if snapshot is not None:
+				self.content.file_stat = snapshot["stat"]
+				self.content.file_digest = snapshot["digest"]
+				self.setSavedValue(snapshot["tree"])
+				return
 		with open(filename, "r", encoding="UTF-8") as f:
-			self.unpickle(f, base_file)
+			text = f.read()
+		tree = self.parseLines(text.split("\n"), base_file)
+		self.setSavedValue(tree)
+		if base_file:
+			self.saveSnapshot(filename, tree, sha1(text.encode("UTF-8")).digest())
+
+	# The settings are also stored as a pickled tree in settings.cache, which is
+	# used instead of parsing the settings file as long as the file is unchanged.
+
+	def loadSnapshot(self, filename):
+		try:
+			with open(filename + ".cache", "rb") as f:
+				snapshot = pickle.load(f)
+			if snapshot.get("version") == SNAPSHOT_VERSION and snapshot.get("stat") == getFileStat(filename):
+				return snapshot
+		except (OSError, ValueError, EOFError, AttributeError, pickle.UnpicklingError) as error:
+			if os_path.exists(filename + ".cache"):
+				print("[Config] Couldn't load %s.cache (%s)" % (filename, str(error)))
+		return None
+
+	def saveSnapshot(self, filename, tree, digest):
+		self.content.file_stat = getFileStat(filename)
+		self.content.file_digest = digest
+		try:
+			with open(filename + ".cache.writing", "wb") as f:
+				pickle.dump({"version": SNAPSHOT_VERSION, "stat": self.content.file_stat, "digest": digest, "tree": tree}, f, pickle.HIGHEST_PROTOCOL)
+			rename(filename + ".cache.writing", filename + ".cache")
+		except OSError:
+			print("[Config] Couldn't write %s.cache" % filename)
 
 
 config = Config()
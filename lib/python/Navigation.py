@@ -2,6 +2,7 @@ from enigma import eTimer, eServiceCenter, eServiceReference, pNavigation, getBe
 from Components.ImportChannels import ImportChannels
 from Components.ParentalControl import parentalControl
 from Components.SystemInfo import BoxInfo
+from Components.ZapTrace import zapTrace
 from Components.config import config, configfile
 from Tools.BoundFunction import boundFunction
 from Tools.StbHardware import getFPWasTimerWakeup
@@ -87,6 +88,7 @@ class Navigation:
 		return self.__prevWakeupTime
 
 	def dispatchEvent(self, i):
+		zapTrace.serviceEvent(i)
 		for x in self.event:
 			x(i)
 		if i == iPlayableService.evEnd:
@@ -108,6 +110,7 @@ class Navigation:
 		# Some plugins send None as ref becasue want to shutdown enigma play system.
 		# So we have to stop current service if someone send None.
 		if ref is None:
+			zapTrace.cancel()
 			self.stopService()
 			return 0
 
@@ -116,7 +119,9 @@ class Navigation:
 
 		if ref and oldref and ref == oldref and not forceRestart:
 			print("[Navigation] ignore request to play already running service(1)")
+			zapTrace.cancel()
 			return 1
+		zapTrace.mark("playService")
 		print("[Navigation] playing ref", ref and ref.toString())
 
 		InfoBarInstance = InfoBar.instance
@@ -140,6 +145,7 @@ class Navigation:
 				current_service_source.newService(False)
 
 		if not checkParentalControl or parentalControl.isServicePlayable(ref, boundFunction(self.playService, checkParentalControl=False, forceRestart=forceRestart, adjust=(count > 1 and [0, session] or adjust)), session=session):
+			zapTrace.mark("parental")
 
 			if "%3a//" in ref.toString():
 				self.currentlyPlayingServiceReference = ref
@@ -160,10 +166,13 @@ class Navigation:
 					if alternative_ci_ref:
 						playref = alternative_ci_ref
 				print("[Navigation] alternative ref: ", playref and playref.toString())
+				zapTrace.mark("alternatives")
 				if playref and oldref and playref == oldref and not forceRestart:
 					print("[Navigation] ignore request to play already running service(2)")
+					zapTrace.cancel()
 					return 1
 				if not playref:
+					zapTrace.cancel()
 					alternativeref = getBestPlayableServiceReference(ref, eServiceReference(), True)
 					self.stopService()
 					if alternativeref and self.pnav:
@@ -184,6 +193,7 @@ class Navigation:
 							print("[Navigation] alternative ref as simulate: ", alternativeref.toString())
 					return 0
 				elif checkParentalControl and not parentalControl.isServicePlayable(playref, boundFunction(self.playService, checkParentalControl=False, forceRestart=forceRestart, adjust=(count > 1 and [0, session, ref] or adjust)), session=session):
+					zapTrace.cancel()
 					if self.currentlyPlayingServiceOrGroup and InfoBarInstance and InfoBarInstance.servicelist.servicelist.setCurrent(self.currentlyPlayingServiceOrGroup, adjust):
 						self.currentlyPlayingServiceOrGroup = InfoBarInstance.servicelist.servicelist.getCurrent()
 					return 1
@@ -197,6 +207,7 @@ class Navigation:
 
 				self.currentlyPlayingServiceReference = playref
 				playref, is_stream_relay = streamrelay.streamrelayChecker(playref)
+				zapTrace.mark("streamrelay")
 
 				if BoxInfo.getItem("FCCactive") and "%3a//" in ref.toString() and not is_stream_relay:
 					self.pnav.stopService()
@@ -210,6 +221,7 @@ class Navigation:
 						playref, is_async_play = ret
 					if is_async_play or playref.toString() != playref_str_orig:
 						break
+				zapTrace.mark("extensions")
 
 				self.currentlyPlayingServiceOrGroup = ref
 				self.originalPlayingServiceReference = ref
@@ -245,6 +257,8 @@ class Navigation:
 								if config.usage.frontend_priority_dvbs.value != config.usage.frontend_priority.value:
 									setPreferredTuner(int(config.usage.frontend_priority_dvbs.value))
 									setPriorityFrontend = True
+				zapTrace.setService(playref, is_stream_relay)
+				zapTrace.mark("tuner")
 				if config.misc.softcam_streamrelay_delay.value and self.currentServiceIsStreamRelay:
 					self.currentServiceIsStreamRelay = False
 					self.currentlyPlayingServiceReference = None
@@ -254,6 +268,7 @@ class Navigation:
 					self.retryServicePlayTimer.callback.append(boundFunction(self.playService, ref, checkParentalControl, forceRestart, adjust))
 					self.retryServicePlayTimer.start(config.misc.softcam_streamrelay_delay.value, True)
 				elif not is_async_play and self.pnav.playService(playref):
+						zapTrace.cancel()
 						self.currentlyPlayingServiceReference = None
 						self.originalPlayingServiceReference = None
 						self.currentlyPlayingServiceOrGroup = None
@@ -262,6 +277,7 @@ class Navigation:
 							self.retryServicePlayTimer = eTimer()
 							self.retryServicePlayTimer.callback.append(boundFunction(self.playService, ref, checkParentalControl, forceRestart, adjust))
 							self.retryServicePlayTimer.start(500, True)
+				zapTrace.mark("pnav")
 				self.skipServiceReferenceReset = False
 				if setPriorityFrontend:
 					setPreferredTuner(int(config.usage.frontend_priority.value))
@@ -273,6 +289,7 @@ class Navigation:
 				return 0
 		elif oldref and InfoBarInstance and InfoBarInstance.servicelist.servicelist.setCurrent(oldref, adjust):
 			self.currentlyPlayingServiceOrGroup = InfoBarInstance.servicelist.servicelist.getCurrent()
+		zapTrace.cancel()
 		return 1
 
 	def getCurrentlyPlayingServiceReference(self):
@@ -1,5 +1,5 @@
 from skin import applySkinFactor, parseColor, parseFont, parseScale
-from Components.config import config, ConfigClock, ConfigInteger, ConfigSubsection, ConfigYesNo, ConfigSelection, ConfigSelectionNumber
+from Components.config import config
 from Components.Pixmap import Pixmap
 from Components.Button import Button
 from Components.ActionMap import HelpableActionMap
@@ -27,7 +27,7 @@ from Tools.Directories import resolveFilename, SCOPE_CURRENT_SKIN
 from RecordTimer import RecordTimerEntry, parseEvent, AFTEREVENT, createRecordTimerEntry
 from ServiceReference import ServiceReference, isPlayableForCur
 from Tools.LoadPixmap import LoadPixmap
-from Tools.Alternatives import CompareWithAlternatives
+from Tools.Alternatives import CompareWithAlternatives, getAlternativeChannels
 from Tools.FallbackTimer import FallbackTimerList
 from Tools.TextBoundary import getTextBoundarySize
 from enigma import eEPGCache, eListbox, gFont, eListboxPythonMultiContent, RT_HALIGN_LEFT, RT_HALIGN_RIGHT, RT_HALIGN_CENTER, RT_VALIGN_CENTER, RT_WRAP, BT_SCALE, BT_KEEP_ASPECT_RATIO, BT_ALIGN_CENTER, eSize, eRect, eTimer, eServiceReference
@@ -39,47 +39,67 @@ from Tools.BoundFunction import boundFunction
 
 MAX_TIMELINES = 6
 
-config.misc.graph_mepg = ConfigSubsection()
-config.misc.graph_mepg.prev_time = ConfigClock(default=time())
-config.misc.graph_mepg.prev_time_period = ConfigInteger(default=120, limits=(60, 300))
-now_time = [x for x in localtime()]
-now_time[3] = 20
-now_time[4] = 30
-config.misc.graph_mepg.prime_time = ConfigClock(default=mktime((now_time[0], now_time[1], now_time[2], now_time[3], now_time[4], 0, 0, 0, 0)))
-config.misc.graph_mepg.ev_fontsize = ConfigSelectionNumber(default=0, stepwidth=1, min=-12, max=12, wraparound=True)
-config.misc.graph_mepg.items_per_page = ConfigSelectionNumber(min=3, max=40, stepwidth=1, default=6, wraparound=True)
-config.misc.graph_mepg.items_per_page_listscreen = ConfigSelectionNumber(min=3, max=60, stepwidth=1, default=12, wraparound=True)
-config.misc.graph_mepg.default_mode = ConfigYesNo(default=False)
-config.misc.graph_mepg.overjump = ConfigYesNo(default=True)
-config.misc.graph_mepg.center_timeline = ConfigYesNo(default=False)
-config.misc.graph_mepg.servicetitle_mode = ConfigSelection(default="picon+servicename", choices=[
-	("servicename", _("Servicename")),
-	("picon", _("Picon")),
-	("picon+servicename", _("Picon and servicename")),
-	("number+servicename", _("Channelnumber and servicename")),
-	("number+picon", _("Channelnumber and picon")),
-	("number+picon+servicename", _("Channelnumber, picon and servicename"))])
-config.misc.graph_mepg.roundTo = ConfigSelection(default="900", choices=[("900", _("%d minutes") % 15), ("1800", _("%d minutes") % 30), ("3600", _("%d minutes") % 60)])
-config.misc.graph_mepg.OKButton = ConfigSelection(default="info", choices=[("info", _("Show detailed event info")), ("zap", _("Zap to selected channel")), ("zap+exit", _("Zap to selected channel and exit GMEPG"))])
-possibleAlignmentChoices = [
-	(str(RT_HALIGN_LEFT | RT_VALIGN_CENTER), _("left")),
-	(str(RT_HALIGN_CENTER | RT_VALIGN_CENTER), _("centered")),
-	(str(RT_HALIGN_RIGHT | RT_VALIGN_CENTER), _("right")),
-	(str(RT_HALIGN_LEFT | RT_VALIGN_CENTER | RT_WRAP), _("left, wrapped")),
-	(str(RT_HALIGN_CENTER | RT_VALIGN_CENTER | RT_WRAP), _("centered, wrapped")),
-	(str(RT_HALIGN_RIGHT | RT_VALIGN_CENTER | RT_WRAP), _("right, wrapped"))]
-config.misc.graph_mepg.event_alignment = ConfigSelection(default=possibleAlignmentChoices[0][0], choices=possibleAlignmentChoices)
-config.misc.graph_mepg.show_timelines = ConfigSelection(default="all", choices=[("nothing", _("no")), ("all", _("all")), ("now", _("actual time only"))])
-config.misc.graph_mepg.servicename_alignment = ConfigSelection(default=possibleAlignmentChoices[0][0], choices=possibleAlignmentChoices)
-config.misc.graph_mepg.extension_menu = ConfigYesNo(default=False)
-config.misc.graph_mepg.extension_menu.addNotifier(plugins.reloadPlugins, initial_call=False, immediate_feedback=False)
-config.misc.graph_mepg.show_record_clocks = ConfigYesNo(default=True)
-config.misc.graph_mepg.show_disabled_timers= ConfigYesNo(default=False)
-config.misc.graph_mepg.zap_blind_bouquets = ConfigYesNo(default=False)
-
 listscreen = config.misc.graph_mepg.default_mode.value
 
 
+class EPGOverlay:
+	# Recording and zap overlays for all cells of a fillMultiEPG result. They
+	# are computed in one pass for the whole list and reused while scrolling,
+	# until the list, the timers or the currently playing service change.
+	def __init__(self, timer):
+		self.timer = timer
+		self.list = []
+		self.currentlyPlaying = None
+		self.timers = None
+		self.timer_generation = None
+		self.show_disabled = None
+		self.playing = None
+
+	def setList(self, list):
+		self.list = list or []
+		self.timers = None
+		self.playing = None
+
+	def setCurrentlyPlaying(self, serviceref):
+		self.currentlyPlaying = serviceref and serviceref.toString()
+		self.playing = None
+
+	def getTimers(self, service, event):
+		# returns the isInTimer results for active and disabled timers
+		show_disabled = config.misc.graph_mepg.show_disabled_timers.value
+		if self.timers is None or self.timer_generation != self.timer.timer_generation or self.show_disabled != show_disabled:
+			self.updateTimers(show_disabled)
+		return self.timers.get((service, event[0], event[2]), (None, None))
+
+	def updateTimers(self, show_disabled):
+		events = [(x[0], ev[0], ev[2], ev[3]) for x in self.list if x[2] for ev in x[2]]
+		rec = self.timer.isInTimerBatch(events)
+		dis = self.timer.isInTimerBatch(events, disabledTimers=True) if show_disabled else [None] * len(events)
+		self.timers = {}
+		for event, r, d in zip(events, rec, dis):
+			if r is not None or d is not None:
+				self.timers[event[:3]] = (r, d)
+		self.timer_generation = self.timer.timer_generation
+		self.show_disabled = show_disabled
+
+	def isPlaying(self, service):
+		if self.playing is None:
+			self.updatePlaying()
+		return service in self.playing
+
+	def updatePlaying(self):
+		# same as CompareWithAlternatives(service, currentlyPlaying) for every service
+		playing = set()
+		current = self.currentlyPlaying
+		if current:
+			members = set(getAlternativeChannels(current) or ()) if current.startswith('1:134:') else ()
+			for x in self.list:
+				service = x[0]
+				if service and (service == current or service in members or service.startswith('1:134:') and current in (getAlternativeChannels(service) or ())):
+					playing.add(service)
+		self.playing = playing
+
+
 class EPGList(GUIComponent):
 	buildEntryExtensionFunctions = []
 	def __init__(self, selChangedCB=None, timer=None, time_epoch=120, overjump_empty=True, epg_bouquet=None):
@@ -124,6 +144,7 @@ class EPGList(GUIComponent):
 		self.service_rect = None
 		self.picon_size = None
 		self.currentlyPlaying = None
+		self.overlay = EPGOverlay(timer)
 		self.showPicon = False
 		self.showServiceTitle = True
 		self.nowEvPix = None
@@ -303,6 +324,7 @@ class EPGList(GUIComponent):
 
 	def setCurrentlyPlaying(self, serviceref):
 		self.currentlyPlaying = serviceref
+		self.overlay.setCurrentlyPlaying(serviceref)
 
 	def getEventFromId(self, service, eventid):
 		event = None
@@ -485,7 +507,7 @@ class EPGList(GUIComponent):
 		selected = self.cur_service[0] == service
 
 		# Picon and Service name
-		if CompareWithAlternatives(service, self.currentlyPlaying and self.currentlyPlaying.toString()):
+		if self.overlay.isPlaying(service):
 			serviceForeColor = self.foreColorServiceSelected
 			serviceBackColor = self.backColorServiceSelected
 			bgpng = self.curSerPix or self.nowEvPix
@@ -618,8 +640,7 @@ class EPGList(GUIComponent):
 				stime = ev[2]
 				duration = ev[3]
 				xpos, ewidth = self.calcEntryPosAndWidthHelper(stime, duration, start, end, width)
-				rec = self.timer.isInTimer(ev[0], stime, duration, service)
-				dis = self.timer.isInTimer(ev[0], stime, duration, service, disabledTimers=True) if config.misc.graph_mepg.show_disabled_timers.value else None
+				rec, dis = self.overlay.getTimers(service, ev)
 
 				# event box background
 				foreColorSelected = foreColor = self.foreColor
@@ -840,6 +861,7 @@ class EPGList(GUIComponent):
 			self.list.append((service, sname, tmp_list[0][0] is not None and tmp_list or None, picon, serviceList[serviceIdx] if (channelIdx is None) else serviceList[serviceIdx][channelIdx]))
 			serviceIdx += 1
 
+		self.overlay.setList(self.list)
 		self.l.setList(self.list)
 		self.findBestEvent()
 
@@ -1,4 +1,46 @@
+from Components.config import config, ConfigClock, ConfigInteger, ConfigSubsection, ConfigYesNo, ConfigSelection, ConfigSelectionNumber
+from Components.PluginComponent import plugins
 from Screens.Setup import Setup
+from enigma import RT_HALIGN_LEFT, RT_HALIGN_RIGHT, RT_HALIGN_CENTER, RT_VALIGN_CENTER, RT_WRAP
+from time import localtime, time, mktime
+
+config.misc.graph_mepg = ConfigSubsection()
+config.misc.graph_mepg.prev_time = ConfigClock(default=time())
+config.misc.graph_mepg.prev_time_period = ConfigInteger(default=120, limits=(60, 300))
+now_time = [x for x in localtime()]
+now_time[3] = 20
+now_time[4] = 30
+config.misc.graph_mepg.prime_time = ConfigClock(default=mktime((now_time[0], now_time[1], now_time[2], now_time[3], now_time[4], 0, 0, 0, 0)))
+config.misc.graph_mepg.ev_fontsize = ConfigSelectionNumber(default=0, stepwidth=1, min=-12, max=12, wraparound=True)
+config.misc.graph_mepg.items_per_page = ConfigSelectionNumber(min=3, max=40, stepwidth=1, default=6, wraparound=True)
+config.misc.graph_mepg.items_per_page_listscreen = ConfigSelectionNumber(min=3, max=60, stepwidth=1, default=12, wraparound=True)
+config.misc.graph_mepg.default_mode = ConfigYesNo(default=False)
+config.misc.graph_mepg.overjump = ConfigYesNo(default=True)
+config.misc.graph_mepg.center_timeline = ConfigYesNo(default=False)
+config.misc.graph_mepg.servicetitle_mode = ConfigSelection(default="picon+servicename", choices=[
+	("servicename", _("Servicename")),
+	("picon", _("Picon")),
+	("picon+servicename", _("Picon and servicename")),
+	("number+servicename", _("Channelnumber and servicename")),
+	("number+picon", _("Channelnumber and picon")),
+	("number+picon+servicename", _("Channelnumber, picon and servicename"))])
+config.misc.graph_mepg.roundTo = ConfigSelection(default="900", choices=[("900", _("%d minutes") % 15), ("1800", _("%d minutes") % 30), ("3600", _("%d minutes") % 60)])
+config.misc.graph_mepg.OKButton = ConfigSelection(default="info", choices=[("info", _("Show detailed event info")), ("zap", _("Zap to selected channel")), ("zap+exit", _("Zap to selected channel and exit GMEPG"))])
+possibleAlignmentChoices = [
+	(str(RT_HALIGN_LEFT | RT_VALIGN_CENTER), _("left")),
+	(str(RT_HALIGN_CENTER | RT_VALIGN_CENTER), _("centered")),
+	(str(RT_HALIGN_RIGHT | RT_VALIGN_CENTER), _("right")),
+	(str(RT_HALIGN_LEFT | RT_VALIGN_CENTER | RT_WRAP), _("left, wrapped")),
+	(str(RT_HALIGN_CENTER | RT_VALIGN_CENTER | RT_WRAP), _("centered, wrapped")),
+	(str(RT_HALIGN_RIGHT | RT_VALIGN_CENTER | RT_WRAP), _("right, wrapped"))]
+config.misc.graph_mepg.event_alignment = ConfigSelection(default=possibleAlignmentChoices[0][0], choices=possibleAlignmentChoices)
+config.misc.graph_mepg.show_timelines = ConfigSelection(default="all", choices=[("nothing", _("no")), ("all", _("all")), ("now", _("actual time only"))])
+config.misc.graph_mepg.servicename_alignment = ConfigSelection(default=possibleAlignmentChoices[0][0], choices=possibleAlignmentChoices)
+config.misc.graph_mepg.extension_menu = ConfigYesNo(default=False)
+config.misc.graph_mepg.extension_menu.addNotifier(plugins.reloadPlugins, initial_call=False, immediate_feedback=False)
+config.misc.graph_mepg.show_record_clocks = ConfigYesNo(default=True)
+config.misc.graph_mepg.show_disabled_timers= ConfigYesNo(default=False)
+config.misc.graph_mepg.zap_blind_bouquets = ConfigYesNo(default=False)
 
 
 class GraphMultiEpgSetup(Setup):
@@ -1,11 +1,14 @@
 from Plugins.Plugin import PluginDescriptor
-from Plugins.Extensions.GraphMultiEPG.GraphMultiEpg import GraphMultiEPG
+from Plugins.Extensions.GraphMultiEPG.GraphMultiEpgSetup import GraphMultiEpgSetup # config.misc.graph_mepg
 from Screens.ChannelSelection import SimpleChannelSelection
 import Screens.InfoBar
 from enigma import eServiceCenter, eServiceReference
 from ServiceReference import ServiceReference
 from Screens.Screen import Screen
 from Components.config import config
+from Tools.LazyImport import LazyModule, getAttribute
+
+GraphMultiEpg = LazyModule("Plugins.Extensions.GraphMultiEPG.GraphMultiEpg") # imported when the EPG is opened first
 
 Session = None
 Servicelist = None
@@ -128,7 +131,7 @@ def runGraphMultiEpg():
 		else:
 			cb = None
 		services = getBouquetServices(epg_bouquet)
-		Session.openWithCallback(reopen, GraphMultiEPG, services, zapToService, cb, ServiceReference(epg_bouquet).getServiceName(), selectBouquet, epg_bouquet)
+		Session.openWithCallback(reopen, GraphMultiEpg.GraphMultiEPG, services, zapToService, cb, ServiceReference(epg_bouquet).getServiceName(), selectBouquet, epg_bouquet)
 
 
 def reopen(answer):
@@ -142,6 +145,10 @@ def reopen(answer):
 		closed(answer)
 
 
+def __getattr__(name):
+	return getAttribute(GraphMultiEpg, name)
+
+
 def Plugins(**kwargs):
 	name = _("Graphical Multi EPG")
 	descr = _("A graphical EPG for all services of a specific bouquet")
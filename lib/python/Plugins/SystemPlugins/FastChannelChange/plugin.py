@@ -8,6 +8,9 @@ from Screens.InfoBarGenerics import streamrelay
 from Components.config import config, ConfigSubsection, ConfigYesNo, ConfigSelection
 from Components.ServiceEventTracker import ServiceEventTracker
 from Components.SystemInfo import BoxInfo
+from Components.NimManager import nimmanager
+from Components.ZapPredictor import zapPredictor
+from Components.ZapTrace import zapTrace
 from enigma import iPlayableService, eTimer, eServiceReference, iRecordableService
 import os
 import glob
@@ -21,6 +24,7 @@ config.plugins.fccsetup.activate = ConfigYesNo(default=False)
 config.plugins.fccsetup.maxfcc = ConfigSelection(default=str(g_default_fcc), choices=list((str(n), str(n)) for n in range(2, g_max_fcc + 1)))
 config.plugins.fccsetup.zapupdown = ConfigYesNo(default=True)
 config.plugins.fccsetup.history = ConfigYesNo(default=False)
+config.plugins.fccsetup.predict = ConfigYesNo(default=True)
 config.plugins.fccsetup.priority = ConfigSelection(default="zapupdown", choices={"zapupdown": _("Zap Up/Down"), "historynextback": _("History Prev/Next")})
 config.plugins.fccsetup.disableforrec = ConfigYesNo(default=True)
 config.plugins.fccsetup.extensions = ConfigYesNo(default=False)
@@ -44,6 +48,9 @@ class FCCSupport:
 		self.fccmgr = eFCCServiceManager.getInstance()
 
 		self.fccList = []
+		self.fccSources = {} # sref -> the list it was taken from
+		self.fccStarted = {} # sref -> the list it was taken from, for the FCC services started
+		self.neighbourCache = {} # bouquet -> (list generation, playable services)
 
 		self.createListTimer = eTimer()
 		self.createListTimer.callback.append(self.FCCCreateList)
@@ -67,6 +74,7 @@ class FCCSupport:
 		self.maxFCC = int(config.plugins.fccsetup.maxfcc.value)
 		self.zapdownEnable = config.plugins.fccsetup.zapupdown.value
 		self.historyEnable = config.plugins.fccsetup.history.value
+		self.predictEnable = config.plugins.fccsetup.predict.value
 		self.priority = config.plugins.fccsetup.priority.value
 		self.disableforrec = config.plugins.fccsetup.disableforrec.value
 		self.fccmgr.setFCCEnable(int(self.fccSetupActivate))
@@ -160,6 +168,10 @@ class FCCSupport:
 			self.historyEnable = config.plugins.fccsetup.history.value
 			fcc_changed = True
 
+		if self.predictEnable != config.plugins.fccsetup.predict.value:
+			self.predictEnable = config.plugins.fccsetup.predict.value
+			fcc_changed = True
+
 		if self.priority != config.plugins.fccsetup.priority.value:
 			self.priority = config.plugins.fccsetup.priority.value
 			fcc_changed = True
@@ -184,7 +196,7 @@ class FCCSupport:
 
 	# get current recording state
 	def getRecordings(self):
-		self.recordings = bool(self.session.nav.getRecordings())
+		self.recordings = len(self.session.nav.getRecordings())
 
 	def addRecordEventCallback(self, enable=True):
 		if enable:
@@ -224,6 +236,7 @@ class FCCSupport:
 			self.__event_tracker = None
 
 	def getEvStart(self):
+		self.countPrepared()
 		self.createListTimer.start(0, True)
 
 	def getEvEnd(self):
@@ -254,37 +267,72 @@ class FCCSupport:
 
 		return playable
 
-	def getZapUpDownList(self):
+	def getPlayableNeighbours(self):
+		# Returns the services of the current bouquet FCC can prepare and their
+		# positions. They are kept per bouquet until the list is filled again or
+		# edited. Stream relay services are skipped later, the whitelist can change.
+		servicelist = InfoBar.instance.servicelist.servicelist
+		root = servicelist.getRoot()
+		key = root and root.toString()
+		cached = self.neighbourCache.get(key)
+		if cached is None or cached[0] != servicelist.generation:
+			serviceRefList = []
+			for ref in servicelist.getList():
+				sref = ref.toString()
+				if (sref.split(':')[1] == '0') and self.isPlayableFCC(ref): # remove marker
+					serviceRefList.append(sref)
+			cached = (servicelist.generation, serviceRefList, dict((sref, idx) for idx, sref in enumerate(serviceRefList)))
+			self.neighbourCache = dict((key, value) for (key, value) in self.neighbourCache.items() if value[0] == servicelist.generation)
+			self.neighbourCache[key] = cached
+		return cached[1], cached[2]
+
+	def getZapUpDownList(self, count):
 		fccZapUpDownList = []
-		serviceList = InfoBar.instance.servicelist.servicelist.getList()
+		serviceRefList, serviceRefIndex = self.getPlayableNeighbours()
 		curServiceRef = InfoBar.instance.servicelist.servicelist.getCurrent().toString()
 
-		serviceRefList = []
-		for idx in range(len(serviceList)):
-			sref = serviceList[idx].toString()
-			if (sref.split(':')[1] == '0') and self.isPlayableFCC(sref): # remove marker
-				serviceRefList.append(sref)
-
-		if curServiceRef in serviceRefList:
+		if curServiceRef in serviceRefIndex:
 			serviceRefListSize = len(serviceRefList)
-			curServiceIndex = serviceRefList.index(curServiceRef)
+			curServiceIndex = serviceRefIndex[curServiceRef]
 
-			for x in range(self.maxFCC - 1):
-				if x > (serviceRefListSize - 2): # if not ((x+1) <= (serviceRefListSize-1))
+			for x in range(serviceRefListSize - 1):
+				if len(fccZapUpDownList) >= count:
 					break
 
 				idx = (x // 2) + 1
 				if x % 2:
 					idx *= -1 # idx : [ 1, -1, 2, -2, 3, -3, 4, -4 ....]
-				idx = (curServiceIndex + idx) % serviceRefListSize # calc wraparound
-				try:
-					fccZapUpDownList.append(serviceRefList[idx])
-				except:
-					print("[FCCCreateList] append error, idx : %d" % idx)
-					break
+				sref = serviceRefList[(curServiceIndex + idx) % serviceRefListSize] # calc wraparound
+				if sref not in streamrelay.data and sref not in fccZapUpDownList:
+					fccZapUpDownList.append(sref)
 
 		return fccZapUpDownList
 
+	def getPredictedList(self):
+		# The services most likely zapped to next, see Components.ZapPredictor.
+		curRef = self.session.nav.getCurrentlyPlayingServiceOrGroup()
+		if not curRef:
+			return []
+		return [sref for sref in zapPredictor.predict(curRef.toString()) if (sref.split(':')[1] == '0') and self.isPlayableFCC(sref)]
+
+	def getFCCSlots(self):
+		# FCC services need a tuner each unless they share the transponder of
+		# another service. Leave one for the live service and one for each
+		# recording, but always prepare at least one service.
+		slots = self.maxFCC - 1
+		tuners = len([slot for slot in nimmanager.nim_slots if not slot.empty and slot.isEnabled()])
+		if tuners:
+			slots = min(slots, max(1, tuners - 1 - self.recordings))
+		return slots
+
+	def countPrepared(self):
+		# Tags the zap with the list the new service was prepared from.
+		curRef = self.session.nav.getCurrentlyPlayingServiceReference()
+		source = curRef and self.fccStarted.get(curRef.toString())
+		if source:
+			zapTrace.addTag("FCC %s" % source)
+		self.fccStarted = {}
+
 	def getHistoryPrevNextList(self):
 		historyList = []
 		history = InfoBar.instance.servicelist.history[:]
@@ -309,11 +357,16 @@ class FCCSupport:
 
 		if InfoBar.instance:
 			self.fccList = []
+			self.fccSources = {}
 			fccZapUpDownList = []
 			historyList = []
+			slots = self.getFCCSlots()
+
+			if self.predictEnable:
+				self.addFCCList(self.getPredictedList(), "predicted", slots)
 
 			if self.zapdownEnable:
-				fccZapUpDownList = self.getZapUpDownList()
+				fccZapUpDownList = self.getZapUpDownList(slots)
 
 			if self.historyEnable:
 				historyList = self.getHistoryPrevNextList()
@@ -322,25 +375,25 @@ class FCCSupport:
 				fccZapDownLen = len(fccZapUpDownList)
 				if fccZapDownLen:
 					size = fccZapDownLen > 2 and 2 or fccZapDownLen
-					self.fccList = fccZapUpDownList[:size]
+					self.addFCCList(fccZapUpDownList[:size], "zap up/down", slots)
 					fccZapUpDownList = fccZapUpDownList[size:]
 
-				self.addFCCList(historyList)
-				self.addFCCList(fccZapUpDownList)
+				self.addFCCList(historyList, "history", slots)
+				self.addFCCList(fccZapUpDownList, "zap up/down", slots)
 			else:
-				self.addFCCList(historyList)
-				self.addFCCList(fccZapUpDownList)
+				self.addFCCList(historyList, "history", slots)
+				self.addFCCList(fccZapUpDownList, "zap up/down", slots)
 
 			self.FCCReconfigureFccList()
 
-	def addFCCList(self, newlist):
-		fccListMaxLen = self.maxFCC - 1
+	def addFCCList(self, newlist, source, fccListMaxLen):
 		for sref in newlist:
 			if len(self.fccList) >= fccListMaxLen:
 				break
 
 			if sref not in self.fccList:
 				self.fccList.append(sref)
+				self.fccSources[sref] = source
 
 	def FCCReconfigureFccList(self):
 		stopFCCList = []
@@ -404,6 +457,7 @@ class FCCSupport:
 				sref = self.fccList.pop(0)
 				if self.isPlayableFCC(sref): # remove PVR, streaming, radio channels
 					self.fccmgr.playFCCService(eServiceReference(sref))
+					self.fccStarted[sref] = self.fccSources.get(sref)
 					self.FCCTimeoutTimerStart(sref)
 
 	def FCCStopAllServices(self):
@@ -466,6 +520,7 @@ class FCCSetup(Setup):
 			self.list.append((_("Max channels"), config.plugins.fccsetup.maxfcc))
 			self.list.append((_("Zap Up/Down"), config.plugins.fccsetup.zapupdown))
 			self.list.append((_("History Prev/Next"), config.plugins.fccsetup.history))
+			self.list.append((_("Predict next channels"), config.plugins.fccsetup.predict))
 			if config.plugins.fccsetup.zapupdown.value and config.plugins.fccsetup.history.value:
 				self.list.append((_("priority"), config.plugins.fccsetup.priority))
 			self.list.append((_("Disable FCC during recordings"), config.plugins.fccsetup.disableforrec))
@@ -11,6 +11,8 @@ from Plugins.Plugin import PluginDescriptor
 from Screens.LocationBox import LocationBox
 from Screens.Screen import Screen
 
+# Importing Components.HdmiCec starts the HDMI-CEC handling.
+LoadAtBoot = True
 
 
 class HdmiCECSetupScreen(ConfigListScreen, Screen):
@@ -10,6 +10,9 @@ from Plugins.Plugin import PluginDescriptor
 from Components.FanControl import fancontrol
 import skin
 
+# Importing Components.FanControl applies the fan settings.
+LoadAtBoot = True
+
 
 class TempFanControl(ConfigListScreen, Screen):
 	skin = """
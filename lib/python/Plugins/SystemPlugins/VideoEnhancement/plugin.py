@@ -9,6 +9,9 @@ from .import VideoEnhancement
 import os
 import skin
 
+# Importing VideoEnhancement applies the settings.
+LoadAtBoot = True
+
 
 class VideoEnhancementSetup(ConfigListScreen, Screen):
 
@@ -4,7 +4,7 @@ from enigma import eEPGCache, getBestPlayableServiceReference, eStreamServer, eS
 from Components.config import config
 from Components.UsageConfig import defaultMoviePath
 from Components.SystemInfo import BoxInfo
-from Components.TimerSanityCheck import TimerSanityCheck
+from Components.TimerSanityCheck import TimerConflictIndex, TimerSanityCheck
 
 from Screens.MessageBox import MessageBox
 from Screens.PictureInPicture import PictureInPicture
@@ -15,9 +15,12 @@ from Tools.Alternatives import ResolveCiAlternative
 from Tools.ASCIItranslit import legacyEncode
 from Tools.CIHelper import cihelper
 from Tools.Directories import SCOPE_CONFIG, getRecordingFilename, resolveFilename
+from Tools.MovieIndex import invalidateMovie
+from Components.StorageStats import storageStats
 from Tools.Notifications import AddNotification, AddNotificationWithCallback, AddPopup
 from Tools.XMLTools import stringToXML
 from Tools.Trashcan import instance as trashcan_instance
+from Tools.TimerStore import TimerStore
 
 import timer
 import xml.etree.ElementTree
@@ -25,7 +28,7 @@ import NavigationInstance
 from ServiceReference import ServiceReference, isPlayableForCur
 
 from time import localtime, strftime, ctime, time
-from bisect import insort
+from bisect import bisect_left, bisect_right
 from sys import maxsize
 
 # ok, for descriptions etc we have:
@@ -64,9 +67,9 @@ class AFTEREVENT:
 def findSafeRecordPath(dirname):
 	if not dirname:
 		return None
-	from Components import Harddisk
+	from Components.MountTable import mountTable
 	dirname = os.path.realpath(dirname)
-	mountpoint = Harddisk.findMountPoint(dirname)
+	mountpoint = mountTable.getMountpoint(dirname)
 	if mountpoint in ('/', '/media'):
 		print('[RecordTimer] media is not mounted:', dirname)
 		return None
@@ -231,8 +234,65 @@ class RecordTimerEntry(timer.TimerEntry):
 
 	def log(self, code, msg):
 		self.log_entries.append((int(time()), code, msg))
+		log_limit = config.recording.timer_log_entries.value
+		if log_limit and len(self.log_entries) > log_limit:
+			del self.log_entries[:-log_limit]
 		print("[TIMER]", msg)
 
+	def getSaveKey(self, debug, log_limit):
+		# everything buildXML depends on, log entries are only ever appended or trimmed
+		return (self.begin, self.end, str(self.service_ref), self.repeated, self.name, self.description, self.afterEvent,
+			self.eit, self.dirname, tuple(self.tags or ()), self.disabled, self.justplay, self.always_zap, self.pipzap,
+			self.zap_wakeup, self.rename_repeat, self.conflict_detection, self.descramble, self.record_ecm,
+			tuple(self.flags), debug, log_limit, len(self.log_entries), self.log_entries and self.log_entries[-1])
+
+	def buildXML(self, debug, log_limit):
+		data = []
+		data.append('<timer')
+		data.append(' begin="' + str(int(self.begin)) + '"')
+		data.append(' end="' + str(int(self.end)) + '"')
+		data.append(' serviceref="' + stringToXML(str(self.service_ref)) + '"')
+		data.append(' repeated="' + str(int(self.repeated)) + '"')
+		data.append(' name="' + str(stringToXML(self.name)) + '"')
+		data.append(' description="' + str(stringToXML(self.description)) + '"')
+		data.append(' afterevent="' + str(stringToXML({
+			AFTEREVENT.NONE: "nothing",
+			AFTEREVENT.STANDBY: "standby",
+			AFTEREVENT.DEEPSTANDBY: "deepstandby",
+			AFTEREVENT.AUTO: "auto"
+			}[self.afterEvent])) + '"')
+		if self.eit is not None:
+			data.append(' eit="' + str(self.eit) + '"')
+		if self.dirname:
+			data.append(' location="' + str(stringToXML(self.dirname)) + '"')
+		if self.tags:
+			data.append(' tags="' + str(stringToXML(' '.join(self.tags))) + '"')
+		if self.disabled:
+			data.append(' disabled="' + str(int(self.disabled)) + '"')
+		data.append(' justplay="' + str(int(self.justplay)) + '"')
+		data.append(' always_zap="' + str(int(self.always_zap)) + '"')
+		data.append(' pipzap="' + str(int(self.pipzap)) + '"')
+		data.append(' zap_wakeup="' + str(self.zap_wakeup) + '"')
+		data.append(' rename_repeat="' + str(int(self.rename_repeat)) + '"')
+		data.append(' conflict_detection="' + str(int(self.conflict_detection)) + '"')
+		data.append(' descramble="' + str(int(self.descramble)) + '"')
+		data.append(' record_ecm="' + str(int(self.record_ecm)) + '"')
+		if self.flags:
+			data.append(' flags="' + ' '.join([stringToXML(x) for x in self.flags]) + '"')
+		data.append('>\n')
+
+		if debug:
+			for time, code, msg in (self.log_entries[-log_limit:] if log_limit else self.log_entries):
+				data.append('<log')
+				data.append(' code="' + str(code) + '"')
+				data.append(' time="' + str(time) + '"')
+				data.append('>')
+				data.append(str(stringToXML(msg)))
+				data.append('</log>\n')
+
+		data.append('</timer>\n')
+		return ''.join(data)
+
 	def calculateFilename(self, name=None):
 		service_name = self.service_ref.getServiceName()
 		begin_date = strftime("%Y%m%d %H%M", localtime(self.begin))
@@ -592,6 +652,8 @@ class RecordTimerEntry(timer.TimerEntry):
 			self.log_tuner(12, "stop")
 			if not self.justplay:
 				NavigationInstance.instance.stopRecordService(self.record_service)
+				invalidateMovie(self.Filename)
+				storageStats.invalidate(self.Filename)
 				if self.background_zap is not None and Screens.Standby.inStandby:
 					cur_ref = NavigationInstance.instance.getCurrentlyPlayingServiceReference()
 					if cur_ref and self.background_zap == cur_ref:
@@ -703,6 +765,7 @@ class RecordTimerEntry(timer.TimerEntry):
 					elif choice == "continue":
 						if self.justplay:
 							self.end = self.begin
+							NavigationInstance.instance.RecordTimer.timeChanged(self)
 						start_zap = False
 						self.log(8, "zap canceled by the user")
 				if start_zap:
@@ -871,11 +934,76 @@ def createTimer(xml):
 	return entry
 
 
+def getServiceKey(refstr):
+	# the first 11 fields identify the service, the rest (path, name) is ignored
+	return ':'.join(refstr.split(':')[:11])
+
+
+class TimerIndex:
+	# Per service interval index over a list of timers, used by isInTimer.
+	# Single timers are kept sorted by begin time so the timers overlapping an
+	# event can be found with a binary search, repeating timers are always
+	# checked because their begin time says nothing about the matching weekday.
+	# The index is rebuilt lazily on the first lookup after invalidate().
+	def __init__(self):
+		self.services = {}
+		self.keys = {}
+		self.dirty = True
+
+	def invalidate(self):
+		self.dirty = True
+
+	def build(self, timers):
+		services = {}
+		for pos, x in enumerate(timers):
+			if not x.service_ref or not x.service_ref.ref:
+				continue
+			key = getServiceKey(x.service_ref.ref.toString())
+			entry = services.get(key)
+			if entry is None:
+				entry = services[key] = [[], [], 0]  # [(begin, pos, timer)], [(pos, timer)], max duration
+			if x.repeated:
+				entry[1].append((pos, x))
+			else:
+				entry[0].append((x.begin, pos, x))
+				entry[2] = max(entry[2], x.end - x.begin)
+		for entry in services.values():
+			entry[0].sort(key=lambda item: (item[0], item[1]))
+			entry.append([item[0] for item in entry[0]])
+		self.services = services
+		self.keys = {}
+		self.dirty = False
+
+	def lookup(self, service, begin, end):
+		key = self.keys.get(service)
+		if key is None:
+			key = self.keys[service] = getServiceKey(service)
+		entry = self.services.get(key)
+		if entry is None:
+			return []
+		single, repeated, maxduration, begins = entry
+		# allow for the zap timer and margin corrections done in matchTimerEvent
+		lo = bisect_left(begins, begin - maxduration - 120)
+		hi = bisect_right(begins, end + 59)
+		if not repeated:
+			return [item[2] for item in single[lo:hi]]
+		candidates = [item[1:] for item in single[lo:hi]] + repeated
+		candidates.sort(key=lambda item: item[0])
+		return [item[1] for item in candidates]
+
+
 class RecordTimer(timer.Timer):
 	def __init__(self):
+		self.timer_index = TimerIndex()
+		self.disabled_timer_index = TimerIndex()
+		self.timer_generation = 0 # changes whenever the result of isInTimer may change
+		self.conflict_index = TimerConflictIndex()
+
 		timer.Timer.__init__(self)
 
 		self.Filename = resolveFilename(SCOPE_CONFIG, "timers.xml")
+		self.timer_store = TimerStore(self.Filename)
+		self.timer_fragments = {}
 		self.fallback_timer_list = []
 
 		try:
@@ -902,12 +1030,13 @@ class RecordTimer(timer.Timer):
 			if w.activate():
 				w.state += 1
 
-		self.timer_list.remove(w)
+		self.removeTimer(w)
+		self.invalidateTimerIndex()
 
 		# did this timer reached the last state?
 		if w.state < RecordTimerEntry.StateEnded:
 			# no, sort it into active list
-			insort(self.timer_list, w)
+			self.insertTimer(w)
 		else:
 			# yes. Process repeated, and re-add.
 			if w.repeated:
@@ -923,8 +1052,8 @@ class RecordTimer(timer.Timer):
 				# Remove old timers as set in config
 				self.cleanupDaily(config.recording.keep_timers.value)
 				# If we want to keep done timers, re-insert in the active list
-				if config.recording.keep_timers.value > 0 and w not in self.processed_timers:
-					insort(self.processed_timers, w)
+				if config.recording.keep_timers.value > 0 and w not in self.processed_timers_set:
+					self.addProcessedTimer(w)
 					self.saveTimer()
 
 		self.stateChanged(w)
@@ -937,6 +1066,22 @@ class RecordTimer(timer.Timer):
 				timer.state = RecordTimerEntry.StateWaiting
 				self.timeChanged(timer)
 
+	def addTimerEntry(self, entry, noRecalc=0):
+		timer.Timer.addTimerEntry(self, entry, noRecalc)
+		self.invalidateTimerIndex()
+
+	def insertTimer(self, entry):
+		timer.Timer.insertTimer(self, entry)
+		self.conflict_index.add(entry)
+
+	def removeTimer(self, entry):
+		timer.Timer.removeTimer(self, entry)
+		self.conflict_index.remove(entry)
+
+	def timeChanged(self, entry):
+		timer.Timer.timeChanged(self, entry)
+		self.invalidateTimerIndex()
+
 	def isRecording(self):
 		for timer in self.timer_list:
 			if timer.isRunning() and not timer.justplay:
@@ -945,7 +1090,7 @@ class RecordTimer(timer.Timer):
 
 	def loadTimer(self):
 		try:
-			doc = xml.etree.ElementTree.parse(self.Filename)
+			timers = self.timer_store.load()
 		except SyntaxError:
 			AddPopup(_("The timer file (timers.xml) is corrupt and could not be loaded."), type=MessageBox.TYPE_ERROR, timeout=0, id="TimerLoadFailed")
 
@@ -960,11 +1105,9 @@ class RecordTimer(timer.Timer):
 			print("timers.xml not found!")
 			return
 
-		root = doc.getroot()
-
 		checkit = False
 		timer_text = ""
-		for timer in root.findall("timer"):
+		for timer in timers:
 			newTimer = createTimer(timer)
 			conflict_list = self.record(newTimer, ignoreTSC=True, dosave=False, loadtimer=True)
 			if conflict_list:
@@ -1014,70 +1157,22 @@ class RecordTimer(timer.Timer):
 		#doc = xml.etree.ElementTree.ElementTree(root_element)
 		#doc.write(self.Filename)
 
-		list = []
-
-		list.append('<?xml version="1.0" ?>\n')
-		list.append('<timers>\n')
-
+		fragments = []
+		cache = {}
+		debug = config.recording.debug.value
+		log_limit = config.recording.timer_log_entries.value
 		for timer in self.timer_list + self.processed_timers:
 			if timer.dontSave:
 				continue
+			key = timer.getSaveKey(debug, log_limit)
+			fragment = self.timer_fragments.get(timer)
+			if fragment is None or fragment[0] != key:
+				fragment = (key, timer.buildXML(debug, log_limit))
+			cache[timer] = fragment
+			fragments.append(fragment[1])
+		self.timer_fragments = cache
 
-			list.append('<timer')
-			list.append(' begin="' + str(int(timer.begin)) + '"')
-			list.append(' end="' + str(int(timer.end)) + '"')
-			list.append(' serviceref="' + stringToXML(str(timer.service_ref)) + '"')
-			list.append(' repeated="' + str(int(timer.repeated)) + '"')
-			list.append(' name="' + str(stringToXML(timer.name)) + '"')
-			list.append(' description="' + str(stringToXML(timer.description)) + '"')
-			list.append(' afterevent="' + str(stringToXML({
-				AFTEREVENT.NONE: "nothing",
-				AFTEREVENT.STANDBY: "standby",
-				AFTEREVENT.DEEPSTANDBY: "deepstandby",
-				AFTEREVENT.AUTO: "auto"
-				}[timer.afterEvent])) + '"')
-			if timer.eit is not None:
-				list.append(' eit="' + str(timer.eit) + '"')
-			if timer.dirname:
-				list.append(' location="' + str(stringToXML(timer.dirname)) + '"')
-			if timer.tags:
-				list.append(' tags="' + str(stringToXML(' '.join(timer.tags))) + '"')
-			if timer.disabled:
-				list.append(' disabled="' + str(int(timer.disabled)) + '"')
-			list.append(' justplay="' + str(int(timer.justplay)) + '"')
-			list.append(' always_zap="' + str(int(timer.always_zap)) + '"')
-			list.append(' pipzap="' + str(int(timer.pipzap)) + '"')
-			list.append(' zap_wakeup="' + str(timer.zap_wakeup) + '"')
-			list.append(' rename_repeat="' + str(int(timer.rename_repeat)) + '"')
-			list.append(' conflict_detection="' + str(int(timer.conflict_detection)) + '"')
-			list.append(' descramble="' + str(int(timer.descramble)) + '"')
-			list.append(' record_ecm="' + str(int(timer.record_ecm)) + '"')
-			if timer.flags:
-				list.append(' flags="' + ' '.join([stringToXML(x) for x in timer.flags]) + '"')
-			list.append('>\n')
-
-			if config.recording.debug.value:
-				for time, code, msg in timer.log_entries:
-					list.append('<log')
-					list.append(' code="' + str(code) + '"')
-					list.append(' time="' + str(time) + '"')
-					list.append('>')
-					list.append(str(stringToXML(msg)))
-					list.append('</log>\n')
-
-			list.append('</timer>\n')
-
-		list.append('</timers>\n')
-
-		file = open(self.Filename + ".writing", "w")
-		for x in list:
-			file.write(x)
-		file.flush()
-
-		import os
-		os.fsync(file.fileno())
-		file.close()
-		os.rename(self.Filename + ".writing", self.Filename)
+		self.timer_store.save(fragments, journal=config.recording.timers_journal.value)
 
 	def getNextZapTime(self, isWakeup=False):
 		now = time()
@@ -1119,7 +1214,10 @@ class RecordTimer(timer.Timer):
 
 	def record(self, entry, ignoreTSC=False, dosave=True, loadtimer=False):
 		check_timer_list = self.timer_list[:]
-		timersanitycheck = TimerSanityCheck(check_timer_list, entry)
+		# Loading only needs to know if entry itself conflicts, which the overlap
+		# window tells. Otherwise the whole list is checked, so conflicts between
+		# other timers are reported too.
+		timersanitycheck = TimerSanityCheck(check_timer_list, entry, loadtimer and self.conflict_index or None)
 		answer = None
 		if not timersanitycheck.check():
 			if not ignoreTSC:
@@ -1252,6 +1350,7 @@ class RecordTimer(timer.Timer):
 
 	def setFallbackTimerList(self, list):
 		self.fallback_timer_list = [timer for timer in list if timer.state != 3]
+		self.invalidateTimerIndex()
 
 	def getAllTimersList(self):
 		return self.timer_list + self.fallback_timer_list
@@ -1260,154 +1359,177 @@ class RecordTimer(timer.Timer):
 		return self.processed_timers # TODO add  fallback processed timers too
 
 	def isInTimer(self, eventid, begin, duration, service, disabledTimers=False):
-		returnValue = None
-		bt = None
+		return self.isInTimerBatch([(service, eventid, begin, duration)], disabledTimers)[0]
+
+	def isInTimerBatch(self, events, disabledTimers=False):
+		# events is a list of (service, eventid, begin, duration) tuples, as returned
+		# by eEPGCache.lookupEvent with the "RIBD" query. For every event the result
+		# list holds the same (time_match, [types]) tuple or None as isInTimer.
+		index = self.getTimerIndex(disabledTimers)
 		check_offset_time = not config.recording.margin_before.value and not config.recording.margin_after.value
+		result = []
+		for service, eventid, begin, duration in events:
+			returnValue = None
+			if begin and duration is not None:
+				end = begin + duration
+				for x in index.lookup(service, begin, end):
+					time_match, type = self.matchTimerEvent(x, begin, duration, check_offset_time)
+					if time_match:
+						if type in (2, 7, 12, 17, 22, 27, 32):
+							# When full recording do not look further
+							returnValue = (time_match, [type])
+							break
+						elif returnValue:
+							if type not in returnValue[1]:
+								returnValue[1].append(type)
+						else:
+							returnValue = (time_match, [type])
+			result.append(returnValue)
+		return result
+
+	def getTimerIndex(self, disabledTimers=False):
+		if disabledTimers:
+			index = self.disabled_timer_index
+			if index.dirty:
+				index.build([x for x in self.getDisabledTimers() if x.disabled])
+		else:
+			index = self.timer_index
+			if index.dirty:
+				index.build(self.getAllTimersList())
+		return index
+
+	def invalidateTimerIndex(self):
+		self.timer_generation += 1
+		self.timer_index.invalidate()
+		self.disabled_timer_index.invalidate()
+
+	def matchTimerEvent(self, x, begin, duration, check_offset_time):
 		end = begin + duration
-		refstr = ':'.join(service.split(':')[:11])
-		timersList = self.getAllTimersList()[:] if not disabledTimers else self.getDisabledTimers()[:]
-		for x in timersList:
-			if disabledTimers and not x.disabled:
-				continue
-			check = ':'.join(x.service_ref.ref.toString().split(':')[:11]) == refstr
-			if check:
-				time_match = type = type_offset = 0
-				timer_end = x.end
-				timer_begin = x.begin
-				timer_repeat = x.repeated
-
-				if not timer_repeat and check_offset_time:
-					if 0 < end - timer_end <= 59:
-						timer_end = end
-					if 0 < timer_begin - begin <= 59:
-						timer_begin = begin
-				if x.justplay:
-					type_offset = 5
-					if (timer_end - x.begin) <= 1:
-						timer_end += 60
-					if x.pipzap and not timer_repeat:
-						type_offset = 30
-				if x.always_zap:
-					type_offset = 10
-
-				# if set 'don't stop current event but disable coming events' for repeat timer
-				running_only_curevent = x.disabled and x.isRunning() and timer_repeat
-				if running_only_curevent:
-					timer_repeat = 0
-					type_offset += 15
-
-				if timer_repeat != 0:
-					type_offset += 15
-					if bt is None:
-						bt = localtime(begin)
-						bday = bt.tm_wday
-						begin2 = 1440 + bt.tm_hour * 60 + bt.tm_min
-						end2 = begin2 + duration // 60
-					xbt = localtime(x.begin)
-					xet = localtime(timer_end)
-					offset_day = False
-					checking_time = x.begin < begin or begin <= x.begin <= end
-					if xbt.tm_yday != xet.tm_yday:
-						oday = bday - 1
-						if oday == -1:
-							oday = 6
-						offset_day = timer_repeat & (1 << oday)
-					xbegin = 1440 + xbt.tm_hour * 60 + xbt.tm_min
-					xend = xbegin + ((timer_end - x.begin) // 60)
-					if xend < xbegin:
-						xend += 1440
-					if timer_repeat & (1 << bday) and checking_time:
-						if begin2 < xbegin <= end2:
-							if xend < end2:
-								# recording within event
-								time_match = (xend - xbegin) * 60
-								type = type_offset + 3
-							else:
-								# recording last part of event
-								time_match = (end2 - xbegin) * 60
-								type = type_offset + 1
-						elif xbegin <= begin2 <= xend:
-							if xend < end2:
-								# recording first part of event
-								time_match = (xend - begin2) * 60
-								type = type_offset + 4
-							else:
-								# recording whole event
-								time_match = (end2 - begin2) * 60
-								type = type_offset + 2
-						elif offset_day:
-							xbegin -= 1440
-							xend -= 1440
-							if begin2 < xbegin <= end2:
-								if xend < end2:
-									# recording within event
-									time_match = (xend - xbegin) * 60
-									type = type_offset + 3
-								else:
-									# recording last part of event
-									time_match = (end2 - xbegin) * 60
-									type = type_offset + 1
-							elif xbegin <= begin2 <= xend:
-								if xend < end2:
-									# recording first part of event
-									time_match = (xend - begin2) * 60
-									type = type_offset + 4
-								else:
-									# recording whole event
-									time_match = (end2 - begin2) * 60
-									type = type_offset + 2
-					elif offset_day and checking_time:
-						xbegin -= 1440
-						xend -= 1440
-						if begin2 < xbegin <= end2:
-							if xend < end2:
-								# recording within event
-								time_match = (xend - xbegin) * 60
-								type = type_offset + 3
-							else:
-								# recording last part of event
-								time_match = (end2 - xbegin) * 60
-								type = type_offset + 1
-						elif xbegin <= begin2 <= xend:
-							if xend < end2:
-								# recording first part of event
-								time_match = (xend - begin2) * 60
-								type = type_offset + 4
-							else:
-								# recording whole event
-								time_match = (end2 - begin2) * 60
-								type = type_offset + 2
-				else:
-					if begin < timer_begin <= end:
-						if timer_end < end:
+		time_match = type = type_offset = 0
+		timer_end = x.end
+		timer_begin = x.begin
+		timer_repeat = x.repeated
+
+		if not timer_repeat and check_offset_time:
+			if 0 < end - timer_end <= 59:
+				timer_end = end
+			if 0 < timer_begin - begin <= 59:
+				timer_begin = begin
+		if x.justplay:
+			type_offset = 5
+			if (timer_end - x.begin) <= 1:
+				timer_end += 60
+			if x.pipzap and not timer_repeat:
+				type_offset = 30
+		if x.always_zap:
+			type_offset = 10
+
+		# if set 'don't stop current event but disable coming events' for repeat timer
+		running_only_curevent = x.disabled and x.isRunning() and timer_repeat
+		if running_only_curevent:
+			timer_repeat = 0
+			type_offset += 15
+
+		if timer_repeat != 0:
+			type_offset += 15
+			bt = localtime(begin)
+			bday = bt.tm_wday
+			begin2 = 1440 + bt.tm_hour * 60 + bt.tm_min
+			end2 = begin2 + duration // 60
+			xbt = localtime(x.begin)
+			xet = localtime(timer_end)
+			offset_day = False
+			checking_time = x.begin < begin or begin <= x.begin <= end
+			if xbt.tm_yday != xet.tm_yday:
+				oday = bday - 1
+				if oday == -1:
+					oday = 6
+				offset_day = timer_repeat & (1 << oday)
+			xbegin = 1440 + xbt.tm_hour * 60 + xbt.tm_min
+			xend = xbegin + ((timer_end - x.begin) // 60)
+			if xend < xbegin:
+				xend += 1440
+			if timer_repeat & (1 << bday) and checking_time:
+				if begin2 < xbegin <= end2:
+					if xend < end2:
+						# recording within event
+						time_match = (xend - xbegin) * 60
+						type = type_offset + 3
+					else:
+						# recording last part of event
+						time_match = (end2 - xbegin) * 60
+						type = type_offset + 1
+				elif xbegin <= begin2 <= xend:
+					if xend < end2:
+						# recording first part of event
+						time_match = (xend - begin2) * 60
+						type = type_offset + 4
+					else:
+						# recording whole event
+						time_match = (end2 - begin2) * 60
+						type = type_offset + 2
+				elif offset_day:
+					xbegin -= 1440
+					xend -= 1440
+					if begin2 < xbegin <= end2:
+						if xend < end2:
 							# recording within event
-							time_match = timer_end - timer_begin
+							time_match = (xend - xbegin) * 60
 							type = type_offset + 3
 						else:
 							# recording last part of event
-							time_match = end - timer_begin
+							time_match = (end2 - xbegin) * 60
 							type = type_offset + 1
-					elif timer_begin <= begin <= timer_end:
-						if timer_end < end:
+					elif xbegin <= begin2 <= xend:
+						if xend < end2:
 							# recording first part of event
-							time_match = timer_end - begin
+							time_match = (xend - begin2) * 60
 							type = type_offset + 4
 						else:
 							# recording whole event
-							time_match = end - begin
+							time_match = (end2 - begin2) * 60
 							type = type_offset + 2
-				if time_match:
-					if type in (2, 7, 12, 17, 22, 27, 32):
-						# When full recording do not look further
-						returnValue = (time_match, [type])
-						break
-					elif returnValue:
-						if type not in returnValue[1]:
-							returnValue[1].append(type)
+			elif offset_day and checking_time:
+				xbegin -= 1440
+				xend -= 1440
+				if begin2 < xbegin <= end2:
+					if xend < end2:
+						# recording within event
+						time_match = (xend - xbegin) * 60
+						type = type_offset + 3
 					else:
-						returnValue = (time_match, [type])
-
-		return returnValue
+						# recording last part of event
+						time_match = (end2 - xbegin) * 60
+						type = type_offset + 1
+				elif xbegin <= begin2 <= xend:
+					if xend < end2:
+						# recording first part of event
+						time_match = (xend - begin2) * 60
+						type = type_offset + 4
+					else:
+						# recording whole event
+						time_match = (end2 - begin2) * 60
+						type = type_offset + 2
+		else:
+			if begin < timer_begin <= end:
+				if timer_end < end:
+					# recording within event
+					time_match = timer_end - timer_begin
+					type = type_offset + 3
+				else:
+					# recording last part of event
+					time_match = end - timer_begin
+					type = type_offset + 1
+			elif timer_begin <= begin <= timer_end:
+				if timer_end < end:
+					# recording first part of event
+					time_match = timer_end - begin
+					type = type_offset + 4
+				else:
+					# recording whole event
+					time_match = end - begin
+					type = type_offset + 2
+		return time_match, type
 
 	def removeEntry(self, entry):
 		print("[Timer] Remove " + str(entry))
@@ -1424,25 +1546,28 @@ class RecordTimer(timer.Timer):
 			self.timeChanged(entry)
 
 		print("state: ", entry.state)
-		print("in processed: ", entry in self.processed_timers)
-		print("in running: ", entry in self.timer_list)
+		print("in processed: ", entry in self.processed_timers_set)
+		print("in running: ", entry in self.timer_heap_seq)
 		# autoincrease instanttimer if possible
 		if not entry.dontSave:
 			for x in self.timer_list:
 				if x.setAutoincreaseEnd():
 					self.timeChanged(x)
-		if entry in self.processed_timers:
-			# now the timer should be in the processed_timers list. remove it from there.
-			self.processed_timers.remove(entry)
+		# now the timer should be in the processed_timers list. remove it from there.
+		self.removeProcessedTimer(entry)
+		self.invalidateTimerIndex()
 		self.saveTimer()
 
 	def shutdown(self):
+		self.timer_store.compact_pending = True
 		self.saveTimer()
 
 	def cleanup(self):
 		timer.Timer.cleanup(self)
+		self.invalidateTimerIndex()
 		self.saveTimer()
 
 	def cleanupDaily(self, days):
 		timer.Timer.cleanupDaily(self, days)
+		self.invalidateTimerIndex()
 		self.saveTimer()
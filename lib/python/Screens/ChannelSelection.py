@@ -15,6 +15,8 @@ from Components.ServiceList import ServiceList, refreshServiceList
 from Components.ActionMap import NumberActionMap, ActionMap, HelpableActionMap, HelpableNumberActionMap
 from Components.MenuList import MenuList
 from Components.ServiceEventTracker import ServiceEventTracker, InfoBarBase
+from Components.ZapPredictor import zapPredictor
+from Components.ZapTrace import zapTrace
 profile("ChannelSelection.py 1")
 from Screens.EpgSelection import EPGSelection
 from enigma import eServiceReference, eEPGCache, eServiceCenter, eRCInput, eTimer, eDVBDB, iPlayableService, iServiceInformation, getPrevAsciiCode
@@ -44,7 +46,7 @@ from Screens.RdsDisplay import RassInteractive
 from ServiceReference import ServiceReference
 from Tools.BoundFunction import boundFunction
 from Tools.Notifications import RemovePopup
-from Tools.Alternatives import GetWithAlternative
+from Tools.Alternatives import GetWithAlternative, bouquetsChanged, reloadBouquets
 from Tools.Directories import fileExists, resolveFilename, sanitizeFilename, SCOPE_PLUGINS
 from Plugins.Plugin import PluginDescriptor
 from Components.PluginComponent import plugins
@@ -387,13 +389,13 @@ class ChannelContextMenu(Screen):
 
 	def addDedicated3DFlag(self):
 		eDVBDB.getInstance().addFlag(eServiceReference(self.csel.getCurrentSelection().toString()), FLAG_IS_DEDICATED_3D)
-		eDVBDB.getInstance().reloadBouquets()
+		reloadBouquets()
 		self.set3DMode(True)
 		self.close()
 
 	def removeDedicated3DFlag(self):
 		eDVBDB.getInstance().removeFlag(eServiceReference(self.csel.getCurrentSelection().toString()), FLAG_IS_DEDICATED_3D)
-		eDVBDB.getInstance().reloadBouquets()
+		reloadBouquets()
 		self.set3DMode(False)
 		self.close()
 
@@ -413,13 +415,13 @@ class ChannelContextMenu(Screen):
 
 	def addCenterDVBSubsFlag(self):
 		eDVBDB.getInstance().addFlag(eServiceReference(self.csel.getCurrentSelection().toString()), FLAG_CENTER_DVB_SUBS)
-		eDVBDB.getInstance().reloadBouquets()
+		reloadBouquets()
 		config.subtitles.dvb_subtitles_centered.value = True
 		self.close()
 
 	def removeCenterDVBSubsFlag(self):
 		eDVBDB.getInstance().removeFlag(eServiceReference(self.csel.getCurrentSelection().toString()), FLAG_CENTER_DVB_SUBS)
-		eDVBDB.getInstance().reloadBouquets()
+		reloadBouquets()
 		config.subtitles.dvb_subtitles_centered.value = False
 		self.close()
 
@@ -487,7 +489,7 @@ class ChannelContextMenu(Screen):
 			if self.csel.movemode:
 				self.csel.toggleMoveMode()
 			self.csel.removeBouquet()
-			eDVBDB.getInstance().reloadBouquets()
+			reloadBouquets()
 			self.close()
 
 	def purgeDeletedBouquets(self):
@@ -511,6 +513,7 @@ class ChannelContextMenu(Screen):
 		eDVBDBInstance = eDVBDB.getInstance()
 		eDVBDBInstance.setLoadUnlinkedUserbouquets(1)
 		eDVBDBInstance.reloadBouquets()
+		bouquetsChanged()
 		eDVBDBInstance.setLoadUnlinkedUserbouquets(int(config.misc.load_unlinked_userbouquets.value))
 		refreshServiceList()
 		self.csel.showFavourites()
@@ -538,8 +541,7 @@ class ChannelContextMenu(Screen):
 		self.close(False)
 
 	def reloadServicesBouquets(self):
-		eDVBDB.getInstance().reloadBouquets()
-		eDVBDB.getInstance().reloadServicelist()
+		reloadBouquets(servicelist=True)
 		self.session.openWithCallback(self.close, MessageBox, _("The services/bouquets list is reloaded!"), MessageBox.TYPE_INFO, timeout=5)
 
 	def showServiceInformations(self):
@@ -1052,6 +1054,7 @@ class ChannelSelectionEdit:
 				mutableList.addService(current)
 				mutableList.moveService(current, index)
 				mutableList.flushChanges()
+				bouquetsChanged()
 				self.servicelist.addService(current, True)
 				self.servicelist.removeCurrent()
 				if not self.servicelist.atEnd():
@@ -1063,6 +1066,7 @@ class ChannelSelectionEdit:
 		if mutableList:
 			if not mutableList.addService(serviceref, current):
 				mutableList.flushChanges()
+				bouquetsChanged()
 				self.servicelist.addService(serviceref, True)
 				self.servicelist.resetRoot()
 
@@ -1077,10 +1081,12 @@ class ChannelSelectionEdit:
 				if not mutableList.addService(ref, current):
 					self.servicelist.addService(ref, True)
 					mutableList.flushChanges()
+					bouquetsChanged()
 					break
 			elif not mutableList.addService(ref):
 				self.servicelist.addService(ref, True)
 				mutableList.flushChanges()
+				bouquetsChanged()
 				break
 			cnt += 1
 
@@ -1101,13 +1107,14 @@ class ChannelSelectionEdit:
 			if not mutableBouquet.addService(new_ref.ref, cur_service.ref):
 				mutableBouquet.removeService(cur_service.ref)
 				mutableBouquet.flushChanges()
-				eDVBDB.getInstance().reloadBouquets()
+				reloadBouquets()
 				mutableAlternatives = new_ref.list().startEdit()
 				if mutableAlternatives:
 					mutableAlternatives.setListName(name)
 					if mutableAlternatives.addService(cur_service.ref):
 						print("add", cur_service.ref.toString(), "to new alternatives failed")
 					mutableAlternatives.flushChanges()
+					bouquetsChanged()
 					self.servicelist.addService(new_ref.ref, True)
 					self.servicelist.removeCurrent()
 					if not end:
@@ -1134,7 +1141,7 @@ class ChannelSelectionEdit:
 			new_bouquet_ref = eServiceReference((self.mode == MODE_TV and '1:7:1:0:0:0:0:0:0:0:FROM BOUQUET "userbouquet.%s.tv" ORDER BY bouquet' or '1:7:2:0:0:0:0:0:0:0:FROM BOUQUET "userbouquet.%s.radio" ORDER BY bouquet') % name)
 			if not mutableBouquetList.addService(new_bouquet_ref):
 				mutableBouquetList.flushChanges()
-				eDVBDB.getInstance().reloadBouquets()
+				reloadBouquets()
 				mutableBouquet = serviceHandler.list(new_bouquet_ref).startEdit()
 				if mutableBouquet:
 					mutableBouquet.setListName(bName)
@@ -1143,6 +1150,7 @@ class ChannelSelectionEdit:
 							if mutableBouquet.addService(service):
 								print("add", service.toString(), "to new bouquet failed")
 					mutableBouquet.flushChanges()
+					bouquetsChanged()
 				else:
 					print("get mutable list for new created bouquet failed")
 				# do some voodoo to check if current_root is equal to bouquet_root
@@ -1287,6 +1295,7 @@ class ChannelSelectionEdit:
 				if self.bouquet_mark_edit == EDIT_ALTERNATIVES and not new_marked and self.__marked:
 					self.mutableList.addService(eServiceReference(self.__marked[0]))
 				self.mutableList.flushChanges()
+				bouquetsChanged()
 		self.__marked = []
 		self.clearMarks()
 		self.bouquet_mark_edit = OFF
@@ -1338,6 +1347,7 @@ class ChannelSelectionEdit:
 		if ref.valid() and mutableList is not None:
 			if not mutableList.removeService(ref):
 				mutableList.flushChanges() #FIXME dont flush on each single removed service
+				bouquetsChanged()
 				self.servicelist.removeCurrent()
 				self.servicelist.resetRoot()
 				playingref = self.session.nav.getCurrentlyPlayingServiceOrGroup()
@@ -1351,6 +1361,7 @@ class ChannelSelectionEdit:
 				service = self.servicelist.getCurrent()
 			if not mutableList.addService(service):
 				mutableList.flushChanges()
+				bouquetsChanged()
 				# do some voodoo to check if current_root is equal to dest
 				cur_root = self.getRoot()
 				str1 = cur_root and cur_root.toString() or -1
@@ -1368,6 +1379,7 @@ class ChannelSelectionEdit:
 				self.toggleMoveMarked() # unmark current entry
 			self.movemode = False
 			self.mutableList.flushChanges() # FIXME add check if changes was made
+			bouquetsChanged()
 			self.mutableList = None
 			self.functiontitle = ""
 			self.compileTitle()
@@ -2295,6 +2307,7 @@ class ChannelSelection(ChannelSelectionBase, ChannelSelectionEdit, ChannelSelect
 					self.setStartRoot(self.curRoot)
 					self.setCurrentSelection(ref)
 		elif ref is None or ref != nref:
+			zapTrace.begin("channelselection")
 			Screens.InfoBar.InfoBar.instance.checkTimeshiftRunning(boundFunction(self.zapCheckTimeshiftCallback, preview_zap, nref))
 		elif not preview_zap:
 			self.saveRoot()
@@ -2308,6 +2321,7 @@ class ChannelSelection(ChannelSelectionBase, ChannelSelectionEdit, ChannelSelect
 
 	def zapCheckTimeshiftCallback(self, preview_zap, nref, answer):
 		if answer:
+			zapTrace.mark("timeshift")
 			self.new_service_played = True
 			self.session.nav.playService(nref, adjust=preview_zap and [0, self.session] or True)
 			if not preview_zap:
@@ -2326,9 +2340,11 @@ class ChannelSelection(ChannelSelectionBase, ChannelSelectionEdit, ChannelSelect
 			else:
 				RemovePopup("Parental control")
 				self.setCurrentSelection(nref)
-		elif not self.dopipzap:
-			self.setStartRoot(self.curRoot)
-			self.setCurrentSelection(self.session.nav.getCurrentlyPlayingServiceOrGroup())
+		else:
+			zapTrace.cancel()
+			if not self.dopipzap:
+				self.setStartRoot(self.curRoot)
+				self.setCurrentSelection(self.session.nav.getCurrentlyPlayingServiceOrGroup())
 		if not preview_zap:
 			self.hide()
 
@@ -2339,6 +2355,8 @@ class ChannelSelection(ChannelSelectionBase, ChannelSelectionEdit, ChannelSelect
 
 	def addToHistory(self, ref):
 		if self.servicePath is not None:
+			if self.history and not self.dopipzap:
+				zapPredictor.addTransition(self.history[self.history_pos][-1].toString(), ref.toString())
 			tmp = self.servicePath[:]
 			tmp.append(ref)
 			try:
@@ -1,6 +1,6 @@
-import os
 import Components.Task
-from twisted.internet import task
+from Components.StorageStats import storageStats
+from Tools.Transfer import Transfer, getInterruptedTransfers
 
 
 class FailedPostcondition(Components.Task.Condition):
@@ -16,71 +16,39 @@ class FailedPostcondition(Components.Task.Condition):
 
 class CopyFileTask(Components.Task.PythonTask):
 	def openFiles(self, fileList):
+		self.setTransfer(Transfer(fileList, name=self.name))
+
+	def setTransfer(self, transfer):
 		self.callback = None
-		self.fileList = fileList
-		self.handles = [(os.open(fn[0], os.O_RDONLY), os.open(fn[1], os.O_CREAT | os.O_EXCL | os.O_WRONLY)) for fn in fileList]
-		self.end = 0
-		for src, dst in fileList:
-			try:
-				self.end += os.stat(src).st_size
-			except:
-				print("Failed to stat", src)
-		if not self.end:
-			self.end = 1
+		self.transfer = transfer
+		self.fileList = transfer.fileList
+		self.end = transfer.size or 1
 		print("[CopyFileTask] size:", self.end)
 
-
 	def work(self):
-		print("[CopyFileTask] handles ", len(self.handles))
-
-		BS = 8 * 1024 * 1024  # 8 MB for sendfile
-		try:
-			for src, dst in self.handles:
-				size = os.fstat(src).st_size
-				offset = 0
-
-				while offset < size:
-					if self.aborted:
-						print("[CopyFileTask] aborting")
-						raise Exception("Aborted")
-
-					to_send = min(BS, size - offset)
-					sent = os.sendfile(dst, src, offset, to_send)
-					if sent <= 0:
-						raise Exception("sendfile failed!")
-					offset += sent
-					self.pos += sent
-		except Exception as ex:
-			print("[CopyFileTask]", ex)
-			for s, d in self.fileList:
-				# Remove incomplete data.
-				try:
-					os.unlink(d)
-				except:
-					pass
-			raise
-		finally:
-			# In any event, close all handles
-			for src, dst in self.handles:
-				try:
-					os.close(src)
-					os.close(dst)
-				except:
-					pass
+		print("[CopyFileTask] files ", len(self.fileList))
+		self.pos = self.transfer.copied
+		self.transfer.run(self.setPos)
+
+	def setPos(self, pos):
+		self.pos = pos
+
+	def onComplete(self, result):
+		for src, dst in self.fileList:
+			if self.transfer.move:
+				storageStats.invalidate(src)
+			storageStats.invalidate(dst)
+		Components.Task.PythonTask.onComplete(self, result)
+
+	def abort(self):
+		print("[CopyFileTask] aborting")
+		self.transfer.aborted = True
+		Components.Task.PythonTask.abort(self)
 
 
 class MoveFileTask(CopyFileTask):
-	def work(self):
-		CopyFileTask.work(self)
-		print("[MoveFileTask]: delete source files")
-		errors = []
-		for s, d in self.fileList:
-			try:
-				os.unlink(s)
-			except Exception as e:
-				errors.append(e)
-		if errors:
-			raise errors[0]
+	def openFiles(self, fileList):
+		self.setTransfer(Transfer(fileList, move=True, name=self.name))
 
 
 def copyFiles(fileList, name):
@@ -97,3 +65,13 @@ def moveFiles(fileList, name):
 	task = MoveFileTask(job, name)
 	task.openFiles(fileList)
 	Components.Task.job_manager.AddJob(job)
+
+
+def resumeTransfers():
+	# restart the copies and moves interrupted by a reboot or crash
+	for transfer in getInterruptedTransfers():
+		print("[CopyFiles] resuming", transfer.name)
+		job = Components.Task.Job(transfer.name)
+		task = (MoveFileTask if transfer.move else CopyFileTask)(job, transfer.name)
+		task.setTransfer(transfer)
+		Components.Task.job_manager.AddJob(job)
@@ -1,6 +1,6 @@
 from Screens.Screen import Screen
 from Components.ActionMap import ActionMap
-from Components.Harddisk import harddiskmanager
+from Components.Harddisk import harddiskmanager, diskActivity
 from Components.MenuList import MenuList
 from Components.Label import Label
 from Components.Pixmap import Pixmap
@@ -16,6 +16,12 @@ class HarddiskSetup(Screen):
 		self["model"] = Label(_("Model: ") + hdd.model())
 		self["capacity"] = Label(_("Capacity: ") + hdd.capacity())
 		self["bus"] = Label(_("Bus: ") + hdd.bus())
+		self.hdd = hdd
+		self["state"] = Label()
+		if hdd.idle_running:
+			diskActivity.addListener(self.updateState, 2)
+			self.onClose.append(self.removeListener)
+		self.updateState()
 		self["key_red"] = Label(_("Cancel"))
 		self["key_green"] = Label(text) # text can be either "Initialize" or "Check"
 		self["actions"] = ActionMap(["OkCancelActions"],
@@ -29,6 +35,16 @@ class HarddiskSetup(Screen):
 			"green": self.hddQuestion
 		})
 
+	def updateState(self):
+		if not self.hdd.idle_running or self.hdd.last_stat is None:
+			return
+		read, written = self.hdd.getIORate()
+		state = self.hdd.isSleeping() and _("standby") or _("active")
+		self["state"].setText(_("State: %s, read %d kB/s, write %d kB/s") % (state, read // 1024, written // 1024))
+
+	def removeListener(self):
+		diskActivity.removeListener(self.updateState)
+
 	def hddQuestion(self):
 		message = self.question + "\n" + _("You can continue watching TV etc. while this is running.")
 		self.session.openWithCallback(self.hddConfirmed, MessageBox, message)
@@ -315,7 +315,8 @@ class MoviePlayer(InfoBarBase, InfoBarShowHide, InfoBarMenu, InfoBarSeek, InfoBa
 					import Tools.Trashcan
 					try:
 						trash = Tools.Trashcan.createTrashFolder(ref.getPath())
-						Screens.MovieSelection.moveServiceFiles(ref, trash)
+						moved = Screens.MovieSelection.moveServiceFiles(ref, trash)
+						Tools.Trashcan.addToTrash(trash, [item[1] for item in moved])
 						# Moved to trash, okay
 						if answer == "quitanddelete":
 							self.close()
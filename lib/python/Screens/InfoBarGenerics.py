@@ -2,7 +2,8 @@ from Screens.ChannelSelection import ChannelSelection, BouquetSelector, SilentBo
 
 from Components.ActionMap import ActionMap, HelpableActionMap
 from Components.ActionMap import NumberActionMap, HelpableNumberActionMap
-from Components.Harddisk import harddiskmanager, findMountPoint
+from Components.ChannelNumbers import channelNumbers
+from Components.Harddisk import harddiskmanager
 from Components.Input import Input
 from Components.Label import Label
 from Components.MovieList import AUDIO_EXTENSIONS, MOVIE_EXTENSIONS, DVD_EXTENSIONS
@@ -36,9 +37,11 @@ from Screens.TimeDateInput import TimeDateInput
 from Screens.UnhandledKey import UnhandledKey
 from ServiceReference import ServiceReference, isPlayableForCur
 
+from Tools.Alternatives import reloadBouquets
 from Tools.ASCIItranslit import legacyEncode
 from Tools.Directories import fileExists, getRecordingFilename, moveFiles
 from Tools.Notifications import AddPopup, AddNotificationWithCallback, current_notifications, lock, notificationAdded, notifications, RemovePopup
+from Tools.ResumePoints import resumePointsInstance
 
 from enigma import eTimer, eServiceCenter, eDVBServicePMTHandler, iServiceInformation, iPlayableService, eServiceReference, eEPGCache, eActionMap, getDesktop, eDVBDB
 from skin import findSkinScreen
@@ -49,7 +52,6 @@ from sys import maxsize
 import itertools
 import datetime
 from re import match
-from pickle import load as pickle_load, dump as pickle_dump, HIGHEST_PROTOCOL as pickle_HIGHEST_PROTOCOL
 
 from RecordTimer import RecordTimerEntry, RecordTimer, findSafeRecordPath
 
@@ -61,74 +63,6 @@ def isStandardInfoBar(self):
 	return self.__class__.__name__ == "InfoBar"
 
 
-class ResumePoints():
-	def __init__(self):
-		self.resumePointFile = "/etc/enigma2/resumepoints.pkl"
-		self.resumePointCache = {}
-		self.loadResumePoints()
-		self.cacheCleanTimer = eTimer()
-		self.cacheCleanTimer.callback.append(self.cleanCache)
-		self.cleanCache()  # get rid of stale entries on reboot
-
-	def loadResumePoints(self):
-		self.resumePointCache.clear()
-		if fileExists(self.resumePointFile):
-			with open(self.resumePointFile, "rb") as f:
-				self.resumePointCache.update(pickle_load(f, fix_imports=True, encoding="utf8"))
-
-	def saveResumePoints(self):
-		with open(self.resumePointFile, "wb") as f:
-			pickle_dump(self.resumePointCache, f, pickle_HIGHEST_PROTOCOL)
-
-	def delResumePoint(self, ref):
-		if (sref := ref.toString()) in self.resumePointCache:
-			del self.resumePointCache[sref]
-			self.saveResumePoints()
-
-	def cleanCache(self):
-		changed = False
-		now = int(time())
-		self.cacheCleanTimer.stop()
-		for sref, v in list(self.resumePointCache.items()):
-			if "%3a//" in sref:  # resume point is stream
-				if now > v[0] + 90 * 24 * 60 * 60:  # keep stream resume points maximum 90 days
-					del self.resumePointCache[sref]
-					changed = True
-			else:
-				filepath = os.path.realpath(sref.split(':')[-1])
-				mountpoint = findMountPoint(filepath)
-				if os.path.ismount(mountpoint) and not os.path.exists(filepath):
-					del self.resumePointCache[sref]
-					changed = True
-		if changed:
-			self.saveResumePoints()
-		self.cacheCleanTimer.startLongTimer(24 * 60 * 60)  # clean up daily
-
-	def setResumePoint(self, session):
-		service = session.nav.getCurrentService()
-		ref = session.nav.getCurrentlyPlayingServiceOrGroup()
-		if service is not None and ref is not None:  # and (ref.type != 1):
-			# ref type 1 has its own memory...
-			seek = service.seek()
-			if seek:
-				pos = seek.getPlayPosition()
-				if not pos[0]:
-					sref = ref.toString()
-					sl = x[1] if (x := seek.getLength()) else None
-					self.resumePointCache[sref] = [int(time()), pos[1], sl]
-					self.saveResumePoints()
-
-	def getResumePoint(self, session):
-		ref = session.nav.getCurrentlyPlayingServiceOrGroup()
-		if (ref is not None) and (ref.type != 1) and (sref := ref.toString()) in self.resumePointCache:
-			entry = self.resumePointCache[sref]
-			entry[0] = int(time())  # update LRU timestamp
-			return entry[1]
-
-
-resumePointsInstance = ResumePoints()
-
-
 class whitelist:
 	FILENAME_VBI = "/etc/enigma2/whitelist_vbi"
 	vbi = []
@@ -793,39 +727,8 @@ class InfoBarNumberZap:
 		if service:
 			self.selectAndStartService(service, bouquet)
 
-	def searchNumberHelper(self, serviceHandler, num, bouquet):
-		servicelist = serviceHandler.list(bouquet)
-		if servicelist:
-			serviceIterator = servicelist.getNext()
-			while serviceIterator.valid():
-				if num == serviceIterator.getChannelNum():
-					return serviceIterator
-				serviceIterator = servicelist.getNext()
-		return None
-
 	def searchNumber(self, number, firstBouquetOnly=False, bouquet=None):
-		bouquet = bouquet or self.servicelist.getRoot()
-		service = None
-		serviceHandler = eServiceCenter.getInstance()
-		if not firstBouquetOnly:
-			service = self.searchNumberHelper(serviceHandler, number, bouquet)
-		if config.usage.multibouquet.value and not service:
-			bouquet = self.servicelist.bouquet_root
-			bouquetlist = serviceHandler.list(bouquet)
-			if bouquetlist:
-				bouquet = bouquetlist.getNext()
-				while bouquet.valid():
-					if bouquet.flags & eServiceReference.isDirectory and not bouquet.flags & eServiceReference.isInvisible:
-						service = self.searchNumberHelper(serviceHandler, number, bouquet)
-						if service:
-							playable = not (service.flags & (eServiceReference.isMarker | eServiceReference.isDirectory)) or (service.flags & eServiceReference.isNumberedMarker)
-							if not playable:
-								service = None
-							break
-						if config.usage.alternative_number_mode.value or firstBouquetOnly:
-							break
-					bouquet = bouquetlist.getNext()
-		return service, bouquet
+		return channelNumbers.searchNumber(number, bouquet or self.servicelist.getRoot(), self.servicelist.bouquet_root, firstBouquetOnly)
 
 	def selectAndStartService(self, service, bouquet):
 		if service and not service.flags & eServiceReference.isMarker:
@@ -2465,6 +2368,8 @@ class InfoBarPlugins:
 		l = []
 		for p in plugins.getPlugins(where=PluginDescriptor.WHERE_EXTENSIONSMENU):
 			args = inspect.getfullargspec(p.fnc)[0]
+			if inspect.ismethod(p.fnc):
+				args = args[1:] # self, like a plugin that is not loaded yet
 			if len(args) == 1 or len(args) == 2 and isinstance(self, InfoBarChannelSelection):
 				l.append(((boundFunction(self.getPluginName, p.name), boundFunction(self.runPlugin, p), lambda: True), None, p.name))
 		l.sort(key=lambda e: e[2]) # sort by name
@@ -3254,8 +3159,7 @@ class InfoBarNotifications:
 
 			if n[4] and n[4].startswith("ChannelsImport"):
 				if "channels" in config.usage.remote_fallback_import.value:
-					eDVBDB.getInstance().reloadBouquets()
-					eDVBDB.getInstance().reloadServicelist()
+					reloadBouquets(servicelist=True)
 					from Components.ParentalControl import parentalControl
 					parentalControl.open()
 					refreshServiceList()
@@ -5,7 +5,7 @@ from Components.Sources.StaticText import StaticText
 from Components.config import config, ConfigSubsection, ConfigBoolean, ConfigSelection, ConfigYesNo, ConfigIP, ConfigNothing
 from Components.Network import iNetwork
 from Components.Opkg import OpkgComponent
-from enigma import eDVBDB
+from Tools.Alternatives import reloadBouquets
 
 config.misc.installwizard = ConfigSubsection()
 config.misc.installwizard.hasnetwork = ConfigBoolean(default=False)
@@ -185,6 +185,5 @@ class InstallWizardOpkgUpdater(Screen):
 					return
 				else:
 					config.misc.installwizard.channellistdownloaded.value = True
-					eDVBDB.getInstance().reloadBouquets()
-					eDVBDB.getInstance().reloadServicelist()
+					reloadBouquets(servicelist=True)
 			self.close()
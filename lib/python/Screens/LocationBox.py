@@ -13,6 +13,7 @@ from Screens.ChoiceBox import ChoiceBox
 from Tools.BoundFunction import boundFunction
 from Tools.Directories import createDir as directories_createDir, removeDir as directories_removeDir
 from Components.config import config
+from Components.StorageStats import storageStats
 import os
 
 # Quickselect
@@ -390,13 +391,10 @@ class LocationBox(Screen, NumericalTextInput, HelpableScreen):
 			# Check if we need to have a minimum of free Space available
 			if self.minFree is not None:
 				# Try to read fs stats
-				try:
-					s = os.statvfs(currentFolder)
-					if (s.f_bavail * s.f_bsize) / 1000000 > self.minFree:
-						# Automatically confirm if we have enough free disk Space available
-						return self.selectConfirmed(True)
-				except OSError:
-					pass
+				s = storageStats.getStat(currentFolder)[0]
+				if s is not None and (s.f_bavail * s.f_bsize) / 1000000 > self.minFree:
+					# Automatically confirm if we have enough free disk Space available
+					return self.selectConfirmed(True)
 
 				# Ask User if he really wants to select this folder
 				self.session.openWithCallback(
@@ -30,6 +30,8 @@ import Screens.InfoBar
 from Tools.NumericalTextInput import NumericalTextInput, MAP_SEARCH_UPCASE
 from Tools.Directories import resolveFilename, SCOPE_HDD
 from Tools.BoundFunction import boundFunction
+from Tools.MovieIndex import LEGACY_INDEX_FILE, invalidateDirectory, invalidateMovie
+from Components.StorageStats import storageStats
 import Tools.Trashcan
 import NavigationInstance
 import RecordTimer
@@ -184,6 +186,7 @@ def createMoveList(serviceref, dest):
 
 def moveServiceFiles(serviceref, dest, name=None, allowCopy=True):
 	moveList = createMoveList(serviceref, dest)
+	invalidateMovie(serviceref.getPath())
 	# Try to "atomically" move these files
 	movedList = []
 	try:
@@ -212,6 +215,10 @@ def moveServiceFiles(serviceref, dest, name=None, allowCopy=True):
 				print("[MovieSelection] Failed to undo move:", item)
 		# rethrow exception
 		raise
+	for src, dst in movedList:
+		storageStats.invalidate(src)
+		storageStats.invalidate(dst)
+	return moveList
 
 
 def copyServiceFiles(serviceref, dest, name=None):
@@ -1372,7 +1379,18 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 			self["freeDiskSpace"].path = path
 		if self.reload_sel is None:
 			self.reload_sel = self.getCurrent()
-		self["list"].reload(self.current_ref, self.selected_tags)
+		if config.usage.movielist_background_load.value:
+			self["list"].reloadInBackground(self.current_ref, self.selected_tags, sel=self.reload_sel, callback=self.reloadFinished, batchCallback=self.hideWaitingText)
+		else:
+			self["list"].reload(self.current_ref, self.selected_tags)
+			self.reloadFinished()
+
+	def hideWaitingText(self):
+		self["waitingtext"].visible = False
+
+	def reloadFinished(self):
+		if config.usage.movielist_background_load.value:
+			self.reload_sel = self["list"].loadSelection
 		self.updateTags()
 		title = _("Recorded files...")
 		if config.usage.setup_level.index >= 2: # expert+
@@ -1694,6 +1712,7 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 					metafile.write("%s%s\n%s" % (sid, name, rest))
 					metafile.truncate()
 					metafile.close()
+					invalidateMovie(oldfilename)
 					index = self.list.getCurrentIndex()
 					info = self.list.list[index]
 					if hasattr(info[3], 'txt'):
@@ -1708,6 +1727,8 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 					newfilename = os.path.join(path, newbasename)
 					print("[ML] rename dir", oldfilename, "to", newfilename)
 					os.rename(oldfilename, newfilename)
+					invalidateDirectory(oldfilename)
+					storageStats.invalidate(oldfilename)
 				else:
 					if oldfilename.endswith(self.extension):
 						oldbasename = oldfilename[:-len(self.extension)]
@@ -1725,6 +1746,7 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 							dont_rename = True
 							break
 					if not dont_rename:
+						invalidateMovie(oldbasename)
 						for r in renamelist:
 							print("[ML] rename", r[0], "to", r[1])
 							os.rename(r[0], r[1])
@@ -1913,6 +1935,10 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 								print("rmdir", os.path.join(trashroot, dn))
 								os.rmdir(os.path.join(root, dn))
 						os.rmdir(cur_path)
+						invalidateDirectory(cur_path)
+						storageStats.invalidate(cur_path)
+						storageStats.invalidate(trash)
+						Tools.Trashcan.addToTrash(os.path.dirname(trash), [trash])
 						self["list"].removeService(current)
 						self.showActionFeedback(_("Deleted") + " " + name)
 						# Files were moved to .Trash, ok.
@@ -1932,7 +1958,7 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 				self.session.open(MessageBox, msg, MessageBox.TYPE_ERROR)
 				return
 			for fn in os.listdir(cur_path):
-				if (fn != '.') and (fn != '..'):
+				if (fn != '.') and (fn != '..') and (fn != LEGACY_INDEX_FILE):
 					ffn = os.path.join(cur_path, fn)
 					if os.path.isdir(ffn):
 						subdirs += 1
@@ -1950,7 +1976,10 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 				return
 			else:
 				try:
+					if os.path.exists(os.path.join(cur_path, LEGACY_INDEX_FILE)):
+						os.unlink(os.path.join(cur_path, LEGACY_INDEX_FILE))
 					os.rmdir(cur_path)
+					invalidateDirectory(cur_path)
 				except Exception as e:
 					print("[MovieSelection] Failed delete", e)
 					self.session.open(MessageBox, _("Delete failed!") + "\n" + str(e), MessageBox.TYPE_ERROR)
@@ -1983,7 +2012,8 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 					if cur_path.startswith(trash):
 						msg = _("Deleted items") + "\n"
 					else:
-						moveServiceFiles(current, trash, name, allowCopy=False)
+						moved = moveServiceFiles(current, trash, name, allowCopy=False)
+						Tools.Trashcan.addToTrash(trash, [item[1] for item in moved])
 						self["list"].removeService(current)
 						# Files were moved to .Trash, ok.
 						from Screens.InfoBarGenerics import resumePointsInstance
@@ -2023,6 +2053,8 @@ class MovieSelection(Screen, HelpableScreen, SelectionEventInfo, InfoBarBase, Pr
 			else:
 				if offline.deleteFromDisk(0):
 					raise Exception("Offline delete failed")
+			invalidateMovie(current.getPath())
+			storageStats.invalidate(current.getPath())
 			self["list"].removeService(current)
 			from Screens.InfoBarGenerics import resumePointsInstance
 			resumePointsInstance.delResumePoint(current)
@@ -1,6 +1,6 @@
 from Screens.Screen import Screen
 from Screens.ParentalControlSetup import ProtectedScreen
-from enigma import eConsoleAppContainer, eDVBDB, eTimer
+from enigma import eConsoleAppContainer, eTimer
 
 from Components.ActionMap import ActionMap, NumberActionMap
 from Components.config import config, ConfigSubsection, ConfigText
@@ -17,6 +17,7 @@ from Screens.MessageBox import MessageBox
 from Screens.ChoiceBox import ChoiceBox
 from Screens.Console import Console
 from Plugins.Plugin import PluginDescriptor
+from Tools.Alternatives import reloadBouquets
 from Tools.Directories import fileExists, resolveFilename, SCOPE_PLUGINS, SCOPE_CURRENT_SKIN
 from Tools.LoadPixmap import LoadPixmap
 
@@ -342,8 +343,7 @@ class PluginDownloadBrowser(Screen):
 			plugins.readPluginList(resolveFilename(SCOPE_PLUGINS))
 		if self.reload_settings:
 			self["text"].setText(_("Reloading bouquets and services..."))
-			eDVBDB.getInstance().reloadBouquets()
-			eDVBDB.getInstance().reloadServicelist()
+			reloadBouquets(servicelist=True)
 			from Components.ParentalControl import parentalControl
 			parentalControl.open()
 			refreshServiceList()
@@ -380,10 +380,8 @@ class PluginDownloadBrowser(Screen):
 				if self["list"].l.getCurrentSelection()[0].name.startswith("picons-"):
 					supported_filesystems = frozenset(('ext4', 'ext3', 'ext2', 'reiser', 'reiser4', 'jffs2', 'ubifs', 'rootfs'))
 					candidates = []
-					import Components.Harddisk
-					mounts = Components.Harddisk.getProcMounts()
-					for partition in harddiskmanager.getMountedPartitions(False, mounts):
-						if partition.filesystem(mounts) in supported_filesystems:
+					for partition in harddiskmanager.getMountedPartitions(False):
+						if partition.filesystem() in supported_filesystems:
 							candidates.append((partition.description, partition.mountpoint))
 					if candidates:
 						from Components.Renderer import Picon
@@ -10,7 +10,7 @@ from Components.Sources.Source import Source
 from Components.Sources.StaticText import StaticText
 from Tools.CList import CList
 from Tools.Directories import SCOPE_GUISKIN, resolveFilename
-from Tools.LoadPixmap import LoadPixmap
+from Tools.LoadPixmap import LoadPixmap, pixmapCache
 
 # The lines marked DEBUG: are proposals for further fixes or improvements.
 # Other commented out code is historic and should probably be deleted if it is not going to be used.
@@ -116,6 +116,7 @@ class Screen(dict):
 			val.destroy()
 			del self[name]
 		self.renderer = []
+		pixmapCache.unpin(self)
 		self.__dict__.clear()  # Really delete all elements now.
 
 	def close(self, *retval):
@@ -257,8 +258,12 @@ class Screen(dict):
 				if attribute[0] == "title":
 					self.setTitle(_(attribute[1]))
 		self.skinAttributes.sort(key=lambda a: {"position": 1}.get(a[0], 0))  # We need to make sure that certain attributes come last.
-		applyAllAttributes(self.instance, self.desktop, self.skinAttributes, self.scale)
-		self.createGUIScreen(self.instance, self.desktop)
+		pixmapCache.beginPin(self)  # Keep the skin pixmaps of this screen cached until it is closed.
+		try:
+			applyAllAttributes(self.instance, self.desktop, self.skinAttributes, self.scale)
+			self.createGUIScreen(self.instance, self.desktop)
+		finally:
+			pixmapCache.endPin(self)
 
 	def createGUIScreen(self, parent, desktop, updateonly=False):
 		for val in self.renderer:
@@ -6,7 +6,7 @@ from time import altzone, gmtime, strftime
 from urllib.request import urlopen
 from email.utils import parsedate_to_datetime
 
-from enigma import eTimer, eDVBDB
+from enigma import eTimer
 from Screens.ChoiceBox import ChoiceBox
 from Screens.MessageBox import MessageBox
 from Screens.ParentalControlSetup import ProtectedScreen
@@ -20,6 +20,7 @@ from Components.Opkg import OpkgComponent
 from Components.Language import language
 from Components.Sources.StaticText import StaticText
 from Components.Slider import Slider
+from Tools.Alternatives import reloadBouquets
 from Tools.BoundFunction import boundFunction
 from Tools.Directories import fileExists
 from Tools.HardwareInfo import HardwareInfo
@@ -256,8 +257,7 @@ class UpdatePlugin(Screen, ProtectedScreen):
 					self.channellist_only += 1
 				elif self.channellist_only == 4:
 					self.showUpdateCompletedMessage()
-					eDVBDB.getInstance().reloadBouquets()
-					eDVBDB.getInstance().reloadServicelist()
+					reloadBouquets(servicelist=True)
 			elif self.error == 0:
 				self.showUpdateCompletedMessage()
 			else:
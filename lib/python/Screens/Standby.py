@@ -14,6 +14,8 @@ from Components.Sources.StreamService import StreamServiceList
 from Components.Task import job_manager
 from Tools.Directories import mediafilesInUse
 from Tools.Notifications import AddNotification
+from Tools.ResumePoints import resumePointsInstance
+from Components.ZapPredictor import zapPredictor
 from time import time, localtime
 from GlobalActions import globalActionMap
 from enigma import eDVBVolumecontrol, eTimer, eDVBLocalTimeHandler, eServiceReference, eStreamServer, quitMainloop, iRecordableService
@@ -163,6 +165,8 @@ class StandbyScreen(Screen):
 		self.session.screen["Standby"].boolean = True
 		if self.StandbyCounterIncrease:
 			config.misc.standbyCounter.value += 1
+		resumePointsInstance.flush()
+		zapPredictor.flush()
 
 	def Power(self):
 		print("[Standby] leave standby")
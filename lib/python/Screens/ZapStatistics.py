@@ -0,0 +1,52 @@
+from Screens.Screen import Screen
+from Components.ActionMap import ActionMap
+from Components.Button import Button
+from Components.ScrollLabel import ScrollLabel
+from Components.ZapTrace import zapTrace, ExportFile
+
+MaxShownTraces = 20
+
+
+def formatSummary(summary):
+	return "%5d %8.0f %8.0f %8.0f" % (summary["count"], summary["p50"], summary["p95"], summary["max"])
+
+
+class ZapStatistics(Screen):
+	def __init__(self, session):
+		Screen.__init__(self, session)
+		self.setTitle(_("Zap statistics"))
+		self["AboutScrollLabel"] = ScrollLabel()
+		self["key_red"] = Button(_("Close"))
+		self["key_yellow"] = Button(_("Clear"))
+		self["actions"] = ActionMap(["SetupActions", "DirectionActions", "ColorActions"],
+			{
+				"cancel": self.close,
+				"ok": self.close,
+				"red": self.close,
+				"yellow": zapTrace.clear,
+				"up": self["AboutScrollLabel"].pageUp,
+				"down": self["AboutScrollLabel"].pageDown
+			})
+		zapTrace.onUpdate.append(self.update)
+		self.onClose.append(self.__onClose)
+		self.update()
+
+	def __onClose(self):
+		zapTrace.onUpdate.remove(self.update)
+
+	def update(self):
+		statistics = zapTrace.getStatistics()
+		header = "%-20s %5s %8s %8s %8s" % ("", _("Zaps"), "p50 ms", "p95 ms", "max ms")
+		text = [_("Last %d zaps, exported to %s") % (statistics["zaps"], ExportFile), ""]
+		if statistics["fccHitRate"] is not None:
+			text += [_("Fast channel change hit rate: %.1f%%") % statistics["fccHitRate"], ""]
+		if statistics["total"]:
+			text += [header, "%-20s %s" % (_("Zap time"), formatSummary(statistics["total"])), ""]
+		if statistics["stages"]:
+			text += [header] + ["%-20s %s" % (stage, formatSummary(summary)) for stage, summary in statistics["stages"].items()] + [""]
+		if statistics["tags"]:
+			text += [header] + ["%-20s %s" % (tag, formatSummary(summary)) for tag, summary in statistics["tags"].items()] + [""]
+		for trace in reversed(list(zapTrace.traces)[-MaxShownTraces:]):
+			text.append("%.0f ms  %s  %s" % (trace["total"] * 1000, ", ".join(trace["tags"]), trace["service"]))
+			text.append("  " + "  ".join("%s %.0f" % (stage, duration * 1000) for stage, duration in zapTrace.getBreakdown(trace)))
+		self["AboutScrollLabel"].setText("\n".join(text))
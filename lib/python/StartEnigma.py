@@ -1,6 +1,9 @@
 import sys
 import os
 from Tools.Profile import profile, profile_final
+from Tools.ImportProfiler import importProfiler
+if importProfiler.isEnabled():
+	importProfiler.start()
 profile("PYTHON_START")
 
 # Don't remove this line. It may seem to do nothing, but if removed,
@@ -494,8 +497,17 @@ def runScreenTest():
 	import Tools.Trashcan
 	Tools.Trashcan.init(session)
 
+	profile("Init:CopyFiles")
+	import Screens.CopyFiles
+	Screens.CopyFiles.resumeTransfers()
+
+	profile("Init:StorageStats")
+	from Components.StorageStats import storageStats
+	storageStats.start()
+
 	profile("RunReactor")
 	profile_final()
+	importProfiler.stop()
 	runReactor()
 
 	profile("wakeup")
@@ -537,6 +549,10 @@ def runScreenTest():
 
 	profile("configfile.save")
 	configfile.save()
+	from Tools.ResumePoints import resumePointsInstance
+	resumePointsInstance.flush()
+	from Components.ZapPredictor import zapPredictor
+	zapPredictor.flush()
 
 	return 0
 
@@ -1,24 +1,121 @@
-from enigma import eServiceCenter, eServiceReference
+from os import listdir, stat
+from time import monotonic
+
+from enigma import eDVBDB, eServiceCenter, eServiceReference
 from Components.config import config
 from ServiceReference import isPlayableForCur
 from Tools.CIHelper import cihelper
+from Tools.CList import CList
+from Tools.Directories import resolveFilename, SCOPE_CONFIG
+
+
+# Members of the alternatives groups resolved so far, and the reverse index from
+# member to groups. Cleared together with the other caches derived from the
+# bouquets (see onBouquetsChanged) whenever bouquets are reloaded or edited.
+alternativesCache = {}
+alternativesGroups = {}
+alternativesCacheStats = {"hits": 0, "misses": 0}
+
+# Called after the bouquets or the service list changed.
+onBouquetsChanged = CList()
+
+# Bouquets edited by the web interface or plugins are noticed by the mtime and
+# size of the bouquet files and the service list, checked at most every
+# BouquetsCheckInterval seconds. The config directory is only listed again when
+# files were added to or removed from it.
+BouquetsCheckInterval = 1 # seconds
+bouquetsChecked = {"time": 0, "directory": None, "names": [], "files": None}
+
+
+def clearAlternativesCache():
+	alternativesCache.clear()
+	alternativesGroups.clear()
+
+
+def bouquetsChanged():
+	# Call after editing bouquets, it drops all caches derived from them.
+	clearAlternativesCache()
+	onBouquetsChanged()
+
+
+def reloadBouquets(servicelist=False):
+	db = eDVBDB.getInstance()
+	db.reloadBouquets()
+	if servicelist:
+		db.reloadServicelist()
+	bouquetsChanged()
+
+
+def isBouquetFile(name):
+	if name in ("bouquets.tv", "bouquets.radio", "lamedb", "lamedb5"):
+		return True
+	return name.startswith(("userbouquet.", "alternatives.")) and name.endswith((".tv", ".radio"))
+
+
+def checkBouquets():
+	now = monotonic()
+	if now - bouquetsChecked["time"] < BouquetsCheckInterval:
+		return
+	bouquetsChecked["time"] = now
+	directory = resolveFilename(SCOPE_CONFIG)
+	try:
+		mtime = stat(directory).st_mtime_ns
+		if mtime != bouquetsChecked["directory"]:
+			bouquetsChecked["names"] = sorted(name for name in listdir(directory) if isBouquetFile(name))
+			bouquetsChecked["directory"] = mtime
+	except OSError:
+		return
+	files = []
+	for name in bouquetsChecked["names"]:
+		try:
+			st = stat(directory + name)
+			files.append((name, st.st_mtime_ns, st.st_size))
+		except OSError:
+			pass
+	if files != bouquetsChecked["files"]:
+		if bouquetsChecked["files"] is not None:
+			print("[Alternatives] bouquets changed on disk")
+			bouquetsChanged()
+		bouquetsChecked["files"] = files
+
+
+def getAlternativesCacheStats():
+	return dict(alternativesCacheStats, groups=len(alternativesCache))
+
+
+def lookupAlternativeChannels(service):
+	checkBouquets()
+	channels = alternativesCache.get(service)
+	if channels is None:
+		alternativesCacheStats["misses"] += 1
+		alternativeServices = eServiceCenter.getInstance().list(eServiceReference(service))
+		channels = alternativesCache[service] = alternativeServices and alternativeServices.getContent("S", True) or []
+		for channel in channels:
+			alternativesGroups.setdefault(channel, set()).add(service)
+	else:
+		alternativesCacheStats["hits"] += 1
+	return channels
 
 
 def getAlternativeChannels(service):
-	alternativeServices = eServiceCenter.getInstance().list(eServiceReference(service))
-	return alternativeServices and alternativeServices.getContent("S", True)
+	return lookupAlternativeChannels(service)[:]
+
+
+def getAlternativeGroups(service):
+	# the already resolved alternatives groups containing service
+	return set(alternativesGroups.get(service, ()))
 
 
 def CompareWithAlternatives(serviceA, serviceB):
 	return serviceA and serviceB and (
 		serviceA == serviceB or
-		serviceA.startswith('1:134:') and serviceB in getAlternativeChannels(serviceA) or
-		serviceB.startswith('1:134:') and serviceA in getAlternativeChannels(serviceB))
+		serviceA.startswith('1:134:') and serviceB in lookupAlternativeChannels(serviceA) or
+		serviceB.startswith('1:134:') and serviceA in lookupAlternativeChannels(serviceB))
 
 
 def GetWithAlternative(service):
 	if service.startswith('1:134:'):
-		channels = getAlternativeChannels(service)
+		channels = lookupAlternativeChannels(service)
 		if channels:
 			return channels[0]
 	return service
@@ -11,6 +11,8 @@ from unicodedata import normalize
 from traceback import print_exc
 from xml.etree.ElementTree import Element, fromstring, parse
 
+from Tools.Transfer import copyFile
+
 
 from os.path import exists as pathExists, isdir as pathIsdir, isfile as pathIsfile, join as pathJoin
 
@@ -260,20 +262,20 @@ def comparePaths(leftPath, rightPath):
 
 
 def bestRecordingLocation(candidates):
+	from Components.StorageStats import storageStats
 	path = ""
 	biggest = 0
 	for candidate in candidates:
-		try:
-			# Must have some free space (i.e. not read-only).
-			stat = os.statvfs(candidate[1])
-			if stat.f_bavail:
-				# Free space counts double.
-				size = (stat.f_blocks + stat.f_bavail) * stat.f_bsize
-				if size > biggest:
-					biggest = size
-					path = candidate[1]
-		except (IOError, OSError) as err:
-			print("[Directories] Error %d: Couldn't get free space for '%s' (%s)" % (err.errno, candidate[1], err.strerror))
+		stat = storageStats.getStat(candidate[1])[0]
+		if stat is None:
+			print("[Directories] Couldn't get free space for '%s'" % candidate[1])
+		# Must have some free space (i.e. not read-only).
+		elif stat.f_bavail:
+			# Free space counts double.
+			size = (stat.f_blocks + stat.f_bavail) * stat.f_bsize
+			if size > biggest:
+				biggest = size
+				path = candidate[1]
 	return path
 
 
@@ -287,8 +289,8 @@ def defaultRecordingLocation(candidate=None):
 		path = "/media/hdd"
 	if not pathExists(path):
 		# Find the largest local disk.
-		from Components import Harddisk
-		mounts = [m for m in Harddisk.getProcMounts() if m[1].startswith("/media/")]
+		from Components.MountTable import mountTable
+		mounts = [m for m in mountTable.getMounts() if m[1].startswith("/media/")]
 		# Search local devices first, use the larger one
 		path = bestRecordingLocation([m for m in mounts if m[0].startswith("/dev/")])
 		# If we haven't found a viable candidate yet, try remote mounts.
@@ -416,26 +418,14 @@ def crawlDirectory(directory, pattern):
 
 
 def copyfile(src, dst):
-	f1 = None
-	f2 = None
 	status = 0
 	try:
-		f1 = open(src, "rb")
 		if os.path.isdir(dst):
 			dst = os.path.join(dst, os.path.basename(src))
-		f2 = open(dst, "w+b")
-		while True:
-			buf = f1.read(16 * 1024)
-			if not buf:
-				break
-			f2.write(buf)
+		copyFile(src, dst)
 	except (IOError, OSError) as err:
 		print("[Directories] Error %d: Copying file '%s' to '%s'! (%s)" % (err.errno, src, dst, err.strerror))
 		status = -1
-	if f1 is not None:
-		f1.close()
-	if f2 is not None:
-		f2.close()
 	try:
 		st = os.stat(src)
 		try:
@@ -519,11 +509,24 @@ def moveFiles(fileList):
 
 def getSize(path, pattern=".*"):
 	path_size = 0
-	if os.path.isdir(path):
-		files = crawlDirectory(path, pattern)
-		for file in files:
-			filepath = os.path.join(file[0], file[1])
-			path_size += os.path.getsize(filepath)
+	if os.path.isdir(path) and pattern == ".*":
+		from Components.StorageStats import storageStats
+		path_size = storageStats.getTreeSize(path)
+	elif os.path.isdir(path):
+		expression = compile(pattern)
+		pending = [path]
+		while pending:
+			try:
+				entries = os.scandir(pending.pop())
+			except OSError: # like os.walk
+				continue
+			with entries:
+				for entry in entries:
+					if entry.is_dir():
+						if not entry.is_symlink():
+							pending.append(entry.path)
+					elif expression.match(entry.name) is not None:
+						path_size += entry.stat().st_size
 	elif os.path.isfile(path):
 		path_size = os.path.getsize(path)
 	return path_size
@@ -0,0 +1,137 @@
+import sys
+import time
+from Tools.Directories import resolveFilename, SCOPE_CONFIG
+
+# Import profiler for the boot.
+#
+# When config.usage.profile_imports is enabled StartEnigma puts a finder in
+# front of sys.meta_path before the first import of a subsystem. It times how
+# long finding and executing every module takes, and remembers which module
+# imported which, so the cost of an import can be told apart from the cost of
+# the imports it triggers. Modules imported earlier are not seen. At the end of
+# the boot the finder is removed again and the tree, with the cumulative and
+# the self time of every module, is written to ReportFile. The setting is read
+# straight from the settings file, as config is not loaded yet at that time.
+
+ReportFile = "/tmp/importprofile.txt"
+SettingsKey = "config.usage.profile_imports="
+MinReported = 0.001 # seconds, faster imports are left out of the tree
+
+
+class ImportNode:
+	def __init__(self, name, parent):
+		self.name = name
+		self.parent = parent
+		self.children = []
+		self.cumulative = 0.0
+		self.self = 0.0
+
+
+class TimingLoader:
+	# Wraps the loader of a module to time its execution.
+	def __init__(self, loader, profiler, node, started):
+		self.loader = loader
+		self.profiler = profiler
+		self.node = node
+		self.started = started
+
+	def __getattr__(self, name):
+		return getattr(self.loader, name)
+
+	def create_module(self, spec):
+		return self.loader.create_module(spec)
+
+	def exec_module(self, module):
+		profiler = self.profiler
+		profiler.stack.append(self.node)
+		try:
+			self.loader.exec_module(module)
+		finally:
+			profiler.stack.pop()
+			self.node.cumulative = time.monotonic() - self.started
+			self.node.self = self.node.cumulative - sum(child.cumulative for child in self.node.children)
+
+
+class ImportProfiler:
+	def __init__(self):
+		self.root = ImportNode("<boot>", None)
+		self.stack = [self.root]
+		self.active = False
+
+	def isEnabled(self):
+		try:
+			with open(resolveFilename(SCOPE_CONFIG, "settings"), "r") as f:
+				for line in f:
+					if line.startswith(SettingsKey):
+						return line[len(SettingsKey):].strip().lower() == "true"
+		except (IOError, OSError):
+			pass
+		return False
+
+	def start(self):
+		if not self.active:
+			self.active = True
+			sys.meta_path.insert(0, self)
+
+	def find_spec(self, fullname, path, target=None):
+		started = time.monotonic()
+		for finder in sys.meta_path:
+			if finder is self:
+				continue
+			find_spec = getattr(finder, "find_spec", None)
+			spec = find_spec and find_spec(fullname, path, target)
+			if spec is not None:
+				break
+		else:
+			return None
+		if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+			return spec # namespace packages and old style loaders
+		parent = self.stack[-1]
+		node = ImportNode(fullname, parent)
+		parent.children.append(node)
+		spec.loader = TimingLoader(spec.loader, self, node, started)
+		return spec
+
+	def stop(self):
+		# The boot is done, removes the finder and writes the report.
+		if not self.active:
+			return
+		self.active = False
+		if self in sys.meta_path:
+			sys.meta_path.remove(self)
+		self.root.cumulative = sum(child.cumulative for child in self.root.children)
+		try:
+			with open(ReportFile, "w") as f:
+				f.write(self.getReport())
+			print("[ImportProfiler] %d modules, %.3fs, written to %s" % (len(self.getNodes()), self.root.cumulative, ReportFile))
+		except (IOError, OSError) as e:
+			print("[ImportProfiler] Failed to write %s: %s" % (ReportFile, e))
+
+	def getNodes(self):
+		nodes = []
+		pending = list(self.root.children)
+		while pending:
+			node = pending.pop()
+			nodes.append(node)
+			pending += node.children
+		return nodes
+
+	def getReport(self):
+		lines = ["Imports during the boot: %.3fs" % self.root.cumulative, "", "Slowest modules by self time (ms):"]
+		for node in sorted(self.getNodes(), key=lambda node: -node.self)[:30]:
+			lines.append("%9.1f  %s" % (node.self * 1000, node.name))
+		lines += ["", "Import tree, cumulative and self time (ms):"]
+
+		def addNode(node, depth):
+			if node.cumulative < MinReported:
+				return
+			lines.append("%9.1f %9.1f  %s%s" % (node.cumulative * 1000, node.self * 1000, "  " * depth, node.name))
+			for child in sorted(node.children, key=lambda child: -child.cumulative):
+				addNode(child, depth + 1)
+
+		for node in self.root.children:
+			addNode(node, 0)
+		return "\n".join(lines) + "\n"
+
+
+importProfiler = ImportProfiler()
@@ -3,6 +3,7 @@ from Components.config import config
 from Components.RcModel import rc_model
 
 keyBindings = {}
+domainBindings = {}  # domain -> {(context, action)} with bindings of that domain
 
 keyDescriptions = [{  # id=0 - dmm0 remote directory, DM8000.
 	# However, the dmm0 rcpositions.xml file should define
@@ -424,6 +425,16 @@ labels = {  # This is not currently used anywhere. It is just present to populat
 
 def addKeyBinding(domain, key, context, action, flags):
 	keyBindings.setdefault((context, action), []).append((key, domain, flags))
+	domainBindings.setdefault(domain, set()).add((context, action))
+
+
+def addKeyBindings(domain, bindings):
+	# Adds all bindings of a keymap at once, bindings is a list of
+	# (device, key, flags, context, action) as made by keymapparser.
+	contextActions = domainBindings.setdefault(domain, set())
+	for device, key, flags, context, action in bindings:
+		keyBindings.setdefault((context, action), []).append((key, domain, flags))
+		contextActions.add((context, action))
 
 
 def removeKeyBinding(key, context, action, wild=True):
@@ -474,8 +485,12 @@ def getKeyBindingKeys(filterfn=lambda key: True):
 
 
 def removeKeyBindings(domain):
-	for x in keyBindings:
-		keyBindings[x] = [e for e in keyBindings[x] if e[1] != domain]
+	for contextAction in domainBindings.pop(domain, ()):
+		bind = [x for x in keyBindings.get(contextAction, ()) if x[1] != domain]
+		if bind:
+			keyBindings[contextAction] = bind
+		else:
+			keyBindings.pop(contextAction, None)
 
 
 def getFpAndKbdKeys():  # used by HelpMenuList
@@ -0,0 +1,44 @@
+from importlib import import_module
+
+# Modules that are imported the first time they are used.
+#
+#	GraphMultiEpg = LazyModule("Plugins.Extensions.GraphMultiEPG.GraphMultiEpg")
+#	...
+#	session.open(GraphMultiEpg.GraphMultiEPG, ...)
+#
+# The module is imported on the first attribute access, so a plugin can be
+# read at boot without importing its screens and everything they need. Only
+# attributes of the module can be used this way, "from x import y" imports x
+# right away.
+
+
+class LazyModule:
+	def __init__(self, name):
+		self.__dict__["_LazyModule__name"] = name
+		self.__dict__["_LazyModule__module"] = None
+
+	def load(self):
+		module = self.__module
+		if module is None:
+			module = self.__dict__["_LazyModule__module"] = import_module(self.__name)
+		return module
+
+	def isLoaded(self):
+		return self.__module is not None
+
+	def __getattr__(self, name):
+		return getattr(self.load(), name)
+
+	def __setattr__(self, name, value):
+		setattr(self.load(), name, value)
+
+	def __repr__(self):
+		return "<LazyModule %s%s>" % (self.__name, "" if self.__module is None else " (loaded)")
+
+
+def getAttribute(module, name):
+	# A module level __getattr__ (PEP 562) for plugins whose screens moved to a
+	# lazy module, so "from Plugins.X.plugin import Screen" keeps working.
+	if name.startswith("__"):
+		raise AttributeError(name)
+	return getattr(module, name)
@@ -1,15 +1,129 @@
+from collections import OrderedDict
+from time import monotonic
+
 from enigma import loadPNG, loadJPG, loadSVG, RT_HALIGN_CENTER
 
 
-# If cached is not supplied, LoadPixmap defaults to caching PNGs and not caching JPGs
-# Split alpha channel JPGs are never cached as the C++ layer's caching is based on
-# a single file per image in the cache
+# Decoded pixmaps, keyed by path, size and scale, least recently used first.
+# The cache is bounded by a byte budget (see config.usage.pixmap_cache_size).
+# Pixmaps loaded while a screen applies its skin are pinned to that screen and
+# are not evicted before the screen is closed.
+class PixmapCache:
+	def __init__(self, budget=16 * 1024 * 1024):
+		self.budget = budget
+		self.entries = OrderedDict() # key -> [pixmap, bytes, set of pinning owners]
+		self.bytes = 0
+		self.pinOwners = []
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.decodeTime = 0.0
+
+	def setBudget(self, budget):
+		self.budget = budget
+		if budget:
+			self.evict()
+		else:
+			self.clear()
+
+	def get(self, key):
+		entry = self.entries.get(key)
+		if entry is None:
+			self.misses += 1
+			return None
+		self.hits += 1
+		self.entries.move_to_end(key)
+		self.pin(entry)
+		return entry[0]
+
+	def put(self, key, ptr, decodeTime=0.0):
+		self.decodeTime += decodeTime
+		if not ptr:
+			return
+		try:
+			size = ptr.size()
+			bytes = size.width() * size.height() * 4
+		except Exception:
+			bytes = 0
+		old = self.entries.pop(key, None)
+		if old is not None:
+			self.bytes -= old[1]
+		entry = self.entries[key] = [ptr, bytes, set()]
+		self.bytes += bytes
+		self.pin(entry)
+		self.evict()
+
+	def pin(self, entry):
+		if self.pinOwners:
+			entry[2].add(id(self.pinOwners[-1]))
+
+	def beginPin(self, owner):
+		self.pinOwners.append(owner)
+
+	def endPin(self, owner):
+		if self.pinOwners and self.pinOwners[-1] is owner:
+			self.pinOwners.pop()
+
+	def unpin(self, owner):
+		owner = id(owner)
+		for entry in self.entries.values():
+			entry[2].discard(owner)
+		self.evict()
+
+	def evict(self):
+		if self.bytes <= self.budget:
+			return
+		for key, entry in list(self.entries.items()):
+			if not entry[2]:
+				del self.entries[key]
+				self.bytes -= entry[1]
+				self.evictions += 1
+				if self.bytes <= self.budget:
+					break
+
+	def clear(self):
+		self.entries.clear()
+		self.bytes = 0
+
+	def getStats(self):
+		return {
+			"entries": len(self.entries),
+			"pinned": sum(1 for entry in self.entries.values() if entry[2]),
+			"bytes": self.bytes,
+			"budget": self.budget,
+			"hits": self.hits,
+			"misses": self.misses,
+			"evictions": self.evictions,
+			"decodeTime": self.decodeTime
+		}
+
+
+pixmapCache = PixmapCache()
+
+
+def getPixmapCacheStats():
+	return pixmapCache.getStats()
+
+
+# Pixmaps are kept in the pixmap cache above unless the caller explicitly requests
+# to not cache them; JPGs only when the caller requests caching. With the pixmap
+# cache disabled the C++ layer's cache is used as before: SVGs are cached by
+# default, PNGs and JPGs only on request, and split alpha channel JPGs never,
+# as the C++ layer's caching is based on a single file per image.
 def LoadPixmap(path, desktop=None, cached=None, width=0, height=0, scaletoFit=0, align=RT_HALIGN_CENTER):
+	key = None
+	if pixmapCache.budget and (cached or cached is None and path[-4:] != ".jpg"):
+		key = (path, width, height, scaletoFit, align)
+		ptr = pixmapCache.get(key)
+		if ptr is not None:
+			if desktop:
+				desktop.makeCompatiblePixmap(ptr)
+			return ptr
+		cached = False # don't keep a second copy in the C++ cache
+	start = monotonic()
 	if path[-4:] == ".png":
-		# cache unless caller explicity requests to not cache
-		ptr = loadPNG(path, 0, 0 if not cached else 1)
+		ptr = loadPNG(path, 0, 1 if cached else 0)
 	elif path[-4:] == ".jpg":
-		# don't cache unless caller explicity requests caching
 		ptr = loadJPG(path, 1 if cached else 0)
 	elif path[-4:] == ".svg":
 		from skin import parameters, getSkinFactor # imported here to avoid circular import
@@ -17,11 +131,13 @@ def LoadPixmap(path, desktop=None, cached=None, width=0, height=0, scaletoFit=0,
 		scale = height == 0 and (autoscale == -1 and "/skin_default/" in path or autoscale == 1) and getSkinFactor() or 0
 		ptr = loadSVG(path, 0 if cached is False else 1, width, height, scale, scaletoFit, align)
 	elif path[-1:] == ".":
-		# caching mechanism isn't suitable for multi file images, so it's explicitly disabled
+		# caching mechanism of the C++ layer isn't suitable for multi file images, so it's explicitly disabled
 		alpha = loadPNG(path + "a.png", 0, 0)
 		ptr = loadJPG(path + "rgb.jpg", alpha, 0)
 	else:
 		raise Exception("Neither .png nor .jpg nor .svg, please fix file extension")
 	if ptr and desktop:
 		desktop.makeCompatiblePixmap(ptr)
+	if key is not None:
+		pixmapCache.put(key, ptr, monotonic() - start)
 	return ptr
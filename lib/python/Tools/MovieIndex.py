@@ -0,0 +1,387 @@
+import json
+import os
+from hashlib import sha1
+from urllib.parse import quote, unquote
+
+from enigma import eServiceCenter, iServiceInformation
+from ServiceReference import ServiceReference
+from Tools.Directories import resolveFilename, SCOPE_CONFIG
+from Tools.ResumePoints import getLastPosition
+
+# Per directory index of the recording metadata shown in the movie list.
+#
+# Reading the name, description, tags and length of a recording means reading
+# its .meta, .eit and .ap/.sc files, and the play state is read from .cuts.
+# The results are remembered per file name together with the size and mtime
+# of the recording and its .meta file (and of the .cuts file for the play
+# position), and stored in INDEX_DIRECTORY, one file per recording directory
+# named after its path, so opening a directory again only needs a stat() per
+# recording. Nothing is written into the recording directories, and an empty
+# index is not kept. The index is plain JSON, as the same path may be another
+# removable or network storage next time.
+#
+# The index also maps the tags of the recordings, and the words of the names of
+# recordings without tags (the auto tags), to the recordings, and keeps the tag
+# menu of the movie list built from them until they change.
+
+INDEX_DIRECTORY = resolveFilename(SCOPE_CONFIG, "movieindex")
+INDEX_VERSION = 2
+LEGACY_INDEX_FILE = ".e2movieindex" # written into the recording directories before
+
+directories = {} # directory -> DirectoryIndex
+
+
+def getIndexFileName(directory):
+	name = quote(directory, safe="")
+	if len(name) > 250:
+		name = sha1(directory.encode("UTF-8")).hexdigest()
+	return os.path.join(INDEX_DIRECTORY, name + ".json")
+
+
+class DirectoryIndex:
+	def __init__(self, directory):
+		self.directory = directory
+		self.filename = getIndexFileName(directory)
+		self.movies = {} # file name -> metadata dict
+		self.cuts = {} # .cuts file name -> [[size, mtime], last play position]
+		self.tags = {} # tag -> set of file names
+		self.autotags = {} # word -> set of file names of the movies without tags
+		self.tagMenu = None
+		self.dirty = False
+		try:
+			with open(self.filename, "r", encoding="UTF-8") as f:
+				data = json.load(f)
+			if data.get("directory") != directory:
+				raise ValueError("index of %s" % data.get("directory"))
+			if data.get("version") == INDEX_VERSION:
+				self.movies = data["movies"]
+				self.cuts = data["cuts"]
+				self.tags = {tag: set(names) for tag, names in data["tags"].items()}
+				self.autotags = {tag: set(names) for tag, names in data["autotags"].items()}
+			elif data.get("version") == 1:
+				self.movies = data["movies"]
+				self.cuts = data["cuts"]
+				for name, entry in self.movies.items():
+					self.addTags(name, entry)
+				self.dirty = True
+		except (IOError, OSError, ValueError, KeyError, AttributeError, TypeError):
+			self.movies = {}
+			self.cuts = {}
+			self.tags = {}
+			self.autotags = {}
+		try:
+			os.unlink(os.path.join(directory, LEGACY_INDEX_FILE))
+		except OSError:
+			pass
+
+	def save(self):
+		if not self.dirty:
+			return
+		self.dirty = False
+		directory = self.directory
+		for name in [name for name in self.movies if not os.path.exists(os.path.join(directory, name))]:
+			self.removeMovie(name)
+		for name in [name for name in self.cuts if not os.path.exists(os.path.join(directory, name))]:
+			del self.cuts[name]
+		if not self.movies and not self.cuts:
+			try:
+				os.unlink(self.filename)
+			except OSError:
+				pass
+			return
+		try:
+			if not os.path.isdir(INDEX_DIRECTORY):
+				os.makedirs(INDEX_DIRECTORY)
+			with open(self.filename + ".writing", "w", encoding="UTF-8") as f:
+				json.dump({
+					"version": INDEX_VERSION,
+					"directory": directory,
+					"movies": self.movies,
+					"cuts": self.cuts,
+					"tags": {tag: list(names) for tag, names in self.tags.items()},
+					"autotags": {tag: list(names) for tag, names in self.autotags.items()}
+				}, f)
+			os.rename(self.filename + ".writing", self.filename)
+		except (IOError, OSError, ValueError) as e:
+			print("[MovieIndex] failed to write %s: %s" % (self.filename, e))
+
+	def invalidate(self, prefix):
+		for name in [name for name in self.movies if name.startswith(prefix)]:
+			self.removeMovie(name)
+		for name in [name for name in self.cuts if name.startswith(prefix)]:
+			del self.cuts[name]
+			self.dirty = True
+
+	def setMovie(self, name, entry):
+		if name in self.movies:
+			self.removeMovie(name)
+		self.movies[name] = entry
+		self.addTags(name, entry)
+		self.dirty = True
+
+	def removeMovie(self, name):
+		entry = self.movies.pop(name)
+		tags, auto = getTags(entry)
+		postings = self.autotags if auto else self.tags
+		for tag in tags:
+			names = postings.get(tag)
+			if names is not None:
+				names.discard(name)
+				if not names:
+					del postings[tag]
+		self.tagMenu = None
+		self.dirty = True
+
+	def addTags(self, name, entry):
+		tags, auto = getTags(entry)
+		postings = self.autotags if auto else self.tags
+		for tag in tags:
+			postings.setdefault(tag, set()).add(name)
+		self.tagMenu = None
+
+	def retain(self, names):
+		# Forgets the movies which are not in names, the complete listing of
+		# the directory.
+		for name in [name for name in self.movies if name not in names]:
+			self.removeMovie(name)
+
+	def hasTags(self, name, tags):
+		# Returns whether the movie has all tags, its auto tags if it has none.
+		return all(name in self.tags.get(tag, ()) or name in self.autotags.get(tag, ()) for tag in tags)
+
+	def getTagMenu(self):
+		# Returns the tag menu of the movie list, see buildTagMenu.
+		if self.tagMenu is None:
+			self.tagMenu = buildTagMenu(set(self.tags), {tag: [self.movies[name]["name"] for name in sorted(names)] for tag, names in self.autotags.items()})
+		return self.tagMenu
+
+
+def getTags(entry):
+	# Returns the tags of a movie, or the words of its name when it has no tags,
+	# and whether these are auto tags.
+	tags = entry["tags"].split(' ')
+	if tags == ['']:
+		return entry["name"].replace(',', ' ').replace('.', ' ').split(), True
+	return tags, False
+
+
+def buildTagMenu(realtags, autotags):
+	# Returns the entries of the tag menu, a dict of the text shown to the set of
+	# tags to filter for. realtags are the tags set on the movies, autotags maps
+	# the words of the names of the movies without tags to those names.
+	# ML: Only use the tags that occur more than once in the list OR that were
+	# really in the tag set of some file.
+
+	# reverse the dictionary to see which unique movie each tag now references
+	rautotags = {}
+	for tag, movies in autotags.items():
+		if (len(movies) > 1):
+			movies = tuple(movies) # a tuple can be hashed, but a list not
+			item = rautotags.get(movies, [])
+			if not item:
+				rautotags[movies] = item
+			item.append(tag)
+	tagMenu = {}
+	for movies, tags in rautotags.items():
+		movie = movies[0]
+		# format the tag lists so that they are in 'original' order
+		tags.sort(key=movie.find)
+		first = movie.find(tags[0])
+		last = movie.find(tags[-1]) + len(tags[-1])
+		match = movie
+		start = 0
+		end = len(movie)
+		# Check if the set has a complete sentence in common, and how far
+		for m in movies[1:]:
+			if m[start:end] != match:
+				if not m.startswith(movie[:last]):
+					start = first
+				if not m.endswith(movie[first:]):
+					end = last
+				match = movie[start:end]
+				if m[start:end] != match:
+					match = ''
+					break
+		# Adding the longest common sentence to the tag list
+		if match:
+			tagMenu[match] = set(tags)
+		else:
+			match = ' '.join(tags)
+			if (len(match) > 2) or (match in realtags): #Omit small words, only for auto tags
+				tagMenu[match] = set(tags)
+	# Adding the realtags to the tag list
+	for tag in realtags:
+		tagMenu[tag] = set([tag])
+	return tagMenu
+
+
+class MovieInfo:
+	# Answers the static service information queries of the movie list from the
+	# index, everything else is passed to the real service information.
+	def __init__(self, serviceref, entry, index, info=None):
+		self.serviceref = serviceref
+		self.entry = entry
+		self.index = index
+		self.info = info
+
+	def getRealInfo(self):
+		if self.info is None:
+			self.info = eServiceCenter.getInstance().info(self.serviceref)
+		return self.info
+
+	def getName(self, serviceref):
+		return self.entry["name"]
+
+	def getServiceName(self):
+		return self.entry["serviceName"]
+
+	def getLength(self, serviceref):
+		if self.entry["length"] is None:
+			self.entry["length"] = self.getRealInfo().getLength(serviceref)
+			self.index.dirty = True
+		return self.entry["length"]
+
+	def getInfo(self, serviceref, w):
+		if w == iServiceInformation.sTimeCreate:
+			return self.entry["begin"]
+		return self.getRealInfo().getInfo(serviceref, w)
+
+	def getInfoString(self, serviceref, w):
+		if w == iServiceInformation.sTags:
+			return self.entry["tags"]
+		if w == iServiceInformation.sDescription:
+			return self.entry["description"]
+		if w == iServiceInformation.sServiceref:
+			return self.entry["serviceref"]
+		return self.getRealInfo().getInfoString(serviceref, w)
+
+	def getEvent(self, serviceref, *args):
+		return self.getRealInfo().getEvent(serviceref, *args)
+
+	def __getattr__(self, name):
+		return getattr(self.getRealInfo(), name)
+
+
+def getDirectoryIndex(directory):
+	index = directories.get(directory)
+	if index is None:
+		index = directories[directory] = DirectoryIndex(directory)
+	return index
+
+
+def addDirectoryIndex(index):
+	# Adds an index read by readDirectory, unless the directory was indexed
+	# meanwhile.
+	return directories.setdefault(index.directory, index)
+
+
+def readDirectory(directory):
+	# Returns the size and mtime of the files in directory and, when it is not
+	# loaded yet, the index of directory. Only the file system is used, so this
+	# can run in a thread. The results are passed to addDirectoryIndex and
+	# getMovieInfo on the main thread.
+	stats = {}
+	if not directory:
+		return stats, None
+	try:
+		with os.scandir(directory) as entries:
+			for entry in entries:
+				try:
+					st = entry.stat()
+				except OSError:
+					continue
+				stats[entry.name] = (st.st_size, st.st_mtime_ns)
+	except OSError:
+		pass
+	return stats, None if directory in directories else DirectoryIndex(directory)
+
+
+def getMovieInfo(serviceref, stats=None):
+	# Returns the (cached) static service information of serviceref, or None
+	# when there is none. stats are the sizes and mtimes of the files in the
+	# directory of serviceref from readDirectory, if they were read already.
+	path = serviceref.getPath()
+	directory, name = os.path.split(path)
+	if stats and name in stats:
+		size, mtime = stats[name]
+		meta = stats.get(name + ".meta", (0, 0))[1]
+	else:
+		try:
+			st = os.stat(path)
+		except OSError:
+			return eServiceCenter.getInstance().info(serviceref)
+		size, mtime = st.st_size, st.st_mtime_ns
+		try:
+			meta = os.stat(path + ".meta").st_mtime_ns
+		except OSError:
+			meta = 0
+	key = [size, mtime, meta]
+	index = getDirectoryIndex(directory)
+	entry = index.movies.get(name)
+	if entry is not None and entry["stat"] == key:
+		return MovieInfo(serviceref, entry, index)
+	info = eServiceCenter.getInstance().info(serviceref)
+	if info is None:
+		return None
+	sref = info.getInfoString(serviceref, iServiceInformation.sServiceref)
+	service = ServiceReference(sref)
+	entry = {
+		"stat": key,
+		"name": info.getName(serviceref),
+		"description": info.getInfoString(serviceref, iServiceInformation.sDescription),
+		"serviceref": sref,
+		"serviceName": service and service.getServiceName(),
+		"tags": info.getInfoString(serviceref, iServiceInformation.sTags),
+		"begin": info.getInfo(serviceref, iServiceInformation.sTimeCreate),
+		"length": None
+	}
+	index.setMovie(name, entry)
+	return MovieInfo(serviceref, entry, index, info)
+
+
+def getLastPlayPosition(cutsFileName):
+	# Returns the last play position stored in a .cuts file, or None. Raises
+	# OSError when there is no .cuts file.
+	st = os.stat(cutsFileName)
+	key = [st.st_size, st.st_mtime_ns]
+	directory, name = os.path.split(cutsFileName)
+	index = getDirectoryIndex(directory)
+	cached = index.cuts.get(name)
+	if cached is not None and cached[0] == key:
+		return cached[1]
+	lastPosition = getLastPosition(cutsFileName)
+	index.cuts[name] = [key, lastPosition]
+	index.dirty = True
+	return lastPosition
+
+
+def invalidateMovie(path):
+	# Forgets all files of a recording, path may be the recording file or the
+	# recording file name without extension.
+	directory, name = os.path.split(os.path.normpath(path))
+	index = directories.get(directory)
+	if index is not None:
+		index.invalidate(name)
+
+
+def invalidateDirectory(directory):
+	# Forgets directory and everything below it.
+	directory = os.path.normpath(directory)
+	isBelow = lambda path: path == directory or path.startswith(directory + "/")
+	filenames = [index.filename for path, index in directories.items() if isBelow(path)]
+	for path in [path for path in directories if isBelow(path)]:
+		del directories[path]
+	try:
+		filenames += [os.path.join(INDEX_DIRECTORY, name) for name in os.listdir(INDEX_DIRECTORY) if name.endswith(".json") and isBelow(unquote(name[:-5]))]
+	except OSError:
+		pass
+	for filename in set(filenames):
+		try:
+			os.unlink(filename)
+		except OSError:
+			pass
+
+
+def saveMovieIndex():
+	for index in list(directories.values()): # a background load may add directories
+		index.save()
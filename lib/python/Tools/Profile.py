@@ -10,6 +10,8 @@ profile_start = time.time()
 profile_data = {}
 total_time = 1
 profile_file = None
+profile_timings = [] # (id, seconds) of the steps recorded with profile_timing
+profile_done = False
 
 try:
 	profile_old = open(resolveFilename(SCOPE_CONFIG, "profile"), "r").readlines()
@@ -47,8 +49,19 @@ def profile(id):
 				pass
 
 
+def profile_timing(id, seconds):
+	# Records how long a step took that doesn't run in line with the boot, like
+	# work done in a thread. May be called from any thread.
+	profile_timings.append((id, seconds))
+	if profile_done:
+		print("[Profile] %s: %.3fs" % (id, seconds))
+
+
 def profile_final():
-	global profile_file
+	global profile_file, profile_done
 	if profile_file is not None:
 		profile_file.close()
 		profile_file = None
+	profile_done = True
+	for id, seconds in sorted(profile_timings, key=lambda timing: -timing[1]):
+		print("[Profile] %s: %.3fs" % (id, seconds))
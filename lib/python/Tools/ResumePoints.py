@@ -0,0 +1,151 @@
+import os
+import struct
+from collections import OrderedDict
+from pickle import load as pickle_load, dump as pickle_dump, HIGHEST_PROTOCOL as pickle_HIGHEST_PROTOCOL
+from time import time
+
+from enigma import eTimer
+from Components.MountTable import mountTable
+
+# Cut lists and resume points of recordings and media files.
+#
+# A .cuts file is a sequence of 12 byte records, a big-endian 64-bit PTS and a
+# 32-bit type. The whole file is read at once and the decoded cut list is
+# remembered together with the mtime and size of the file. Resume points of
+# files without a cut list (and of streams) are kept in resumepoints.pkl,
+# which is written a few seconds after the last change, when going to standby
+# and on shutdown.
+
+CUT_TYPE_IN = 0
+CUT_TYPE_OUT = 1
+CUT_TYPE_MARK = 2
+CUT_TYPE_LAST = 3
+
+cutsParser = struct.Struct('>QI') # big-endian, 64-bit PTS and 32-bit type
+
+MaxCachedCuts = 500
+
+cutsCache = OrderedDict() # path -> ((mtime, size), cut list), least recently used first
+
+
+def readCuts(filename):
+	# Returns the cut list of filename as a tuple of (pts, type). Raises OSError
+	# when the file can't be read.
+	st = os.stat(filename)
+	key = (st.st_mtime_ns, st.st_size)
+	cached = cutsCache.get(filename)
+	if cached is not None and cached[0] == key:
+		cutsCache.move_to_end(filename)
+		return cached[1]
+	with open(filename, "rb") as f:
+		data = f.read()
+	cuts = tuple(cutsParser.iter_unpack(data[:len(data) - len(data) % cutsParser.size]))
+	cutsCache[filename] = (key, cuts)
+	while len(cutsCache) > MaxCachedCuts:
+		cutsCache.popitem(last=False)
+	return cuts
+
+
+def writeCuts(filename, cuts):
+	cutsCache.pop(filename, None)
+	with open(filename, "wb") as f:
+		f.write(b"".join(cutsParser.pack(pts, cutType) for pts, cutType in cuts))
+
+
+def getLastPosition(filename):
+	# Returns the last play position stored in a .cuts file, or None. Raises
+	# OSError when there is no .cuts file.
+	lastPosition = None
+	for pts, cutType in readCuts(filename):
+		if cutType == CUT_TYPE_LAST:
+			lastPosition = pts
+	return lastPosition
+
+
+class ResumePoints():
+	SaveDelay = 10000 # ms
+
+	def __init__(self):
+		self.resumePointFile = "/etc/enigma2/resumepoints.pkl"
+		self.resumePointCache = {}
+		self.dirty = False
+		self.loadResumePoints()
+		self.saveTimer = eTimer()
+		self.saveTimer.callback.append(self.flush)
+		self.cacheCleanTimer = eTimer()
+		self.cacheCleanTimer.callback.append(self.cleanCache)
+		self.cleanCache()  # get rid of stale entries on reboot
+
+	def loadResumePoints(self):
+		self.resumePointCache.clear()
+		if os.path.exists(self.resumePointFile):
+			with open(self.resumePointFile, "rb") as f:
+				self.resumePointCache.update(pickle_load(f, fix_imports=True, encoding="utf8"))
+
+	def saveResumePoints(self):
+		# the file is written when there were no further changes for SaveDelay
+		self.dirty = True
+		self.saveTimer.start(self.SaveDelay, True)
+
+	def flush(self):
+		self.saveTimer.stop()
+		if not self.dirty:
+			return
+		self.dirty = False
+		try:
+			with open(self.resumePointFile + ".writing", "wb") as f:
+				pickle_dump(self.resumePointCache, f, pickle_HIGHEST_PROTOCOL)
+			os.rename(self.resumePointFile + ".writing", self.resumePointFile)
+		except (IOError, OSError) as e:
+			print("[ResumePoints] failed to write %s: %s" % (self.resumePointFile, e))
+
+	def getResumePointOf(self, ref):
+		return self.resumePointCache.get(ref.toString())
+
+	def delResumePoint(self, ref):
+		if (sref := ref.toString()) in self.resumePointCache:
+			del self.resumePointCache[sref]
+			self.saveResumePoints()
+
+	def cleanCache(self):
+		changed = False
+		now = int(time())
+		self.cacheCleanTimer.stop()
+		for sref, v in list(self.resumePointCache.items()):
+			if "%3a//" in sref:  # resume point is stream
+				if now > v[0] + 90 * 24 * 60 * 60:  # keep stream resume points maximum 90 days
+					del self.resumePointCache[sref]
+					changed = True
+			else:
+				filepath = os.path.realpath(sref.split(':')[-1])
+				mountpoint = mountTable.getMountpoint(filepath)
+				if mountTable.isMountpoint(mountpoint) and not os.path.exists(filepath):
+					del self.resumePointCache[sref]
+					changed = True
+		if changed:
+			self.saveResumePoints()
+		self.cacheCleanTimer.startLongTimer(24 * 60 * 60)  # clean up daily
+
+	def setResumePoint(self, session):
+		service = session.nav.getCurrentService()
+		ref = session.nav.getCurrentlyPlayingServiceOrGroup()
+		if service is not None and ref is not None:  # and (ref.type != 1):
+			# ref type 1 has its own memory...
+			seek = service.seek()
+			if seek:
+				pos = seek.getPlayPosition()
+				if not pos[0]:
+					sref = ref.toString()
+					sl = x[1] if (x := seek.getLength()) else None
+					self.resumePointCache[sref] = [int(time()), pos[1], sl]
+					self.saveResumePoints()
+
+	def getResumePoint(self, session):
+		ref = session.nav.getCurrentlyPlayingServiceOrGroup()
+		if (ref is not None) and (ref.type != 1) and (sref := ref.toString()) in self.resumePointCache:
+			entry = self.resumePointCache[sref]
+			entry[0] = int(time())  # update LRU timestamp
+			return entry[1]
+
+
+resumePointsInstance = ResumePoints()
@@ -0,0 +1,218 @@
+import os
+import mmap
+import pickle
+from collections import Counter
+from hashlib import sha1
+from struct import Struct
+import xml.etree.ElementTree
+
+# Journaled storage for timers.xml.
+#
+# The timer list is handled as a list of xml fragments, one "<timer>...</timer>"
+# text per timer. In journal mode a save only appends the fragments which were
+# added and the digests of the fragments which were removed to timers.xml.journal,
+# every save being closed by a commit record. From time to time the journal is
+# compacted: timers.xml is rewritten completely (so it stays usable for everybody
+# reading it) and a pickled snapshot of the parsed timers is written next to it.
+# At boot the snapshot is mmapped and the journal replayed on top of it, so
+# timers.xml only has to be parsed when the snapshot does not belong to it.
+# Every compaction starts a new journal generation, written at the start of
+# the journal and into the snapshot. A journal of another generation, left
+# over when the box went down between writing the snapshot and removing the
+# journal, is already part of the snapshot and is not replayed.
+
+JOURNAL_ADD = b"+"
+JOURNAL_REMOVE = b"-"
+JOURNAL_COMMIT = b"C"
+JOURNAL_GENERATION = b"G"
+
+SNAPSHOT_VERSION = 1
+
+record_header = Struct(">cI")
+generation_record = Struct(">I")
+
+
+def fragmentDigest(fragment):
+	return sha1(fragment.encode("utf-8")).digest()
+
+
+def parseFragment(fragment):
+	node = xml.etree.ElementTree.fromstring(fragment)
+	return dict(node.attrib), [(dict(l.attrib), l.text or "") for l in node.findall("log")]
+
+
+def buildElement(attrib, logs):
+	node = xml.etree.ElementTree.Element("timer", attrib)
+	for attrs, text in logs:
+		xml.etree.ElementTree.SubElement(node, "log", attrs).text = text
+	return node
+
+
+class TimerStore:
+	MaxJournalRecords = 200
+	MaxJournalSize = 256 * 1024
+
+	def __init__(self, filename):
+		self.filename = filename
+		self.journal = filename + ".journal"
+		self.snapshot = filename + ".cache"
+		self.persisted = Counter() # digests of the fragments stored in timers.xml + journal
+		self.journal_records = 0
+		self.journal_size = 0
+		self.generation = 0 # journals of older snapshots have no generation record
+		self.compact_pending = True
+
+	def getFileStat(self):
+		st = os.stat(self.filename)
+		return (st.st_size, st.st_mtime_ns)
+
+	def load(self):
+		# Returns the list of <timer> elements. Raises IOError or SyntaxError
+		# just like xml.etree.ElementTree.parse does for timers.xml.
+		timers = self.loadSnapshot()
+		if timers is None:
+			if os.path.exists(self.journal):
+				print("[TimerStore] snapshot does not match %s, dropping journal" % self.filename)
+				self.removeFile(self.journal)
+			self.persisted = Counter()
+			self.compact_pending = True
+			return xml.etree.ElementTree.parse(self.filename).getroot().findall("timer")
+		timers, self.generation = timers
+		self.compact_pending = not self.replayJournal(timers)
+		self.persisted = Counter(digest for digest, attrib, logs in timers)
+		return [buildElement(attrib, logs) for digest, attrib, logs in timers]
+
+	def loadSnapshot(self):
+		try:
+			with open(self.snapshot, "rb") as f:
+				with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+					data = pickle.loads(m)
+			if data.get("version") == SNAPSHOT_VERSION and data.get("stat") == self.getFileStat():
+				return data["timers"], data.get("generation", 0)
+			print("[TimerStore] snapshot is outdated")
+		except (IOError, OSError, ValueError, EOFError, pickle.UnpicklingError) as e:
+			if os.path.exists(self.snapshot):
+				print("[TimerStore] failed to load snapshot:", e)
+		return None
+
+	def readJournal(self):
+		# Returns the records of all complete (committed) saves, whether the
+		# journal ended cleanly and its generation. A torn last save after a
+		# crash or power loss is ignored.
+		try:
+			with open(self.journal, "rb") as f:
+				data = f.read()
+		except (IOError, OSError):
+			return [], True, self.generation
+		records = []
+		pending = []
+		generation = 0
+		pos = 0
+		while pos + record_header.size <= len(data):
+			op, length = record_header.unpack_from(data, pos)
+			pos += record_header.size
+			if pos + length > len(data):
+				break
+			payload = data[pos:pos + length]
+			pos += length
+			if op == JOURNAL_COMMIT:
+				records.extend(pending)
+				pending = []
+			elif op == JOURNAL_GENERATION and length == generation_record.size:
+				generation = generation_record.unpack(payload)[0]
+			else:
+				pending.append((op, payload))
+		complete = not pending and pos == len(data)
+		if not complete:
+			print("[TimerStore] ignoring incomplete journal record")
+		self.journal_size = len(data)
+		return records, complete, generation
+
+	def replayJournal(self, timers):
+		# Returns False when the journal has to be compacted before appending to it.
+		records, complete, generation = self.readJournal()
+		if generation != self.generation:
+			print("[TimerStore] journal belongs to an older snapshot, dropping it")
+			self.removeFile(self.journal)
+			self.journal_records = 0
+			self.journal_size = 0
+			return True
+		for op, payload in records:
+			if op == JOURNAL_ADD:
+				fragment = payload.decode("utf-8")
+				try:
+					attrib, logs = parseFragment(fragment)
+				except SyntaxError:
+					print("[TimerStore] skipping broken journal record")
+					continue
+				timers.append((fragmentDigest(fragment), attrib, logs))
+			elif op == JOURNAL_REMOVE:
+				for index, timer in enumerate(timers):
+					if timer[0] == payload:
+						del timers[index]
+						break
+		self.journal_records = len(records)
+		return complete
+
+	def save(self, fragments, journal=True):
+		if not journal or self.compact_pending or self.journal_records >= self.MaxJournalRecords or self.journal_size >= self.MaxJournalSize:
+			self.compact(fragments, snapshot=journal)
+			return
+		current = Counter()
+		texts = {}
+		for fragment in fragments:
+			digest = fragmentDigest(fragment)
+			current[digest] += 1
+			texts[digest] = fragment
+		records = []
+		for digest, count in (self.persisted - current).items():
+			records.extend([(JOURNAL_REMOVE, digest)] * count)
+		for digest, count in (current - self.persisted).items():
+			records.extend([(JOURNAL_ADD, texts[digest].encode("utf-8"))] * count)
+		if not records:
+			return
+		if not self.journal_size:
+			records.insert(0, (JOURNAL_GENERATION, generation_record.pack(self.generation)))
+		data = b"".join(record_header.pack(op, len(payload)) + payload for op, payload in records)
+		data += record_header.pack(JOURNAL_COMMIT, 0)
+		with open(self.journal, "ab") as f:
+			f.write(data)
+			f.flush()
+			os.fsync(f.fileno())
+		self.persisted = current
+		self.journal_records += len(records)
+		self.journal_size += len(data)
+
+	def compact(self, fragments, snapshot=True):
+		self.writeFile(self.filename, ('<?xml version="1.0" ?>\n<timers>\n' + "".join(fragments) + '</timers>\n').encode("utf-8"))
+		# the journal is part of timers.xml now
+		self.removeFile(self.journal)
+		self.generation = self.generation % 0xFFFFFFFF + 1
+		if snapshot:
+			timers = []
+			for fragment in fragments:
+				attrib, logs = parseFragment(fragment)
+				timers.append((fragmentDigest(fragment), attrib, logs))
+			try:
+				self.writeFile(self.snapshot, pickle.dumps({"version": SNAPSHOT_VERSION, "stat": self.getFileStat(), "generation": self.generation, "timers": timers}, pickle.HIGHEST_PROTOCOL))
+			except (IOError, OSError) as e:
+				print("[TimerStore] failed to write snapshot:", e)
+		else:
+			self.removeFile(self.snapshot)
+		self.persisted = Counter(fragmentDigest(fragment) for fragment in fragments)
+		self.journal_records = 0
+		self.journal_size = 0
+		self.compact_pending = False
+
+	def writeFile(self, filename, data):
+		with open(filename + ".writing", "wb") as f:
+			f.write(data)
+			f.flush()
+			os.fsync(f.fileno())
+		os.rename(filename + ".writing", filename)
+
+	def removeFile(self, filename):
+		try:
+			os.unlink(filename)
+		except OSError:
+			pass
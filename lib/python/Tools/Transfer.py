@@ -0,0 +1,334 @@
+import errno
+import json
+import mmap
+import os
+import threading
+from time import monotonic, sleep, time
+
+import NavigationInstance
+
+# File copies for Directories.copyfile/copytree and the copy and move jobs of
+# Screens.CopyFiles.
+#
+# Data is copied inside the kernel with copy_file_range, or with sendfile
+# where the kernel or file system can't do that, and from an mmap of the source
+# as the last resort. A Transfer copies the files of different devices in
+# parallel and is throttled to config.misc.transfer_speed while a recording
+# runs on one of its devices. Its progress is kept in a checkpoint file, so a
+# copy or move interrupted by a reboot can be resumed where it stopped, as long
+# as the destination is on the same device as before and holds the data.
+
+ChunkSize = 8 * 1024 * 1024
+CheckpointInterval = 5 # seconds between checkpoints of a running transfer
+CHECKPOINT_FILE = "/etc/enigma2/transfers.json"
+
+FallbackErrors = (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF)
+
+checkpoints = {} # transfer id -> checkpoint data
+checkpointLock = threading.Lock()
+
+
+def copyFileRange(src, dst, offset, count):
+	if not hasattr(os, "copy_file_range"):
+		raise OSError(errno.ENOSYS, "copy_file_range not available")
+	return os.copy_file_range(src, dst, count, offset, offset)
+
+
+def sendFile(src, dst, offset, count):
+	os.lseek(dst, offset, os.SEEK_SET)
+	return os.sendfile(dst, src, offset, count)
+
+
+def copyMapped(src, dst, offset, count):
+	start = offset - offset % mmap.ALLOCATIONGRANULARITY
+	with mmap.mmap(src, offset + count - start, access=mmap.ACCESS_READ, offset=start) as m:
+		os.lseek(dst, offset, os.SEEK_SET)
+		with memoryview(m) as view:
+			return os.write(dst, view[offset - start:])
+
+
+def copyData(src, dst, offset, end, progress=None):
+	# Copies the bytes from offset to end of the file descriptor src to the same
+	# position in dst. progress is called with the number of bytes and the
+	# offset reached after every chunk and may raise to stop the copy.
+	methods = [copyFileRange, sendFile, copyMapped]
+	while offset < end:
+		count = min(ChunkSize, end - offset)
+		try:
+			copied = methods[0](src, dst, offset, count)
+		except OSError as e:
+			if e.errno not in FallbackErrors or len(methods) == 1:
+				raise
+			methods.pop(0)
+			continue
+		if copied <= 0:
+			if len(methods) > 1: # copy_file_range and sendfile don't support every file
+				methods.pop(0)
+				continue
+			raise IOError(errno.EIO, "Unexpected end of file")
+		offset += copied
+		if progress:
+			progress(copied, offset)
+	return offset
+
+
+def getRecordingDevices():
+	devices = set()
+	if NavigationInstance.instance is not None:
+		for timer in NavigationInstance.instance.RecordTimer.timer_list:
+			if timer.isRunning() and not timer.justplay and timer.Filename:
+				try:
+					devices.add(os.stat(os.path.dirname(timer.Filename)).st_dev)
+				except OSError:
+					pass
+	return devices
+
+
+class Throttle:
+	# Limits the copy speed of a transfer while one of its devices records.
+	def __init__(self, devices):
+		self.devices = devices
+		self.lock = threading.Lock()
+		self.limit = 0
+		self.checked = 0
+		self.time = monotonic()
+		self.debt = 0.0
+
+	def getLimit(self):
+		now = monotonic()
+		if now - self.checked >= 1:
+			self.checked = now
+			from Components.config import config # imported here, Tools.Directories imports this module
+			limit = int(config.misc.transfer_speed.value) * 1024 * 1024
+			self.limit = limit if limit and not self.devices.isdisjoint(getRecordingDevices()) else 0
+		return self.limit
+
+	def consume(self, count):
+		with self.lock:
+			limit = self.getLimit()
+			now = monotonic()
+			if not limit:
+				self.time = now
+				self.debt = 0.0
+				return
+			self.debt = max(0.0, self.debt - (now - self.time) * limit) + count
+			self.time = now
+			delay = self.debt / limit
+		if delay > 0.05:
+			sleep(delay)
+
+
+class Transfer:
+	def __init__(self, fileList, move=False, name="", transferId=None, done=None, sizes=None, targets=None):
+		self.fileList = [(src, dst) for src, dst in fileList]
+		self.move = move
+		self.name = name
+		self.resumed = transferId is not None
+		self.id = transferId or "%d-%d" % (time() * 1000, id(self))
+		self.done = done or [0] * len(self.fileList) # bytes copied and synced per file
+		self.sizes = []
+		self.devices = {}
+		for src, dst in self.fileList:
+			try:
+				st = os.stat(src)
+				self.sizes.append(st.st_size)
+				self.devices[src] = st.st_dev
+			except OSError:
+				if not self.resumed:
+					print("[Transfer] Failed to stat", src)
+				self.sizes.append(0)
+		if sizes is not None:
+			self.sizes = sizes
+		self.targets = targets or [getDevice(os.path.dirname(dst) or ".") for src, dst in self.fileList] # device of each destination directory
+		self.size = sum(self.sizes)
+		self.copied = sum(self.done)
+		self.created = set(range(len(self.fileList))) if self.resumed else set() # destination files created by the transfer
+		self.lock = threading.Lock()
+		self.aborted = False
+		self.checkpointTime = monotonic()
+
+	def getCheckpoint(self):
+		return {"move": self.move, "name": self.name, "files": [[src, dst, size, done, target] for (src, dst), size, done, target in zip(self.fileList, self.sizes, self.done, self.targets)]}
+
+	def saveCheckpoint(self):
+		with checkpointLock:
+			checkpoints[self.id] = self.getCheckpoint()
+			writeCheckpoints()
+
+	def removeCheckpoint(self):
+		with checkpointLock:
+			if checkpoints.pop(self.id, None) is not None:
+				writeCheckpoints()
+
+	def getGroups(self):
+		# files of the same source and destination devices are copied one by one
+		groups = {}
+		for index, (src, dst) in enumerate(self.fileList):
+			groups.setdefault((self.devices.get(src), self.targets[index]), []).append(index)
+		return list(groups.values())
+
+	def run(self, progress=None):
+		# Copies (and for a move then removes) the files, calling progress with
+		# the total number of bytes copied. Raises when a file fails or the
+		# transfer is aborted, after removing the incomplete copies.
+		self.progress = progress
+		self.saveCheckpoint()
+		devices = set(self.devices.values()) | set(target for target in self.targets if target is not None)
+		self.throttle = Throttle(devices)
+		errors = []
+		groups = self.getGroups()
+		threads = [threading.Thread(target=self.runGroup, args=(group, errors)) for group in groups[1:]]
+		for thread in threads:
+			thread.start()
+		self.runGroup(groups[0], errors)
+		for thread in threads:
+			thread.join()
+		if errors:
+			print("[Transfer]", errors[0])
+			for index, (src, dst) in enumerate(self.fileList):
+				if index in self.created and os.path.exists(src): # remove incomplete data
+					try:
+						os.unlink(dst)
+					except OSError:
+						pass
+			self.removeCheckpoint()
+			raise errors[0]
+		errors = []
+		if self.move:
+			for src, dst in self.fileList:
+				try:
+					os.unlink(src)
+				except OSError as e:
+					if e.errno != errno.ENOENT:
+						errors.append(e)
+		self.removeCheckpoint()
+		if errors:
+			raise errors[0]
+
+	def runGroup(self, group, errors):
+		try:
+			for index in group:
+				if errors:
+					break
+				self.copyFile(index)
+		except Exception as e:
+			errors.append(e)
+
+	def copyFile(self, index):
+		src, dst = self.fileList[index]
+		size = self.sizes[index]
+		offset = self.done[index]
+		if self.resumed and offset >= size and not os.path.exists(src):
+			return # moved before the interruption
+		fdin = os.open(src, os.O_RDONLY)
+		try:
+			fdout = os.open(dst, os.O_WRONLY | os.O_CREAT | (0 if self.resumed else os.O_EXCL))
+			self.created.add(index)
+			try:
+				if offset and os.fstat(fdout).st_size < offset:
+					raise IOError(errno.EIO, "Destination %s is shorter than the copied data" % dst)
+				os.ftruncate(fdout, offset)
+
+				def progress(count, position):
+					if self.aborted:
+						raise Exception("Aborted")
+					self.throttle.consume(count)
+					with self.lock:
+						self.copied += count
+					if self.progress:
+						self.progress(self.copied)
+					if monotonic() - self.checkpointTime >= CheckpointInterval:
+						self.checkpointTime = monotonic()
+						os.fdatasync(fdout)
+						self.done[index] = position
+						self.saveCheckpoint()
+
+				copyData(fdin, fdout, offset, size, progress)
+				os.fsync(fdout)
+				self.done[index] = size
+			finally:
+				os.close(fdout)
+		finally:
+			os.close(fdin)
+		self.saveCheckpoint()
+
+
+def writeCheckpoints():
+	try:
+		if checkpoints:
+			with open(CHECKPOINT_FILE + ".writing", "w") as f:
+				json.dump(checkpoints, f)
+			os.rename(CHECKPOINT_FILE + ".writing", CHECKPOINT_FILE)
+		elif os.path.exists(CHECKPOINT_FILE):
+			os.unlink(CHECKPOINT_FILE)
+	except (IOError, OSError) as e:
+		print("[Transfer] Failed to write checkpoints:", e)
+
+
+def getDevice(path):
+	try:
+		return os.stat(path).st_dev
+	except OSError:
+		return None
+
+
+def checkResumable(src, dst, size, done, target):
+	# Returns the bytes of dst which can be kept, or None when the transfer
+	# can't be resumed: the destination is not on the device it was on, e.g.
+	# because it isn't mounted yet, so the copy would go to the mount point.
+	if done >= size and not os.path.exists(src):
+		return done # moved before the interruption
+	if not os.path.exists(src) or target is None or getDevice(os.path.dirname(dst) or ".") != target:
+		return None
+	if done:
+		try:
+			st = os.stat(dst)
+			if st.st_dev == target and st.st_size >= done:
+				return min(done, size)
+		except OSError:
+			pass
+		print("[Transfer] Copying %s again, %s lacks the copied data" % (src, dst))
+	return 0
+
+
+def getInterruptedTransfers():
+	# Returns the transfers which were running when enigma2 stopped. Transfers
+	# whose files are gone, or whose destinations are missing, are dropped and
+	# their sources kept.
+	try:
+		with open(CHECKPOINT_FILE, "r") as f:
+			data = json.load(f)
+	except (IOError, OSError, ValueError) as e:
+		if os.path.exists(CHECKPOINT_FILE):
+			print("[Transfer] Failed to read checkpoints:", e)
+		return []
+	transfers = []
+	for transferId, checkpoint in data.items():
+		try:
+			files = checkpoint["files"]
+			done = [checkResumable(src, dst, size, done, target) for src, dst, size, done, target in files]
+			if None in done:
+				print("[Transfer] Dropping interrupted transfer", checkpoint["name"])
+				continue
+			transfers.append(Transfer([(src, dst) for src, dst, size, done, target in files], checkpoint["move"], checkpoint["name"], transferId, done, [size for src, dst, size, done, target in files], [target for src, dst, size, done, target in files]))
+		except (KeyError, TypeError, ValueError):
+			print("[Transfer] Ignoring broken checkpoint", transferId)
+	with checkpointLock:
+		checkpoints.clear()
+		for transfer in transfers:
+			checkpoints[transfer.id] = transfer.getCheckpoint()
+		writeCheckpoints()
+	return transfers
+
+
+def copyFile(src, dst):
+	# Copies the data of src to dst, which is created or truncated.
+	fdin = os.open(src, os.O_RDONLY)
+	try:
+		fdout = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+		try:
+			copyData(fdin, fdout, 0, os.fstat(fdin).st_size)
+		finally:
+			os.close(fdout)
+	finally:
+		os.close(fdin)
@@ -1,14 +1,18 @@
+import json
 import time
 import os
+import threading
 import enigma
 from Components.config import config
-from Components import Harddisk
+from Components.MountTable import mountTable
+from Tools.MovieIndex import invalidateDirectory
+from Components.StorageStats import storageStats
 from twisted.internet import threads
 
 
 def getTrashFolder(path):
 	# Returns trash folder without symlinks. Path may be file or directory or whatever.
-	mountpoint = Harddisk.findMountPoint(os.path.realpath(path))
+	mountpoint = mountTable.getMountpoint(os.path.realpath(path))
 	movie = os.path.join(mountpoint, 'movie')
 	if os.path.isdir(movie):
 		mountpoint = movie
@@ -27,7 +31,7 @@ def createTrashFolder(path):
 def enumTrashFolders():
 	# Walk through all Trash folders. This may access network
 	# drives and similar, so might block for minutes.
-	for mount in Harddisk.getProcMounts():
+	for mount in mountTable.getMounts():
 		if mount[1].startswith('/media/'):
 			mountpoint = mount[1]
 			movie = os.path.join(mountpoint, 'movie')
@@ -38,9 +42,167 @@ def enumTrashFolders():
 				yield result
 
 
+# Manifest of the files in a trash folder.
+#
+# Purging used to walk and stat every file in the trash folder each time. The
+# manifest (a JSON file in the trash folder, as it may be on removable or
+# network storage) remembers the ctime and size of every file, and is updated
+# when items are moved to the trash, so purging only has to look at the
+# manifest. The trash folder is scanned once a day to pick up changes made by
+# others; such a scan stats at most config.usage.movielist_trashcan_scan_budget
+# new files, the remaining ones are picked up by the next scan.
+
+MANIFEST_FILE = ".e2manifest"
+MANIFEST_VERSION = 1
+ReconcileInterval = 24 * 60 * 60
+
+manifests = {} # trash folder -> TrashManifest
+manifestLock = threading.RLock()
+
+stats = {
+	"bytesReclaimed": 0,
+	"filesPurged": 0,
+	"scans": 0,
+	"scanTime": 0.0,
+	"filesChecked": 0
+}
+
+
+class TrashManifest:
+	def __init__(self, trash):
+		self.trash = trash
+		self.filename = os.path.join(trash, MANIFEST_FILE)
+		self.items = {} # path relative to the trash folder -> [ctime, size]
+		self.scanned = 0 # time of the last complete scan
+		self.dirty = False
+		try:
+			with open(self.filename, "r", encoding="UTF-8") as f:
+				data = json.load(f)
+			if data.get("version") == MANIFEST_VERSION:
+				self.items = data["items"]
+				self.scanned = data["scanned"]
+		except (IOError, OSError, ValueError, KeyError, AttributeError):
+			pass
+
+	def needsScan(self):
+		now = time.time()
+		return not self.scanned or now - self.scanned > ReconcileInterval or now < self.scanned
+
+	def add(self, path):
+		# Adds a file which was just moved into the trash folder.
+		try:
+			st = os.stat(path)
+		except OSError as e:
+			print("[Trashcan] Failed to stat %s:" % path, e)
+			return
+		with manifestLock:
+			self.items[os.path.relpath(path, self.trash)] = [st.st_ctime, st.st_size]
+			self.dirty = True
+
+	def getItems(self):
+		with manifestLock:
+			return list(self.items.items())
+
+	def erase(self, name):
+		with manifestLock:
+			item = self.items.pop(name, None)
+			self.dirty = True
+		if item is not None:
+			try:
+				enigma.eBackgroundFileEraser.getInstance().erase(os.path.join(self.trash, name))
+				stats["bytesReclaimed"] += item[1]
+				stats["filesPurged"] += 1
+			except Exception as e:
+				print("[Trashcan] Failed to erase %s:" % name, e)
+
+	def reconcile(self, budget=0):
+		# Scans the trash folder for files which were added or removed behind our
+		# back and removes empty directories. Stats at most budget (0 = all) new files.
+		start = time.monotonic()
+		with manifestLock:
+			known = set(self.items)
+		found = set()
+		added = {}
+		complete = True
+		for root, dirs, files in os.walk(self.trash, topdown=False):
+			for name in files:
+				fn = os.path.join(root, name)
+				rel = os.path.relpath(fn, self.trash)
+				if rel == MANIFEST_FILE or rel == MANIFEST_FILE + ".writing":
+					continue
+				found.add(rel)
+				if rel in known:
+					continue
+				if budget and len(added) >= budget:
+					complete = False
+					continue
+				try:
+					st = os.stat(fn)
+					added[rel] = [st.st_ctime, st.st_size]
+				except Exception as e:
+					print("[Trashcan] Failed to stat %s:" % name, e)
+			# Remove empty directories if possible
+			for name in dirs:
+				try:
+					os.rmdir(os.path.join(root, name))
+				except:
+					pass
+		with manifestLock:
+			for rel in known - found:
+				self.items.pop(rel, None)
+			self.items.update(added)
+			if complete:
+				self.scanned = time.time()
+			self.dirty = True
+		elapsed = time.monotonic() - start
+		stats["scans"] += 1
+		stats["scanTime"] += elapsed
+		stats["filesChecked"] += len(added)
+		print("[Trashcan] Scanned %s in %.3fs, %d files, %d new%s" % (self.trash, elapsed, len(found), len(added), "" if complete else " (incomplete)"))
+
+	def save(self):
+		with manifestLock:
+			if not self.dirty:
+				return
+			self.dirty = False
+			data = {"version": MANIFEST_VERSION, "scanned": self.scanned, "items": dict(self.items)}
+		try:
+			with open(self.filename + ".writing", "w", encoding="UTF-8") as f:
+				json.dump(data, f)
+			os.rename(self.filename + ".writing", self.filename)
+		except (IOError, OSError) as e:
+			print("[Trashcan] Failed to write manifest %s: %s" % (self.filename, e))
+
+
+def getManifest(trash):
+	with manifestLock:
+		manifest = manifests.get(trash)
+		if manifest is None:
+			manifest = manifests[trash] = TrashManifest(trash)
+		return manifest
+
+
+def addToTrash(trash, paths):
+	# Records files (or whole directories) which were moved into trash.
+	manifest = getManifest(trash)
+	for path in paths:
+		if os.path.isdir(path):
+			for root, dirs, files in os.walk(path):
+				for name in files:
+					manifest.add(os.path.join(root, name))
+		else:
+			manifest.add(path)
+	manifest.save()
+
+
+def getTrashcanStats():
+	return dict(stats)
+
+
 class Trashcan:
 	def __init__(self):
 		self.isCleaning = False
+		self.cleanset = set()
 		self.session = None
 		self.dirty = set()
 
@@ -83,12 +245,15 @@ class Trashcan:
 		self.isCleaning = True
 		ctimeLimit = time.time() - (config.usage.movielist_trashcan_days.value * 3600 * 24)
 		reserveBytes = 1024 * 1024 * 1024 * int(config.usage.movielist_trashcan_reserve.value)
-		cleanset = self.dirty
+		cleanset = self.cleanset = self.dirty
 		self.dirty = set()
 		threads.deferToThread(purge, cleanset, ctimeLimit, reserveBytes).addCallbacks(self.cleanReady, self.cleanFail)
 
 	def cleanReady(self, result=None):
 		self.isCleaning = False
+		for trash in self.cleanset:
+			invalidateDirectory(trash)
+			storageStats.invalidate(trash)
 		# schedule another clean loop if needed (so we clean up all devices, not just one)
 		self.cleanIfIdle()
 
@@ -103,42 +268,34 @@ def purge(cleanset, ctimeLimit, reserveBytes):
 	for trash in cleanset:
 		if not os.path.isdir(trash):
 			print("[Trashcan] No trash.", trash)
-			return 0
+			continue
+		manifest = getManifest(trash)
+		if manifest.needsScan():
+			manifest.reconcile(int(config.usage.movielist_trashcan_scan_budget.value))
 		diskstat = os.statvfs(trash)
 		free = diskstat.f_bfree * diskstat.f_bsize
 		bytesToRemove = reserveBytes - free
 		candidates = []
 		print("[Trashcan] bytesToRemove", bytesToRemove, trash)
 		size = 0
-		for root, dirs, files in os.walk(trash, topdown=False):
-			for name in files:
-				try:
-					fn = os.path.join(root, name)
-					st = os.stat(fn)
-					if st.st_ctime < ctimeLimit:
-						print("[Trashcan] Too old:", name, st.st_ctime)
-						enigma.eBackgroundFileEraser.getInstance().erase(fn)
-						bytesToRemove -= st.st_size
-					else:
-						candidates.append((st.st_ctime, fn, st.st_size))
-						size += st.st_size
-				except Exception as e:
-					print("[Trashcan] Failed to stat %s:" % name, e)
-			# Remove empty directories if possible
-			for name in dirs:
-				try:
-					os.rmdir(os.path.join(root, name))
-				except:
-					pass
+		for name, (ctime, st_size) in manifest.getItems():
+			if ctime < ctimeLimit:
+				print("[Trashcan] Too old:", name, ctime)
+				manifest.erase(name)
+				bytesToRemove -= st_size
+			else:
+				candidates.append((ctime, name, st_size))
+				size += st_size
 		candidates.sort()
 		# Now we have a list of ctime, candidates, size. Sorted by ctime (=deletion time)
 		print("[Trashcan] Bytes to remove remaining:", bytesToRemove, trash)
-		for st_ctime, fn, st_size in candidates:
+		for ctime, name, st_size in candidates:
 			if bytesToRemove < 0:
 				break
-			enigma.eBackgroundFileEraser.getInstance().erase(fn)
+			manifest.erase(name)
 			bytesToRemove -= st_size
 			size -= st_size
+		manifest.save()
 		print("[Trashcan] Size after purging:", size, trash)
 
 
@@ -159,6 +316,10 @@ def cleanAll(trash):
 				os.rmdir(os.path.join(root, name))
 			except:
 				pass
+	invalidateDirectory(trash)
+	storageStats.invalidate(trash)
+	with manifestLock:
+		manifests.pop(trash, None)
 
 
 def init(session):
@@ -1,10 +1,25 @@
 import enigma
+import os
 import xml.etree.ElementTree
+from pickle import load as pickle_load, dump as pickle_dump, HIGHEST_PROTOCOL as pickle_HIGHEST_PROTOCOL
 
+import keyids
 from keyids import KEYIDS
+from Tools.Directories import resolveFilename, SCOPE_CONFIG
 
 # these are only informational (for help)...
-from Tools.KeyBindings import addKeyBinding
+from Tools.KeyBindings import addKeyBindings, removeKeyBindings
+
+# Compiled keymaps.
+#
+# Parsing the XML and looking up every key id takes long for the big
+# keymap.xml. So a parsed keymap, its lists of bindings, toggles and
+# translations, is kept in keymap.cache together with the mtime and size of
+# the keymap file, and used as long as neither the file nor keyids.py
+# changed. The lists are then passed to eActionMap as they are. The cache is
+# written a few seconds after a keymap was parsed.
+
+SaveDelay = 5000 # ms
 
 
 class KeymapError(Exception):
@@ -34,7 +49,7 @@ def getKeyId(id):
 	return keyid
 
 
-def parseKeys(context, filename, actionmap, device, keys):
+def parseKeys(context, filename, bindings, device, keys):
 	for x in keys.findall("key"):
 		get_attr = x.attrib.get
 		mapto = get_attr("mapto")
@@ -51,16 +66,15 @@ def parseKeys(context, filename, actionmap, device, keys):
 
 		keyid = getKeyId(id)
 #				print "[keymapparser] " + context + "::" + mapto + " -> " + device + "." + hex(keyid)
-		actionmap.bindKey(filename, device, keyid, flags, context, mapto)
-		addKeyBinding(filename, keyid, context, mapto, flags)
+		bindings.append((device, keyid, flags, context, mapto))
 
 
-def parseTrans(filename, actionmap, device, keys):
+def parseTrans(filename, toggles, translations, device, keys):
 	for x in keys.findall("toggle"):
 		get_attr = x.attrib.get
 		toggle_key = get_attr("from")
 		toggle_key = getKeyId(toggle_key)
-		actionmap.bindToggle(filename, device, toggle_key)
+		toggles.append((device, toggle_key))
 
 	for x in keys.findall("key"):
 		get_attr = x.attrib.get
@@ -73,40 +87,133 @@ def parseTrans(filename, actionmap, device, keys):
 		keyin = getKeyId(keyin)
 		keyout = getKeyId(keyout)
 		toggle = int(toggle)
-		actionmap.bindTranslation(filename, device, keyin, keyout, toggle)
+		translations.append((device, keyin, keyout, toggle))
 
 
-def readKeymap(filename):
-	p = enigma.eActionMap.getInstance()
-	assert p
+class KeymapCache:
+	def __init__(self):
+		self.filename = resolveFilename(SCOPE_CONFIG, "keymap.cache")
+		self.keymaps = None # filename -> (mtime, size, keymap)
+		self.keyids = None
+		self.dirty = False
+		self.saveTimer = None
+
+	def getStamp(self, stat):
+		return (stat.st_mtime, stat.st_size)
+
+	def load(self):
+		self.keymaps = {}
+		try:
+			self.keyids = self.getStamp(os.stat(keyids.__file__))
+		except (OSError, TypeError):
+			self.keyids = None
+		try:
+			with open(self.filename, "rb") as f:
+				cache = pickle_load(f)
+			if cache.get("keyids") == self.keyids:
+				self.keymaps = cache["keymaps"]
+		except FileNotFoundError:
+			pass
+		except Exception as e:
+			print("[keymapparser] Failed to read %s: %s" % (self.filename, e))
+
+	def get(self, filename, stat):
+		if self.keymaps is None:
+			self.load()
+		entry = self.keymaps.get(filename)
+		if entry and entry[0] == self.getStamp(stat):
+			return entry[1]
+		return None
+
+	def put(self, filename, stat, keymap):
+		self.keymaps[filename] = (self.getStamp(stat), keymap)
+		self.dirty = True
+		if self.saveTimer is None:
+			self.saveTimer = enigma.eTimer()
+			self.saveTimer.callback.append(self.flush)
+		self.saveTimer.start(SaveDelay, True)
+
+	def flush(self):
+		if not self.dirty:
+			return
+		self.dirty = False
+		# keymaps of removed plugins are dropped
+		self.keymaps = dict((filename, entry) for filename, entry in self.keymaps.items() if os.path.exists(filename))
+		try:
+			with open(self.filename + ".writing", "wb") as f:
+				pickle_dump({"keyids": self.keyids, "keymaps": self.keymaps}, f, pickle_HIGHEST_PROTOCOL)
+			os.rename(self.filename + ".writing", self.filename)
+		except (IOError, OSError) as e:
+			print("[keymapparser] Failed to write %s: %s" % (self.filename, e))
+
+
+keymapCache = KeymapCache()
+
 
+def parseKeymap(filename):
+	# Returns the bindings, toggles and translations of a keymap file.
 	try:
 		source = open(filename)
 	except:
 		print("[keymapparser] keymap file " + filename + " not found")
-		return
+		return None
 
 	try:
-		dom = xml.etree.ElementTree.parse(source)
+		with source:
+			dom = xml.etree.ElementTree.parse(source)
 	except:
 		raise KeymapError("[keymapparser] keymap %s not well-formed." % filename)
 
 	keymap = dom.getroot()
+	bindings = []
+	toggles = []
+	translations = []
 
 	for cmap in keymap.findall("map"):
 		context = cmap.attrib.get("context")
 		assert context, "[keymapparser] map must have context"
 
-		parseKeys(context, filename, p, "generic", cmap)
+		parseKeys(context, filename, bindings, "generic", cmap)
 
 		for device in cmap.findall("device"):
-			parseKeys(context, filename, p, device.attrib.get("name"), device)
+			parseKeys(context, filename, bindings, device.attrib.get("name"), device)
 
 	for ctrans in keymap.findall("translate"):
 		for device in ctrans.findall("device"):
-			parseTrans(filename, p, device.attrib.get("name"), device)
+			parseTrans(filename, toggles, translations, device.attrib.get("name"), device)
+
+	return bindings, toggles, translations
+
+
+def readKeymap(filename):
+	p = enigma.eActionMap.getInstance()
+	assert p
+
+	try:
+		stat = os.stat(filename)
+	except OSError:
+		print("[keymapparser] keymap file " + filename + " not found")
+		return
+
+	keymap = keymapCache.get(filename, stat)
+	if keymap is None:
+		keymap = parseKeymap(filename)
+		if keymap is None:
+			return
+		keymapCache.put(filename, stat, keymap)
+
+	bindings, toggles, translations = keymap
+	bindKey = p.bindKey
+	for device, keyid, flags, context, mapto in bindings:
+		bindKey(filename, device, keyid, flags, context, mapto)
+	for device, keyid in toggles:
+		p.bindToggle(filename, device, keyid)
+	for device, keyin, keyout, toggle in translations:
+		p.bindTranslation(filename, device, keyin, keyout, toggle)
+	addKeyBindings(filename, bindings)
 
 
 def removeKeymap(filename):
 	p = enigma.eActionMap.getInstance()
 	p.unbindKeyDomain(filename)
+	removeKeyBindings(filename)
@@ -1,4 +1,6 @@
 from bisect import insort
+from heapq import heapify, heappop, heappush, heapreplace
+from itertools import count
 from time import time, localtime, mktime
 from enigma import eTimer
 import datetime
@@ -149,6 +151,17 @@ class Timer:
 		self.timer_list = []
 		self.processed_timers = []
 
+		# timer_list stays sorted for everybody iterating it, the scheduling itself
+		# is done on a heap of (next activation, sequence, entry) tuples. Entries
+		# which got removed, rescheduled or disabled are not searched for in the
+		# heap but skipped when they show up at its top (lazy invalidation). A
+		# timer whose begin or end is changed while in timer_list must be passed
+		# to timeChanged, or it keeps its old place in the heap.
+		self.timer_heap = []
+		self.timer_heap_seq = {} # entry -> sequence number of its valid heap item
+		self.disabled_heap_timers = set()
+		self.heap_counter = count()
+
 		self.timer = eTimer()
 		self.timer.callback.append(self.calcNextActivation)
 		self.lastActivation = time()
@@ -156,6 +169,76 @@ class Timer:
 		self.calcNextActivation()
 		self.on_state_change = []
 
+	@property
+	def processed_timers(self):
+		return self.__processed_timers
+
+	@processed_timers.setter
+	def processed_timers(self, timers):
+		self.__processed_timers = timers
+		self.processed_timers_set = set(timers)
+
+	def addProcessedTimer(self, entry):
+		if entry not in self.processed_timers_set:
+			insort(self.__processed_timers, entry)
+			self.processed_timers_set.add(entry)
+
+	def removeProcessedTimer(self, entry):
+		if entry in self.processed_timers_set:
+			self.__processed_timers.remove(entry)
+			self.processed_timers_set.discard(entry)
+
+	def insertTimer(self, entry):
+		insort(self.timer_list, entry)
+		self.pushTimer(entry)
+
+	def removeTimer(self, entry):
+		self.timer_list.remove(entry)
+		self.timer_heap_seq.pop(entry, None)
+		self.disabled_heap_timers.discard(entry)
+
+	def pushTimer(self, entry):
+		seq = next(self.heap_counter)
+		self.timer_heap_seq[entry] = seq
+		heappush(self.timer_heap, (entry.getNextActivation(), seq, entry))
+		if len(self.timer_heap) > 2 * len(self.timer_heap_seq) + 64:
+			self.rebuildTimerHeap()
+
+	def rebuildTimerHeap(self):
+		heap = []
+		self.timer_heap_seq = {}
+		for entry in self.timer_list:
+			seq = next(self.heap_counter)
+			self.timer_heap_seq[entry] = seq
+			heap.append((entry.getNextActivation(), seq, entry))
+		heapify(heap)
+		self.timer_heap = heap
+		self.disabled_heap_timers = set()
+
+	def getFirstTimer(self):
+		# re-queue disabled timers which got enabled again
+		if self.disabled_heap_timers:
+			for entry in [x for x in self.disabled_heap_timers if not x.disabled]:
+				self.disabled_heap_timers.discard(entry)
+				if entry in self.timer_heap_seq:
+					self.pushTimer(entry)
+		heap = self.timer_heap
+		while heap:
+			when, seq, entry = heap[0]
+			if self.timer_heap_seq.get(entry) != seq:
+				heappop(heap)
+			elif entry.disabled:
+				heappop(heap)
+				self.disabled_heap_timers.add(entry)
+			else:
+				next_activation = entry.getNextActivation()
+				if next_activation == when:
+					return entry
+				seq = next(self.heap_counter)
+				self.timer_heap_seq[entry] = seq
+				heapreplace(heap, (next_activation, seq, entry))
+		return None
+
 	def stateChanged(self, entry):
 		for f in self.on_state_change:
 			f(entry)
@@ -179,12 +262,11 @@ class Timer:
 		# don't go trough waiting/running/end-states, but sort it
 		# right into the processedTimers.
 		if entry.shouldSkip() or entry.state == TimerEntry.StateEnded or (entry.state == TimerEntry.StateWaiting and entry.disabled):
-			if entry not in self.processed_timers:
-				insort(self.processed_timers, entry)
+			self.addProcessedTimer(entry)
 			entry.state = TimerEntry.StateEnded
 		else:
-			if entry not in self.timer_list:
-				insort(self.timer_list, entry)
+			if entry not in self.timer_heap_seq:
+				self.insertTimer(entry)
 			if not noRecalc:
 				self.calcNextActivation()
 
@@ -225,17 +307,19 @@ class Timer:
 				x.resetState()
 				self.addTimerEntry(x, noRecalc=1)
 
+			# resort/refresh list and heap, try to fix hanging timers
+			self.timer_list.sort()
+			self.rebuildTimerHeap()
+
 		self.processActivation()
 		self.lastActivation = now
 
 		min = int(now) + self.MaxWaitTime
 
-		self.timer_list and self.timer_list.sort() #  resort/refresh list, try to fix hanging timers
-
 		# calculate next activation point
-		timer_list = [t for t in self.timer_list if not t.disabled]
-		if timer_list:
-			w = timer_list[0].getNextActivation()
+		first = self.getFirstTimer()
+		if first is not None:
+			w = first.getNextActivation()
 			if w < min:
 				min = w
 
@@ -249,11 +333,10 @@ class Timer:
 		print("time changed")
 		timer.timeChanged()
 		if timer.state == TimerEntry.StateEnded:
-			if timer in self.processed_timers:
-				self.processed_timers.remove(timer)
+			self.removeProcessedTimer(timer)
 		else:
 			try:
-				self.timer_list.remove(timer)
+				self.removeTimer(timer)
 			except:
 				print("[timer] Failed to remove, not in list")
 				return
@@ -263,7 +346,7 @@ class Timer:
 		self.addTimerEntry(timer)
 
 	def doActivate(self, w):
-		self.timer_list.remove(w)
+		self.removeTimer(w)
 
 		# when activating a timer which has already passed,
 		# simply abort the timer. don't run trough all the stages.
@@ -279,7 +362,7 @@ class Timer:
 		# did this timer reached the last state?
 		if w.state < TimerEntry.StateEnded:
 			# no, sort it into active list
-			insort(self.timer_list, w)
+			self.insertTimer(w)
 		else:
 			# yes. Process repeated, and re-add.
 			if w.repeated:
@@ -287,8 +370,7 @@ class Timer:
 				w.state = TimerEntry.StateWaiting
 				self.addTimerEntry(w)
 			else:
-				if w not in self.processed_timers:
-					insort(self.processed_timers, w)
+				self.addProcessedTimer(w)
 
 		self.stateChanged(w)
 
@@ -296,8 +378,8 @@ class Timer:
 		t = int(time()) + 1
 		# we keep on processing the first entry until it goes into the future.
 		while True:
-			timer_list = [tmr for tmr in self.timer_list if not tmr.disabled]
-			if timer_list and timer_list[0].getNextActivation() < t:
-				self.doActivate(timer_list[0])
+			w = self.getFirstTimer()
+			if w is not None and w.getNextActivation() < t:
+				self.doActivate(w)
 			else:
 				break
@@ -0,0 +1,58 @@
+import enigma
+import random
+import time
+
+import tests
+
+import fake_time
+import timer
+
+
+class SyntheticTimerEntry(timer.TimerEntry):
+	def __init__(self, begin, end):
+		timer.TimerEntry.__init__(self, begin, end)
+		self.activations = 0
+
+	def getNextActivation(self):
+		if self.state == self.StateWaiting:
+			return self.begin - self.prepare_time
+		if self.state == self.StatePrepared:
+			return self.begin
+		return self.end
+
+	def activate(self):
+		self.activations += 1
+		return True
+
+
+def test_timer_benchmark(count=5000, repeating=0.1, disabled=0.05, sim_length=86400 * 3):
+	random.seed(count)
+	fake_time.setTime(1700000000)
+	at = time.time()
+
+	t = timer.Timer()
+	t.MaxWaitTime = 86400 * 1000
+
+	for i in range(count):
+		begin = int(at) + random.randint(60, sim_length - 7200)
+		entry = SyntheticTimerEntry(begin, begin + random.randint(60, 7200))
+		if random.random() < repeating:
+			entry.repeated = 1 << random.randint(0, 6)
+		if random.random() < disabled:
+			entry.disabled = True
+		t.addTimerEntry(entry, noRecalc=1)
+	t.calcNextActivation()
+
+	start = time.process_time()
+	# run virtual environment
+	enigma.run(sim_length)
+	elapsed = time.process_time() - start
+
+	print("%d timers, %d processed, %d waiting: %.3fs cpu" % (count, len(t.processed_timers), len(t.timer_list), elapsed))
+
+	for entry in t.processed_timers:
+		if not entry.disabled and not entry.repeated and entry.activations != 3:
+			raise tests.TestError("timer was not run through all states")
+
+
+test_timer_benchmark()
@@ -0,0 +1,63 @@
+import enigma
+import os
+import random
+import tempfile
+import time
+
+import tests
+
+
+def write_timers(filename, count, at):
+	random.seed(count)
+	f = open(filename, "w")
+	f.write('<?xml version="1.0" ?>\n<timers>\n')
+	for i in range(count):
+		begin = int(at) + random.randint(3600, 86400 * 60)
+		f.write('<timer begin="%d" end="%d" serviceref="1:0:1:%X:44D:1:C00000:0:0:0:" repeated="%d" name="Timer %d" description="" afterevent="auto" justplay="0">\n</timer>\n' % (
+			begin, begin + random.randint(600, 7200), random.randint(1, 0x7FFF), random.random() < 0.05 and 1 << random.randint(0, 6) or 0, i))
+	f.write('</timers>\n')
+	f.close()
+
+
+def load_timers(filename, indexed):
+	import RecordTimer
+	import Components.TimerSanityCheck
+
+	t = RecordTimer.RecordTimer()
+	t.Filename = filename
+	t.timer_store = RecordTimer.TimerStore(filename)
+
+	if indexed:
+		RecordTimer.TimerSanityCheck = Components.TimerSanityCheck.TimerSanityCheck
+	else:
+		# check against the complete timer list, like before the conflict index
+		RecordTimer.TimerSanityCheck = lambda timerlist, newtimer=None, index=None: Components.TimerSanityCheck.TimerSanityCheck(timerlist, newtimer)
+
+	start = time.process_time()
+	t.loadTimer()
+	elapsed = time.process_time() - start
+	RecordTimer.TimerSanityCheck = Components.TimerSanityCheck.TimerSanityCheck
+	return t, elapsed
+
+
+def test_timer_sanity_benchmark(counts=(50, 500, 5000)):
+	at = time.time()
+	directory = tempfile.mkdtemp()
+	for count in counts:
+		filename = os.path.join(directory, "timers_%d.xml" % count)
+		write_timers(filename, count, at)
+		results = []
+		for indexed in (False, True):
+			t, elapsed = load_timers(filename, indexed)
+			results.append((elapsed, len(t.timer_list), len(t.processed_timers)))
+		print("loading %d timers at boot: full check %.3fs, conflict index %.3fs" % (count, results[0][0], results[1][0]))
+		if results[0][1:] != results[1][1:]:
+			raise tests.TestError("conflict index loaded a different timer list")
+
+
+# required stuff for timer (we try to keep this minimal)
+enigma.init_nav()
+enigma.init_record_config()
+enigma.init_parental_control()
+
+test_timer_sanity_benchmark()
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+
+import tests
+
+from Tools.TimerStore import TimerStore
+
+
+def fragment(i):
+	return '<timer begin="%d" end="%d" name="Timer %d">\n</timer>\n' % (1700000000 + i * 3600, 1700001800 + i * 3600, i)
+
+
+def names(timers):
+	return sorted(timer.get("name") for timer in timers)
+
+
+def test_timerstore():
+	directory = tempfile.mkdtemp()
+	try:
+		filename = os.path.join(directory, "timers.xml")
+		fragments = [fragment(i) for i in range(3)]
+		store = TimerStore(filename)
+		store.save(fragments) # the first save compacts
+		fragments.append(fragment(3))
+		store.save(fragments)
+		del fragments[0]
+		store.save(fragments)
+		if not os.path.exists(store.journal):
+			raise tests.TestError("changes were not journaled")
+
+		# the journal is replayed on the snapshot
+		store = TimerStore(filename)
+		if names(store.load()) != names(TimerStore(filename).load()) or len(store.load()) != 3:
+			raise tests.TestError("journal was not replayed")
+
+		# the box goes down after the snapshot was written, but before the
+		# journal, which is already part of it, was removed
+		journal = open(store.journal, "rb").read()
+		store = TimerStore(filename)
+		store.load()
+		store.compact(fragments)
+		open(store.journal, "wb").write(journal)
+		timers = TimerStore(filename).load()
+		if len(timers) != 3:
+			raise tests.TestError("old journal was replayed on the new snapshot: %s" % names(timers))
+
+		# changes made after the compaction are still journaled and replayed
+		store = TimerStore(filename)
+		store.load()
+		fragments.append(fragment(4))
+		store.save(fragments)
+		timers = TimerStore(filename).load()
+		if names(timers) != ["Timer 1", "Timer 2", "Timer 3", "Timer 4"]:
+			raise tests.TestError("journal after compaction was not replayed: %s" % names(timers))
+		print("timer store ok")
+	finally:
+		shutil.rmtree(directory)
+
+
+test_timerstore()